@@ -0,0 +1,60 @@
+import os, sys, time
+# Add repo root to sys.path
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame as pg
+from ml_platformer import config as C
+
+pg.init()
+screen = pg.display.set_mode((C.WIDTH, C.HEIGHT))
+from ml_platformer.level import Level  # noqa: E402 (needs a display for convert())
+
+
+def legacy_draw_background(level: Level, gradient: pg.Surface, surf: pg.Surface, cam_x: float):
+    # The previous per-frame path: gradient blit, haze rebuilt line by line,
+    # every cloud copied and alpha'd, no culling
+    surf.blit(gradient, (0, 0))
+    haze = pg.Surface((C.WIDTH, C.HEIGHT), pg.SRCALPHA)
+    for y in range(C.HEIGHT):
+        t = y / max(1, C.HEIGHT - 1)
+        alpha = int(10 + 38 * t)
+        pg.draw.line(haze, (180, 200, 255, alpha), (0, y), (C.WIDTH, y))
+    surf.blit(haze, (0, 0))
+    for c in level.clouds:
+        px = int(c["x"] - cam_x * 0.4)
+        py = int(c["y"])
+        cloud_img = c["img"].copy()
+        cloud_img.set_alpha(c["alpha"])
+        surf.blit(cloud_img, (px, py))
+
+
+def bench(fn, frames: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(frames):
+        fn(screen, (i * 7) % (C.LEVEL_WIDTH - C.WIDTH))
+    return (time.perf_counter() - t0) / frames * 1000.0
+
+
+if __name__ == "__main__":
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    level = Level()
+    gradient = level._make_gradient_surface()
+
+    # Output must be pixel-identical across camera positions
+    ref = pg.Surface(screen.get_size()).convert()
+    for cam_x in (0.0, 900.0, 2240.0):
+        legacy_draw_background(level, gradient, ref, cam_x)
+        level.draw_background(screen, cam_x)
+        if pg.image.tobytes(ref, "RGB") != pg.image.tobytes(screen, "RGB"):
+            print(f"MISMATCH at cam_x={cam_x}")
+            sys.exit(1)
+
+    before = bench(lambda s, x: legacy_draw_background(level, gradient, s, x), frames)
+    after = bench(level.draw_background, frames)
+    print(f"draw_background before: {before:.3f} ms/frame")
+    print(f"draw_background after:  {after:.3f} ms/frame")
+    print(f"speedup: {before / max(after, 1e-9):.1f}x")
@@ -0,0 +1,54 @@
+import os, sys, time
+# Add repo root to sys.path
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from ml_platformer import config as C
+from ml_platformer.ai_agent import QAgent
+from ml_platformer.training import Session, ai_input, fixed_step
+from ml_platformer.parallel import train_shared
+from ml_platformer.sim import Body, Simulation, build_layout
+
+# Compares the single-process agent with N Hogwild learners sharing one
+# shared-memory Q-table, at the same total number of sim steps:
+#   python dev_tools/bench_shared_qtable.py [workers] [steps_per_worker]
+
+
+def run_single(steps: int, seed: int = 123) -> dict:
+    layout = build_layout(0)
+    body = Body(layout.spawn_x, layout.spawn_y)
+    sim = Simulation(layout, body)
+    agent = QAgent(seed=seed)
+    session = Session(training=True, ai_control=True)
+    rows: list[dict] = []
+    dt = (1.0 / C.FPS) * C.TIME_SCALE
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        inp = ai_input(session, agent, body, layout)
+        fixed_step(session, sim, agent, inp, dt, log_episode=rows.append)
+    wall = time.perf_counter() - t0
+    exits = [float(r["time"]) for r in rows if r["reason"] == "exit"]
+    return {
+        "updates": agent.steps,
+        "episodes": len(rows),
+        "exits": len(exits),
+        "best_time": min(exits) if exits else None,
+        "wall_seconds": wall,
+        "updates_per_sec": agent.steps / max(wall, 1e-9),
+    }
+
+
+def _report(name: str, res: dict):
+    best = "—" if res["best_time"] is None else f"{res['best_time']:.2f}s"
+    rate = res["exits"] / max(1, res["episodes"])
+    print(f"{name:<14} updates/s={res['updates_per_sec']:>9.0f}  wall={res['wall_seconds']:6.2f}s  "
+          f"episodes={res['episodes']:>5}  exit rate={rate:5.1%}  best={best}")
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else max(2, (os.cpu_count() or 2) - 1)
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+    _report("single", run_single(workers * steps))
+    _report(f"shared x{workers}", train_shared(workers=workers, steps=steps, log_path=None))
@@ -0,0 +1,250 @@
+import os, sys, json, time, argparse, platform
+# Add repo root to sys.path
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame as pg
+from ml_platformer import config as C
+
+# Hot-path benchmark suite. Each stage reports per-call time and calls/sec (for
+# the physics/learning stages a call is one sim step). Results are written as
+# JSON and compared against a stored baseline to flag regressions:
+#   python dev_tools/benchmarks.py                      # run + compare
+#   python dev_tools/benchmarks.py --update-baseline    # accept current numbers
+#   python dev_tools/benchmarks.py --only draw          # stages containing "draw"
+# Stages over the threshold are timed again (--confirm rounds, keeping each
+# stage's best) before being reported, so one noisy run does not fail the check.
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "bench_baseline.json")
+DT = (1.0 / C.FPS) * C.TIME_SCALE
+
+
+def _setup():
+    pg.init()
+    screen = pg.display.set_mode((C.WIDTH, C.HEIGHT))
+    # Display-dependent modules import after set_mode (they convert() surfaces)
+    from ml_platformer.level import Level
+    from ml_platformer.player import Player
+    from ml_platformer.ai_agent import QAgent
+    from ml_platformer.ui import UI
+    from ml_platformer.main import Session, interactive_step
+    level = Level()
+    player = Player(level.spawn_x, level.spawn_y)
+    return {
+        "screen": screen, "level": level, "player": player, "agent": QAgent(seed=0), "ui": UI(),
+        "Session": Session, "interactive_step": interactive_step,
+    }
+
+
+def _run_right(player, level, inp):
+    # Keep the player moving without dying so every call does real work
+    player.update(DT, level, inp)
+    if not player.alive or player.rect.centerx > C.LEVEL_WIDTH - 200:
+        player.reset(level.spawn_x, level.spawn_y)
+
+
+def build_stages(env: dict) -> dict:
+    from ml_platformer.sim import InputState, Simulation, compute_reward
+    from ml_platformer.env import PlatformerEnv
+    screen, level, player, agent, ui = env["screen"], env["level"], env["player"], env["agent"], env["ui"]
+    inp = InputState(right=True)
+    state = agent.get_state(player, level)
+    next_state = (state[0] - 1,) + state[1:]
+
+    # The loop stage drifts clouds, so it gets its own Level; the draw stages
+    # then see the same cloud positions however often they are re-timed
+    sim_level = type(level)()
+    sim_player = type(player)(sim_level.spawn_x, sim_level.spawn_y)
+    sim = Simulation(sim_level, sim_player)
+    session = env["Session"](training=True, ai_control=True)
+    step = env["interactive_step"]
+    log_sink = []
+
+    def loop_iteration():
+        # One fixed step of main.main's loop body: AI decision, physics, reward, learning
+        step(session, sim, agent, DT, log_episode=log_sink.append)
+        log_sink.clear()
+
+    env = PlatformerEnv()
+    env.reset(seed=0)
+
+    def env_step():
+        # Gym-style step with a random action, resetting at episode end
+        _, _, terminated, truncated, _ = env.step(env.sample_action())
+        if terminated or truncated:
+            env.reset()
+
+    hud = {
+        "training": True, "ai_control": True, "episodes": 12, "steps": 3456, "epsilon": 0.1,
+        "reward": 12.34, "time": 5.67, "best_time": 8.9, "reason": "exit", "steps_per_sec": 1234.0,
+        "ai_wasd": {"w": True, "a": False, "s": False, "d": True},
+    }
+    t = [0.0]
+    # Camera where the player would see the portal (the right end of the level);
+    # off screen, draw_exit is culled and would only time the early return
+    exit_cam = float(min(max(0, level.exit_rect.centerx - C.WIDTH // 2), C.LEVEL_WIDTH - C.WIDTH))
+
+    def draw_exit():
+        t[0] += 1 / 60
+        level.draw_exit(screen, exit_cam, t[0])
+
+    # Player.draw with the optional effects on (both are off in the default
+    # config, which leaves a single sprite blit) and a fixed jump + landing
+    # burst, independent of whatever the Player.update stage left behind
+    fx_flags = {"DRAW_PARTICLES": True, "DRAW_SHADOW": True}
+    saved = {k: getattr(C, k) for k in fx_flags}
+
+    def with_fx(fn):
+        for k, v in fx_flags.items():
+            setattr(C, k, v)
+        try:
+            return fn()
+        finally:
+            for k, v in saved.items():
+                setattr(C, k, v)
+
+    drawn = type(player)(level.spawn_x, level.spawn_y)
+    with_fx(drawn._emit_jump_particles)
+    with_fx(lambda: drawn._emit_land_particles(speed_x=300.0))
+    assert len(drawn.particles) > 0
+
+    return {
+        "Player.update": lambda: _run_right(player, level, inp),
+        "QAgent.get_state": lambda: agent.get_state(player, level),
+        "QAgent.act": lambda: agent.act(state),
+        "QAgent.reward": lambda: agent.reward(1.0, state, next_state, 2, False),
+        "compute_reward": lambda: compute_reward(100.0, 98.0, 10, 12, False, False, DT, 0.0, 1.0, False, 0.0, inp),
+        "main.loop_iteration": loop_iteration,
+        "PlatformerEnv.step": env_step,
+        "Level.draw_background": lambda: level.draw_background(screen, 1200.0),
+        "Level.draw_platforms": lambda: level.draw_platforms(screen, 1200.0),
+        "Level.draw_exit": draw_exit,
+        "Player.draw+shadow+particles": lambda: with_fx(lambda: drawn.draw(screen, 0.0, 1.0)),
+        "UI.draw": lambda: ui.draw(screen, hud),
+    }
+
+
+def time_stage(fn, min_time: float = 0.2, repeats: int = 3) -> float:
+    # Best-of-N per-call seconds; the call count is calibrated so each repeat runs ~min_time
+    fn()
+    n = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        el = time.perf_counter() - t0
+        if el >= min_time / 4 or n >= 1 << 22:
+            break
+        n *= 4
+    calls = max(1, int(n * min_time / max(el, 1e-9)))
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / calls)
+    return best
+
+
+def run(only: str | None = None, min_time: float = 0.2, stages: dict | None = None) -> dict:
+    if stages is None:
+        stages = build_stages(_setup())
+    results = {}
+    for name, fn in stages.items():
+        if only and only.lower() not in name.lower():
+            continue
+        results[name] = _result(time_stage(fn, min_time=min_time))
+    return {
+        "python": platform.python_version(),
+        "pygame": pg.version.ver,
+        "machine": platform.machine(),
+        "stages": results,
+    }
+
+
+def _result(per_call: float) -> dict:
+    return {"us_per_call": per_call * 1e6, "per_sec": 1.0 / per_call}
+
+
+def retime(stages: dict, current: dict, names: list[str], min_time: float):
+    # Time `names` again, keeping each stage's best per-call time in `current`
+    for name in names:
+        per_call = time_stage(stages[name], min_time=min_time, repeats=5)
+        if per_call * 1e6 < current["stages"][name]["us_per_call"]:
+            current["stages"][name] = _result(per_call)
+
+
+def confirm(stages: dict, current: dict, baseline: dict, threshold: float, rounds: int, min_time: float) -> list[str]:
+    # Re-time stages flagged by compare() up to `rounds` more times; returns those
+    # still over the threshold
+    slow = compare(current, baseline, threshold)
+    for _ in range(rounds):
+        if not slow:
+            break
+        retime(stages, current, slow, min_time)
+        slow = compare(current, baseline, threshold)
+    return slow
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    # Stage names whose per-call time grew by more than `threshold` (fraction)
+    slow = []
+    for name, cur in current["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if base and cur["us_per_call"] > base["us_per_call"] * (1.0 + threshold):
+            slow.append(name)
+    return slow
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="ML Platformer hot-path benchmarks")
+    p.add_argument("--out", default=None, help="Write results JSON here")
+    p.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON to compare against")
+    p.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    p.add_argument("--threshold", type=float, default=0.5, help="Regression threshold (0.5 = 50%% slower)")
+    p.add_argument("--only", default=None, help="Run only stages whose name contains this text")
+    p.add_argument("--min-time", type=float, default=0.2, help="Seconds per timing repeat")
+    p.add_argument("--confirm", type=int, default=2,
+                   help="Extra timing rounds for stages over the threshold (and for every stage with --update-baseline)")
+    args = p.parse_args(argv)
+
+    stages = build_stages(_setup())
+    res = run(args.only, args.min_time, stages)
+    baseline = None
+    slow = []
+    if args.update_baseline:
+        # As many best-of rounds as a flagged stage gets, so the baseline is not one noisy sample
+        for _ in range(args.confirm):
+            retime(stages, res, list(res["stages"]), args.min_time)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        slow = confirm(stages, res, baseline, args.threshold, args.confirm, args.min_time)
+
+    print(f"{'stage':<30}{'us/call':>12}{'calls/s':>14}{'vs base':>10}")
+    for name, r in res["stages"].items():
+        rel = ""
+        if baseline and name in baseline.get("stages", {}):
+            rel = f"{r['us_per_call'] / baseline['stages'][name]['us_per_call']:.2f}x"
+        print(f"{name:<30}{r['us_per_call']:>12.2f}{r['per_sec']:>14.0f}{rel:>10}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if slow:
+        print(f"REGRESSION (> {args.threshold:.0%} slower after {args.confirm} re-runs): {', '.join(slow)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,11 @@ if ROOT not in sys.path:
 
 mods = [
     "ml_platformer.config",
+    "ml_platformer.sim",
+    "ml_platformer.batch_env",
+    "ml_platformer.qtable_io",
+    "ml_platformer.shared_qtable",
+    "ml_platformer.parallel",
     "ml_platformer.level",
     "ml_platformer.player",
     "ml_platformer.ai_agent",
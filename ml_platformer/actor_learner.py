@@ -0,0 +1,299 @@
+import os
+import time
+import argparse
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+
+from . import config as C
+from .config import SAVE_PATH
+from .ai_agent import QAgent, encode_state
+from .env import PlatformerEnv
+from .shared_qtable import attach_shared_table, create_shared_table, table_views
+
+# Actor-learner trainer. Actor processes run PlatformerEnv episodes with a
+# local copy of the policy and append transitions to their own ring in shared
+# memory. The learner (the calling process) drains every ring in batches,
+# applies vectorized Q updates to its private table and periodically publishes
+# it to the shared Q block, bumping a version counter. Actors re-copy the
+# published table every `refresh_every` decisions.
+#
+# Each ring has one writer and one reader: the actor stores the slot, then
+# advances its head counter; the learner reads up to head, then advances tail.
+# A full ring makes the actor wait, so no transition is dropped.
+#
+# Staleness is the learner's policy version minus the version the acting
+# policy had when a transition was generated. Publishing is guarded by a
+# seqlock: the learner makes the sequence counter odd while it writes the table
+# and even again after bumping the version, and an actor keeps a copy only if the
+# counter was the same even value before and after it, so the version it
+# records always matches the table it acts with.
+
+TRANSITION = np.dtype([
+    ("s", "<i8"), ("ns", "<i8"), ("r", "<f4"), ("version", "<u4"),
+    ("a", "u1"), ("done", "u1"), ("frames", "u1"),
+])
+# Control block (int64): policy version, stop flag, publish sequence, then per
+# actor head, tail, episodes, exits, best exit time in ms (-1 = none)
+_VERSION, _STOP, _SEQ, _HEADER = 0, 1, 2, 3
+_HEAD, _TAIL, _EPISODES, _EXITS, _BEST_MS, _PER_ACTOR = 0, 1, 2, 3, 4, 5
+
+
+def _ctrl_size(actors: int) -> int:
+    return (_HEADER + _PER_ACTOR * actors) * 8
+
+
+def _views(ctrl_buf, ring_buf, actors: int, capacity: int):
+    ctrl = np.ndarray(_HEADER + _PER_ACTOR * actors, dtype=np.int64, buffer=ctrl_buf)
+    ring = np.ndarray((actors, capacity), dtype=TRANSITION, buffer=ring_buf)
+    return ctrl, ring
+
+
+def _read_policy(ctrl: np.ndarray, shared_q: np.ndarray, q: np.ndarray) -> int:
+    # Copy the published table into `q` and return its version (seqlock read side)
+    while True:
+        seq = int(ctrl[_SEQ])
+        if seq % 2 == 0:
+            version = int(ctrl[_VERSION])
+            q[...] = shared_q
+            if int(ctrl[_SEQ]) == seq or ctrl[_STOP]:
+                return version
+        time.sleep(0.0001)
+
+
+def _publish(ctrl: np.ndarray, shared_q: np.ndarray, q: np.ndarray, version: int):
+    # Seqlock write side: odd sequence while the table is being written
+    ctrl[_SEQ] += 1
+    shared_q[...] = q
+    ctrl[_VERSION] = version
+    ctrl[_SEQ] += 1
+
+
+def _actor(aid: int, names: tuple, actors: int, capacity: int, layout_index: int, seed: int, frame_skip: int,
+           refresh_every: int):
+    table_shm = attach_shared_table(names[0])
+    ctrl_shm = shared_memory.SharedMemory(name=names[1])
+    ring_shm = shared_memory.SharedMemory(name=names[2])
+    ctrl, ring = _views(ctrl_shm.buf, ring_shm.buf, actors, capacity)
+    shared_q, _ = table_views(table_shm.buf)
+    base = _HEADER + _PER_ACTOR * aid
+    agent = QAgent(seed=seed + aid)
+    version = _read_policy(ctrl, shared_q, agent.q)
+    env = PlatformerEnv(layout=layout_index, frame_skip=frame_skip)
+    obs, _ = env.reset(seed=seed + aid)
+    state = tuple(obs)
+    head = 0
+    decisions = 0
+    while not ctrl[_STOP]:
+        action = agent.act(state)
+        start = env.sim.episode_step
+        obs, r, terminated, truncated, info = env.step(action)
+        frames = info["episode_step"] - start
+        done = terminated or truncated
+        next_state = tuple(obs)
+
+        while head - ctrl[base + _TAIL] >= capacity and not ctrl[_STOP]:
+            time.sleep(0.0005)
+        if ctrl[_STOP]:
+            break
+        ring[aid, head % capacity] = (encode_state(state), encode_state(next_state), r, version, action, done, frames)
+        head += 1
+        ctrl[base + _HEAD] = head
+
+        agent.epsilon = max(agent.min_epsilon, agent.epsilon * agent.decay ** frames)
+        if done:
+            ctrl[base + _EPISODES] += 1
+            if info["reached_exit"]:
+                ctrl[base + _EXITS] += 1
+                ms = int(info["episode_time"] * 1000)
+                if ctrl[base + _BEST_MS] < 0 or ms < ctrl[base + _BEST_MS]:
+                    ctrl[base + _BEST_MS] = ms
+            obs, _ = env.reset()
+            next_state = tuple(obs)
+        state = next_state
+
+        decisions += 1
+        if decisions % refresh_every == 0:
+            version = _read_policy(ctrl, shared_q, agent.q)
+    # Views into the blocks must go before they can be closed
+    del shared_q, ctrl, ring, agent
+    for shm in (table_shm, ctrl_shm, ring_shm):
+        shm.close()
+
+
+class _Ingest:
+    # Learner side: drains the rings into its private agent and keeps the
+    # throughput and staleness counters. The shared-memory views are passed in,
+    # so the caller alone holds (and releases) them.
+    def __init__(self, actors: int, capacity: int, batch: int, seed: int):
+        self.actors = actors
+        self.capacity = capacity
+        self.batch = batch
+        self.agent = QAgent(seed=seed)
+        self.total = 0
+        self.per_actor = [0] * actors
+        self.staleness_sum = 0
+        self.staleness_max = 0
+        self.staleness_hist = np.zeros(64, dtype=np.int64)
+
+    def drain(self, ctrl: np.ndarray, ring: np.ndarray, version: int) -> int:
+        # Learn from up to `batch` pending transitions per actor; returns how many
+        chunks = []
+        for aid in range(self.actors):
+            base = _HEADER + _PER_ACTOR * aid
+            tail = int(ctrl[base + _TAIL])
+            n = min(int(ctrl[base + _HEAD]) - tail, self.batch)
+            if n <= 0:
+                continue
+            chunks.append(ring[aid, (tail + np.arange(n)) % self.capacity])
+            ctrl[base + _TAIL] = tail + n
+            self.per_actor[aid] += n
+        if not chunks:
+            return 0
+        rec = np.concatenate(chunks)
+        actions = rec["a"].astype(np.int64)
+        self.agent.learn_batch(rec["s"], actions, rec["r"], rec["ns"], rec["done"].astype(bool),
+                               rec["frames"].astype(np.int64))
+        np.add.at(self.agent.visits, (rec["s"], actions), 1)
+        lag = version - rec["version"].astype(np.int64)
+        hist = self.staleness_hist
+        self.staleness_sum += int(lag.sum())
+        self.staleness_max = max(self.staleness_max, int(lag.max()))
+        hist += np.bincount(np.minimum(lag, hist.size - 1), minlength=hist.size)
+        self.total += len(rec)
+        return len(rec)
+
+    @property
+    def staleness_mean(self) -> float:
+        return self.staleness_sum / max(1, self.total)
+
+
+def train_actor_learner(actors: int = 3, seconds: float = 30.0, layout_index: int = 0, seed: int = 123,
+                        frame_skip: int = C.MACRO_FRAMES, capacity: int = 1 << 16, batch: int = 8192,
+                        refresh_every: int = 1000, publish_every: float = 0.05, report_every: float | None = None,
+                        save_path: str | None = None) -> dict:
+    table_shm = create_shared_table()
+    ctrl_shm = shared_memory.SharedMemory(create=True, size=_ctrl_size(actors))
+    ring_shm = shared_memory.SharedMemory(create=True, size=actors * capacity * TRANSITION.itemsize)
+    ctrl, ring = _views(ctrl_shm.buf, ring_shm.buf, actors, capacity)
+    ctrl[:] = 0
+    for aid in range(actors):
+        ctrl[_HEADER + _PER_ACTOR * aid + _BEST_MS] = -1
+    shared_q, _ = table_views(table_shm.buf)
+    ingest = _Ingest(actors, capacity, batch, seed)
+    learner = ingest.agent
+
+    names = (table_shm.name, ctrl_shm.name, ring_shm.name)
+    ctx = mp.get_context()
+    procs = [
+        ctx.Process(target=_actor, args=(aid, names, actors, capacity, layout_index, seed, frame_skip, refresh_every),
+                    daemon=True)
+        for aid in range(actors)
+    ]
+    for p in procs:
+        p.start()
+
+    version = 0
+    t_start = time.perf_counter()
+    last_publish = last_report = t_start
+    report_base = 0
+
+    try:
+        while True:
+            now = time.perf_counter()
+            if now - t_start >= seconds:
+                break
+            if not ingest.drain(ctrl, ring, version):
+                time.sleep(0.0005)
+            now = time.perf_counter()
+            if now - last_publish >= publish_every:
+                version += 1
+                _publish(ctrl, shared_q, learner.q, version)
+                last_publish = now
+            if report_every and now - last_report >= report_every:
+                rate = (ingest.total - report_base) / (now - last_report)
+                print(f"[{now - t_start:6.1f}s] {rate:9.0f} transitions/s  "
+                      f"staleness mean {ingest.staleness_mean:.2f} max {ingest.staleness_max}")
+                last_report, report_base = now, ingest.total
+        wall = time.perf_counter() - t_start
+        ctrl[_STOP] = 1
+        for p in procs:
+            p.join(timeout=5)
+        # Whatever the actors pushed before stopping is still learned from
+        while ingest.drain(ctrl, ring, version):
+            pass
+        shared_q[...] = learner.q
+        episodes = exits = 0
+        best_ms = []
+        for aid in range(actors):
+            base = _HEADER + _PER_ACTOR * aid
+            episodes += int(ctrl[base + _EPISODES])
+            exits += int(ctrl[base + _EXITS])
+            if ctrl[base + _BEST_MS] >= 0:
+                best_ms.append(int(ctrl[base + _BEST_MS]))
+    finally:
+        ctrl[_STOP] = 1
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+        # Views into the blocks must go before they can be closed
+        del shared_q, ctrl, ring
+        for shm in (table_shm, ctrl_shm, ring_shm):
+            shm.close()
+            shm.unlink()
+
+    if save_path:
+        learner.save(save_path)
+
+    cum = np.cumsum(ingest.staleness_hist)
+    p95 = int(np.searchsorted(cum, 0.95 * cum[-1])) if ingest.total else 0
+    return {
+        "actors": actors,
+        "transitions": ingest.total,
+        "per_actor": ingest.per_actor,
+        "versions": version,
+        "episodes": episodes,
+        "exits": exits,
+        "best_time": min(best_ms) / 1000.0 if best_ms else None,
+        "wall_seconds": wall,
+        "transitions_per_sec": ingest.total / max(wall, 1e-9),
+        "staleness_mean": ingest.staleness_mean,
+        "staleness_p95": p95,
+        "staleness_max": ingest.staleness_max,
+        "q": learner.q,
+        "visits": learner.visits,
+    }
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="ML Platformer - actor-learner Q-learning")
+    p.add_argument("--actors", type=int, default=max(1, (os.cpu_count() or 2) - 1), help="Actor processes")
+    p.add_argument("--seconds", type=float, default=30.0, help="Wall-clock training time")
+    p.add_argument("--layout", type=int, default=0, help="Layout index every actor plays")
+    p.add_argument("--seed", type=int, default=123, help="Base seed; actor i uses seed + i")
+    p.add_argument("--frame-skip", type=int, default=C.MACRO_FRAMES, help="Frames per decision (macro-step)")
+    p.add_argument("--capacity", type=int, default=1 << 16, help="Ring slots per actor")
+    p.add_argument("--batch", type=int, default=8192, help="Max transitions drained per actor per learner pass")
+    p.add_argument("--refresh-every", type=int, default=1000, help="Actor decisions between policy refreshes")
+    p.add_argument("--publish-every", type=float, default=0.05, help="Seconds between learner policy publishes")
+    p.add_argument("--save", action="store_true", help=f"Save the learned Q-table to {SAVE_PATH}")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    res = train_actor_learner(
+        actors=args.actors, seconds=args.seconds, layout_index=args.layout, seed=args.seed,
+        frame_skip=args.frame_skip, capacity=args.capacity, batch=args.batch, refresh_every=args.refresh_every,
+        publish_every=args.publish_every, report_every=1.0, save_path=SAVE_PATH if args.save else None,
+    )
+    best = "—" if res["best_time"] is None else f"{res['best_time']:.2f}s"
+    print(f"actors={res['actors']} transitions={res['transitions']} episodes={res['episodes']} exits={res['exits']} best={best}")
+    print(f"wall={res['wall_seconds']:.1f}s transitions/s={res['transitions_per_sec']:.0f} "
+          f"per actor={res['per_actor']}")
+    print(f"staleness (policy versions): mean {res['staleness_mean']:.2f} p95 {res['staleness_p95']} "
+          f"max {res['staleness_max']} over {res['versions']} publishes")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,90 @@
 import math
-import pickle
-from collections import defaultdict
 import numpy as np
 from . import config as C
-from .player import InputState
+from .sim import InputState
+from .qtable_io import is_binary_qtable, load_qtable, read_pickle_qtable, save_qtable
+
+# Discrete state layout from get_state: (sdx, sdy, vx, vy, on_ground, under).
+# Each field is shifted by its minimum and packed mixed-radix into one row index
+# of a dense (N_STATES, n_actions) Q array.
+STATE_MIN = (-30, -20, -1, -1, 0, 0)
+STATE_BINS = (61, 41, 3, 3, 2, 2)
+N_STATES = int(np.prod(STATE_BINS))
+_STATE_MIN_ARR = np.array(STATE_MIN, dtype=np.int64)
+# Row-index weight of each field (its mixed-radix place value), and the index
+# offset that shifts every field by its minimum
+_STRIDES = tuple(int(np.prod(STATE_BINS[i + 1:])) for i in range(len(STATE_BINS)))
+_OFFSET = -sum(m * k for m, k in zip(STATE_MIN, _STRIDES))
+
+
+def encode_state(state) -> int:
+    k0, k1, k2, k3, k4, k5 = _STRIDES
+    sdx, sdy, vx, vy, on_g, under = state
+    return sdx * k0 + sdy * k1 + vx * k2 + vy * k3 + on_g * k4 + under * k5 + _OFFSET
+
+
+def encode_states(states) -> np.ndarray:
+    # (..., 6) array of states -> (...) row indices; a single state gives a 0-d array
+    arr = np.asarray(states, dtype=np.int64)
+    if arr.ndim == 0 or arr.shape[-1] != len(STATE_BINS):
+        raise ValueError(f"expected states of shape (..., {len(STATE_BINS)}), got {arr.shape}")
+    return np.ravel_multi_index(tuple(np.moveaxis(arr - _STATE_MIN_ARR, -1, 0)), STATE_BINS)
+
+
+def _state_rows(states) -> np.ndarray:
+    # Batch arguments: an (n, 6) array of states, or an (n,) array of encoded indices
+    arr = np.asarray(states, dtype=np.int64)
+    return arr if arr.ndim == 1 else encode_states(arr)
+
+
+def decode_state(index: int) -> tuple:
+    return tuple(int(v) + m for v, m in zip(np.unravel_index(index, STATE_BINS), STATE_MIN))
+
+
+def action_input(action: int) -> InputState:
+    a = C.ACTIONS[action]
+    return InputState(
+        left=("left" in a),
+        right=("right" in a),
+        jump=("jump" in a) or (a == "jump")
+    )
+
+
+def _bin_val(v, size, min_b, max_b):
+    b = int(math.floor(v / size))
+    return max(min_b, min(max_b, b))
+
+
+def discretize_state(player, level) -> tuple:
+    # Relative position to exit
+    dx = (level.exit_rect.centerx - player.rect.centerx)
+    dy = (level.exit_rect.centery - player.rect.centery)
+
+    # Discretize
+    sdx = _bin_val(dx, 64, -30, 30)
+    sdy = _bin_val(dy, 48, -20, 20)
+    vx = int(math.copysign(1, player.vel.x)) if abs(player.vel.x) > 40 else 0
+    vy = -1 if player.vel.y < -50 else (1 if player.vel.y > 50 else 0)
+    on_g = 1 if player.on_ground else 0
+
+    # Nearby ledge hint: is there a platform under player within small drop?
+    under = level.ledge_under(player.rect)
+
+    return (sdx, sdy, vx, vy, on_g, under)
+
 
 class QAgent:
-    def __init__(self, seed: int = 0):
+    def __init__(self, seed: int = 0, shared_buf=None):
         self.rng = np.random.default_rng(seed)
-        self.q = defaultdict(lambda: np.zeros(len(C.ACTIONS), dtype=np.float32))
+        # Optional shared backing buffer (see shared_qtable): the table then lives
+        # in that block and act/reward read and write it in place
+        self.shared = shared_buf is not None
+        if self.shared:
+            from .shared_qtable import table_views
+            self.q, self.visits = table_views(shared_buf)
+        else:
+            self.q = np.zeros((N_STATES, len(C.ACTIONS)), dtype=np.float32)
+            self.visits = np.zeros((N_STATES, len(C.ACTIONS)), dtype=np.uint32)
         self.alpha = 0.2
         self.gamma = 0.98
         self.epsilon = 0.25
@@ -19,70 +95,117 @@ class QAgent:
         self.total_reward = 0.0
         self.steps = 0
         self.episodes = 0
+        # Optional ReplayBuffer; reward()/reward_batch() record into it and replay() learns from it
+        self.replay_buffer = None
 
     def get_state(self, player, level):
-        # Relative position to exit
-        dx = (level.exit_rect.centerx - player.rect.centerx)
-        dy = (level.exit_rect.centery - player.rect.centery)
-
-        # Discretize
-        def bin_val(v, size, min_b, max_b):
-            b = int(math.floor(v / size))
-            return max(min_b, min(max_b, b))
-
-        sdx = bin_val(dx, 64, -30, 30)
-        sdy = bin_val(dy, 48, -20, 20)
-        vx = int(math.copysign(1, player.vel.x)) if abs(player.vel.x) > 40 else 0
-        vy = -1 if player.vel.y < -50 else (1 if player.vel.y > 50 else 0)
-        on_g = 1 if player.on_ground else 0
-
-        # Nearby ledge hint: is there a platform under player within small drop?
-        under = 0
-        feet = player.rect.move(0, 8)
-        for p in level.platforms:
-            if feet.centerx >= p.left and feet.centerx <= p.right:
-                if 0 <= p.top - feet.bottom <= 64:
-                    under = 1
-                    break
-
-        return (sdx, sdy, vx, vy, on_g, under)
+        return discretize_state(player, level)
 
     def act(self, state):
         if self.rng.random() < self.epsilon:
             a = self.rng.integers(0, len(C.ACTIONS))
         else:
-            qvals = self.q[state]
+            qvals = self.q[encode_state(state)]
             a = int(np.argmax(qvals))
         return int(a)
 
-    def reward(self, r, state, next_state, action, done):
-        # Q-learning update
-        qsa = self.q[state][action]
-        max_next = 0.0 if done else float(np.max(self.q[next_state]))
-        self.q[state][action] = qsa + self.alpha * (r - qsa + self.gamma * max_next)
+    def reward(self, r, state, next_state, action, done, frames: int = 1):
+        # Q-learning update; a macro-step spanning `frames` sim frames bootstraps
+        # with gamma**frames and decays epsilon as if each frame were a step
+        s = encode_state(state)
+        qsa = self.q[s, action]
+        ns = encode_state(next_state)
+        max_next = 0.0 if done else float(np.max(self.q[ns]))
+        gamma = self.gamma if frames == 1 else self.gamma ** frames
+        self.q[s, action] = qsa + self.alpha * (r - qsa + gamma * max_next)
+        self.visits[s, action] += 1
+        if self.replay_buffer is not None:
+            self.replay_buffer.add(s, action, r, ns, done, frames)
 
         # Epsilon decay per step
-        self.epsilon = max(self.min_epsilon, self.epsilon * self.decay)
+        self.epsilon = max(self.min_epsilon, self.epsilon * (self.decay if frames == 1 else self.decay ** frames))
         self.total_reward += r
         self.steps += 1
         if done:
             self.episodes += 1
 
+    def act_batch(self, states) -> np.ndarray:
+        # Epsilon-greedy over many states at once (rows of get_state or encoded indices)
+        idx = _state_rows(states)
+        a = np.argmax(self.q[idx], axis=1)
+        explore = self.rng.random(len(idx)) < self.epsilon
+        a[explore] = self.rng.integers(0, len(C.ACTIONS), size=int(explore.sum()))
+        return a
+
+    def reward_batch(self, r, states, next_states, actions, dones):
+        # One Q-learning update per transition, all computed against the table as it
+        # was before the batch; repeated (state, action) pairs accumulate their deltas.
+        s = _state_rows(states)
+        ns = _state_rows(next_states)
+        a = np.asarray(actions, dtype=np.int64)
+        r = np.asarray(r, dtype=np.float64)
+        dones = np.asarray(dones, dtype=bool)
+        qsa = self.q[s, a]
+        max_next = np.where(dones, 0.0, self.q[ns].max(axis=1))
+        np.add.at(self.q, (s, a), self.alpha * (r - qsa + self.gamma * max_next))
+        np.add.at(self.visits, (s, a), 1)
+        if self.replay_buffer is not None:
+            self.replay_buffer.add_batch(s, a, r, ns, dones)
+
+        n = len(s)
+        self.epsilon = max(self.min_epsilon, self.epsilon * self.decay ** n)
+        self.total_reward += float(r.sum())
+        self.steps += n
+        self.episodes += int(dones.sum())
+
+    def learn_batch(self, s, a, r, ns, dones, frames=None):
+        # Vectorized Q-learning over encoded transitions, without any step/visit
+        # bookkeeping; targets use the table as it was before the batch. Sampled
+        # minibatches repeat transitions, so duplicate (state, action) pairs take
+        # the mean of their TD errors rather than the sum (which would diverge).
+        gamma = self.gamma if frames is None else self.gamma ** frames
+        td = r - self.q[s, a] + gamma * np.where(dones, 0.0, self.q[ns].max(axis=1))
+        cells, inv, counts = np.unique(s * self.q.shape[1] + a, return_inverse=True, return_counts=True)
+        flat = self.q.reshape(-1)
+        flat[cells] += self.alpha * np.bincount(inv, weights=td) / counts
+
+    def replay(self, batch_size: int = C.REPLAY_BATCH, batches: int = 1) -> int:
+        # Re-learn from `batches` sampled minibatches; returns transitions replayed.
+        # Replayed updates leave visits alone: those count environment experience.
+        buf = self.replay_buffer
+        if buf is None or len(buf) < batch_size:
+            return 0
+        for _ in range(batches):
+            self.learn_batch(*buf.sample(batch_size))
+        return batches * batch_size
+
     def to_input(self, action: int) -> InputState:
-        a = C.ACTIONS[action]
-        return InputState(
-            left=("left" in a),
-            right=("right" in a),
-            jump=("jump" in a) or (a == "jump")
-        )
+        return action_input(action)
 
     def save(self, path: str):
-        with open(path, "wb") as f:
-            pickle.dump(dict(self.q), f)
+        self._detach()
+        save_qtable(path, self.q, self.visits, STATE_MIN, STATE_BINS)
+
+    def snapshot(self) -> tuple[np.ndarray, np.ndarray]:
+        # Point-in-time copies of (q, visits) that can be written from another thread
+        self._detach()
+        return self.q.copy(), self.visits.copy()
+
+    def _detach(self):
+        if not self.shared and isinstance(self.q, np.memmap):
+            # Detach from the mapped file first so it can be replaced (Windows locks mapped files)
+            self.q, self.visits = np.array(self.q), np.array(self.visits)
 
     def load(self, path: str):
-        with open(path, "rb") as f:
-            d = pickle.load(f)
-            self.q = defaultdict(lambda: np.zeros(len(C.ACTIONS), dtype=np.float32))
-            for k, v in d.items():
-                self.q[k] = v
+        # Binary tables are memory-mapped copy-on-write; legacy pickles are imported
+        if is_binary_qtable(path):
+            q, visits = load_qtable(path, STATE_MIN, STATE_BINS, len(C.ACTIONS))
+        else:
+            q = read_pickle_qtable(path, encode_state, N_STATES, len(C.ACTIONS))
+            visits = np.zeros(q.shape, dtype=np.uint32)
+        if self.shared:
+            # Fill the shared block in place so other learners see the loaded table
+            self.q[...] = q
+            self.visits[...] = visits
+        else:
+            self.q, self.visits = q, visits
@@ -0,0 +1,283 @@
+import io
+import os
+import csv
+import json
+import time
+import argparse
+import numpy as np
+
+from .config import EPISODE_LOG_PATH
+from .telemetry import NPZ_DTYPES, load_npz_chunks
+
+# Learning-curve analytics over episode logs (episode_log.csv, the parallel log
+# or --log-npz chunks). EpisodeLogTail reads the CSV in large byte blocks and
+# converts each block column-wise with NumPy, remembering the byte offset of the
+# last complete row so later polls only parse what was appended since. The offset
+# lives in memory, so only --follow benefits; each new run parses the whole log.
+# All curves are trailing-window statistics computed with cumulative sums and
+# block-wise running minima, so cost grows linearly with the log. Nothing here
+# imports pygame or the game loop.
+
+SUMMARY_PATH = os.path.join(os.path.dirname(__file__), "episode_summary.json")
+REASONS = ("exit", "fell", "timeout")
+
+
+class EpisodeLogTail:
+    def __init__(self, path: str, block_bytes: int = 1 << 23):
+        self.path = path
+        self.block_bytes = max(1 << 12, int(block_bytes))
+        self.offset = 0
+        self.columns: list[str] | None = None
+        self.rows = 0
+        self._parts: list[dict[str, np.ndarray]] = []
+
+    def poll(self) -> int:
+        # Parse rows appended since the last call; returns how many were added.
+        # A file that shrank (moved aside and restarted) is read from the top.
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return 0
+        if size < self.offset:
+            self.offset, self.columns, self.rows, self._parts = 0, None, 0, []
+        added = 0
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            carry = b""
+            while True:
+                block = f.read(self.block_bytes)
+                if not block:
+                    break
+                data = carry + block
+                end = data.rfind(b"\n") + 1
+                carry = data[end:]
+                if not end:
+                    continue
+                self.offset += end
+                lines = data[:end]
+                if self.columns is None:
+                    head, _, lines = lines.partition(b"\n")
+                    self.columns = head.decode("utf-8").strip().split(",")
+                if lines:
+                    part = parse_rows(lines, self.columns)
+                    self._parts.append(part)
+                    added += len(part[self.columns[0]])
+        self.rows += added
+        return added
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        if len(self._parts) > 1:
+            self._parts = [{k: np.concatenate([p[k] for p in self._parts]) for k in self.columns}]
+        if not self._parts:
+            return {k: np.empty(0, dtype=NPZ_DTYPES.get(k, str)) for k in self.columns or []}
+        return dict(self._parts[0])
+
+
+def parse_rows(data: bytes, columns: list[str]) -> dict[str, np.ndarray]:
+    # Complete CSV rows (no header) to one array per column. np.loadtxt's C parser
+    # reads the block straight into a structured array; rows it rejects (blank
+    # numeric fields, short rows) send the block through a string grid instead.
+    text = data.decode("utf-8").replace("\r", "").rstrip("\n")
+    if not text:
+        return {k: np.empty(0, dtype=NPZ_DTYPES.get(k, str)) for k in columns}
+    dtype = np.dtype([(k, NPZ_DTYPES.get(k, "U32")) for k in columns])
+    try:
+        rec = np.loadtxt(io.StringIO(text), delimiter=",", dtype=dtype, ndmin=1)
+        return {k: rec[k].copy() for k in columns}
+    except ValueError:
+        pass
+    rows = [r + [""] * (len(columns) - len(r)) for r in csv.reader(text.split("\n")) if r]
+    grid = np.array([r[:len(columns)] for r in rows]).reshape(-1, len(columns))
+    out = {}
+    for i, k in enumerate(columns):
+        col = grid[:, i]
+        if k not in NPZ_DTYPES:
+            out[k] = col.copy()
+            continue
+        try:
+            out[k] = col.astype(NPZ_DTYPES[k])
+        except ValueError:
+            out[k] = np.where(col == "", "nan", col).astype(np.float64)
+    return out
+
+
+def load_episode_log(path: str) -> dict[str, np.ndarray]:
+    tail = EpisodeLogTail(path)
+    tail.poll()
+    return tail.arrays()
+
+
+def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    # Mean over the trailing `window` entries (fewer at the start)
+    c = np.concatenate(([0.0], np.cumsum(x, dtype=np.float64)))
+    i = np.arange(1, len(x) + 1)
+    lo = np.maximum(0, i - window)
+    return (c[i] - c[lo]) / (i - lo)
+
+
+def rolling_min(x: np.ndarray, window: int) -> np.ndarray:
+    # Trailing-window minimum in O(n) (van Herk / Gil-Werman): split into blocks
+    # of `window`, take running minima forwards and backwards within each block,
+    # and every window is the min of one suffix and the next block's prefix.
+    n = len(x)
+    w = max(1, min(int(window), n))
+    if n == 0:
+        return np.empty(0, dtype=np.float64)
+    y = np.concatenate((np.full(w - 1, np.inf), np.asarray(x, dtype=np.float64)))
+    y = np.concatenate((y, np.full(-len(y) % w, np.inf))).reshape(-1, w)
+    pre = np.minimum.accumulate(y, axis=1).ravel()
+    suf = np.minimum.accumulate(y[:, ::-1], axis=1)[:, ::-1].ravel()
+    j = np.arange(n)
+    return np.minimum(suf[j], pre[j + w - 1])
+
+
+def window_medians(x: np.ndarray, window: int, ends: np.ndarray) -> np.ndarray:
+    # Median of the non-NaN values in the trailing window ending at each index in `ends`
+    w = max(1, int(window))
+    padded = np.concatenate((np.full(w - 1, np.nan), np.asarray(x, dtype=np.float64)))
+    win = np.sort(np.lib.stride_tricks.sliding_window_view(padded, w)[ends], axis=1)
+    k = np.count_nonzero(~np.isnan(win), axis=1)
+    rows = np.arange(len(ends))
+    lo = win[rows, np.maximum(k - 1, 0) // 2]
+    hi = win[rows, np.maximum(k, 1) // 2]
+    return np.where(k > 0, (lo + hi) / 2.0, np.nan)
+
+
+def reason_masks(reason: np.ndarray) -> dict[str, np.ndarray]:
+    # One boolean mask per reset reason: the known ones always, plus any other
+    # value present. Only the leftovers are sorted, so a log of known reasons
+    # costs a few linear comparisons.
+    masks = {r: reason == r for r in REASONS}
+    other = ~np.logical_or.reduce(list(masks.values()))
+    for r in np.unique(reason[other]).tolist():
+        masks[r] = reason == r
+    return masks
+
+
+def summarize(cols: dict[str, np.ndarray], window: int = 100, points: int = 500) -> dict:
+    # Dashboard summary: totals, the latest window, and curves sampled at up to
+    # `points` evenly spaced episodes
+    reason = cols.get("reason", np.empty(0, dtype=str))
+    n = len(reason)
+    summary = {"rows": n, "window": window}
+    if n == 0:
+        return summary
+    times = cols["time"].astype(np.float64)
+    masks = reason_masks(reason)
+    exits = masks["exit"]
+    exit_times = np.where(exits, times, np.nan)
+    episode = cols["episode"] if "episode" in cols else np.arange(1, n + 1)
+
+    ends = np.unique(np.linspace(0, n - 1, min(points, n)).round().astype(np.int64))
+    rate = rolling_mean(exits, window)
+    best = rolling_min(np.where(exits, times, np.inf), window)
+    best[np.isinf(best)] = np.nan
+    medians = window_medians(exit_times, window, ends)
+
+    summary["episodes"] = [int(episode[0]), int(episode[-1])]
+    summary["reasons"] = {r: int(np.count_nonzero(m)) for r, m in masks.items()}
+    summary["completion_rate"] = float(exits.mean())
+    if exits.any():
+        i = int(np.nanargmin(exit_times))
+        summary["best_time"] = float(times[i])
+        summary["best_episode"] = int(episode[i])
+        summary["first_exit_episode"] = int(episode[np.argmax(exits)])
+    else:
+        summary["best_time"] = summary["best_episode"] = summary["first_exit_episode"] = None
+
+    last = slice(max(0, n - window), n)
+    recent = {
+        "completion_rate": float(rate[-1]),
+        "best_time": float(best[-1]),
+        "median_time": float(medians[-1]),
+        "reasons": {r: int(np.count_nonzero(m[last])) for r, m in masks.items()},
+    }
+    if "epsilon" in cols:
+        recent["epsilon"] = float(cols["epsilon"][-1])
+    if "steps" in cols:
+        recent["mean_steps"] = float(cols["steps"][last].mean())
+    if "steps_per_sec" in cols:
+        sps = cols["steps_per_sec"][last].astype(np.float64)
+        recent["steps_per_sec"] = float(np.nanmean(sps)) if np.isfinite(sps).any() else None
+    summary["recent"] = recent
+
+    curve = {
+        "episode": episode[ends],
+        "completion_rate": rate[ends],
+        "best_time": best[ends],
+        "median_time": medians,
+        "reasons": {r: rolling_mean(m, window)[ends] for r, m in masks.items()},
+    }
+    if "epsilon" in cols:
+        curve["epsilon"] = cols["epsilon"][ends]
+    summary["curve"] = curve
+    return _jsonable(summary)
+
+
+def _jsonable(obj):
+    # Arrays to lists and NaN/inf to null, so the output is strict JSON
+    if isinstance(obj, dict):
+        return {k: _jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, np.ndarray):
+        return [_jsonable(v) for v in obj.tolist()]
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    if isinstance(obj, (float, np.floating)):
+        return float(obj) if np.isfinite(obj) else None
+    if isinstance(obj, np.integer):
+        return int(obj)
+    return obj
+
+
+def write_summary(summary: dict, path: str):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(summary, f, allow_nan=False)
+    os.replace(tmp, path)
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="ML Platformer - episode log analytics")
+    p.add_argument("log", nargs="?", default=EPISODE_LOG_PATH, help="Episode CSV log to analyze")
+    p.add_argument("--npz", type=str, default=None, help="Read --log-npz chunks from this directory instead")
+    p.add_argument("--window", type=int, default=100, help="Episodes per rolling window")
+    p.add_argument("--points", type=int, default=500, help="Max points per curve in the summary")
+    p.add_argument("--out", type=str, default=SUMMARY_PATH, help="Summary JSON path")
+    p.add_argument("--follow", type=float, default=0.0,
+                   help="Keep tailing the log, rewriting the summary every N seconds when rows arrive")
+    return p.parse_args(argv)
+
+
+def _report(summary: dict, seconds: float):
+    best = "—" if summary.get("best_time") is None else f"{summary['best_time']:.2f}s"
+    recent = summary.get("recent", {})
+    rate = recent.get("completion_rate")
+    rate = "—" if rate is None else f"{rate:.1%}"
+    print(f"rows={summary['rows']} best={best} recent completion={rate} "
+          f"reasons={summary.get('reasons', {})} ({seconds * 1000:.0f} ms)")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.npz:
+        t0 = time.perf_counter()
+        summary = summarize(load_npz_chunks(args.npz), args.window, args.points)
+        write_summary(summary, args.out)
+        _report(summary, time.perf_counter() - t0)
+        return
+    tail = EpisodeLogTail(args.log)
+    while True:
+        t0 = time.perf_counter()
+        if tail.poll() or not args.follow:
+            summary = summarize(tail.arrays(), args.window, args.points)
+            summary["source"] = os.path.abspath(args.log)
+            summary["offset"] = tail.offset
+            write_summary(summary, args.out)
+            _report(summary, time.perf_counter() - t0)
+        if not args.follow:
+            return
+        time.sleep(args.follow)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+from dataclasses import dataclass
+import numpy as np
+from . import config as C
+from .sim import build_layout
+
+# Struct-of-arrays twin of sim.Body/sim.Simulation: every per-player field is a
+# NumPy array so one step() call advances the whole population. Collision keeps
+# the scalar code's platform order (platforms are few, players are many), so the
+# results match Simulation.step exactly.
+
+# Input masks per action index, derived the same way as QAgent.to_input
+ACTION_LEFT = np.array(["left" in a for a in C.ACTIONS])
+ACTION_RIGHT = np.array(["right" in a for a in C.ACTIONS])
+ACTION_JUMP = np.array(["jump" in a for a in C.ACTIONS])
+
+
+@dataclass
+class BatchStepResult:
+    state: np.ndarray  # (n, 6) int, same fields as QAgent.get_state
+    reward: np.ndarray
+    reached_exit: np.ndarray
+    fell: np.ndarray
+    died_to_hazard: np.ndarray
+    reached_timeout: np.ndarray
+    done: np.ndarray
+
+
+def _rect_arrays(rects) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    a = np.array([tuple(r) for r in rects], dtype=np.int64).reshape(-1, 4)
+    return a[:, 0], a[:, 1], a[:, 2], a[:, 3]
+
+
+def compute_reward_batch(prev_dist, new_dist, prev_x, new_x, reached_exit, fell, dt, idle_weight, episode_time, reached_timeout, furthest_x_reward, jump):
+    # Vectorized sim.compute_reward; same terms in the same order
+    r = np.zeros(np.shape(new_dist), dtype=np.float64)
+    r -= C.REWARD_TIME_PENALTY_PER_SEC * dt
+    r += C.REWARD_PROGRESS_SCALE * (prev_dist - new_dist)
+    dx = (new_x - prev_x).astype(np.float64)
+    r += np.where(dx > 0, C.REWARD_PROGRESS_X_SCALE * dx, 0.0)
+    r += np.where(dx < 0, -C.LEFT_MOVE_PENALTY_PER_PX * (-dx), 0.0)
+    r -= C.IDLE_PENALTY_PER_SEC * idle_weight * dt
+    r += furthest_x_reward
+    r -= np.where(jump, C.JUMP_PENALTY_PER_SEC * dt, 0.0)
+    time_bonus = C.REWARD_TIME_BONUS / np.maximum(0.5, episode_time)
+    r += np.where(reached_exit, C.REWARD_REACH_EXIT + time_bonus, 0.0)
+    r += np.where(fell, C.REWARD_FALL_DEATH, 0.0)
+    r += np.where(reached_timeout, C.TIMEOUT_PENALTY, 0.0)
+    return r
+
+
+class BatchEnv:
+    def __init__(self, n: int, layout_index: int = 0, auto_reset: bool = True):
+        self.n = int(n)
+        self.auto_reset = auto_reset
+        self.layout = build_layout(layout_index)
+        self.layout_index = layout_index
+        lay = self.layout
+        self.plat_x, self.plat_y, self.plat_w, self.plat_h = _rect_arrays(lay.platforms)
+        self.haz_x, self.haz_y, self.haz_w, self.haz_h = _rect_arrays(lay.hazards)
+        self.exit_cx = lay.exit_rect.centerx
+        self.exit_cy = lay.exit_rect.centery
+        self.trigger = tuple(lay.exit_trigger)
+        self.w = C.PLAYER_W
+        self.h = C.PLAYER_H
+
+        n = self.n
+        self.x = np.zeros(n, dtype=np.int64)
+        self.y = np.zeros(n, dtype=np.int64)
+        self.fx = np.zeros(n, dtype=np.float64)
+        self.fy = np.zeros(n, dtype=np.float64)
+        self.vx = np.zeros(n, dtype=np.float64)
+        self.vy = np.zeros(n, dtype=np.float64)
+        self.on_ground = np.zeros(n, dtype=bool)
+        self.time_since_ground = np.zeros(n, dtype=np.float64)
+        self.jump_buffer = np.zeros(n, dtype=np.float64)
+        self.facing = np.ones(n, dtype=np.int8)
+        self.alive = np.ones(n, dtype=bool)
+        self.landed_this_frame = np.zeros(n, dtype=bool)
+        # Per-episode bookkeeping (mirrors Simulation)
+        self.episode_time = np.zeros(n, dtype=np.float64)
+        self.episode_step = np.zeros(n, dtype=np.int64)
+        self.furthest_x = np.zeros(n, dtype=np.int64)
+        # Spikes awarded persist across episodes, like Simulation.awarded_spikes
+        self.awarded_spikes = np.zeros((n, len(lay.hazards)), dtype=bool)
+        self.pending_spike = np.full(n, -1, dtype=np.int64)
+        self.reset()
+
+    def reset(self, mask: np.ndarray | None = None) -> np.ndarray:
+        m = np.ones(self.n, dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        self.x[m] = self.layout.spawn_x
+        self.y[m] = self.layout.spawn_y
+        self.fx[m] = self.x[m]
+        self.fy[m] = self.y[m]
+        self.vx[m] = 0.0
+        self.vy[m] = 0.0
+        self.on_ground[m] = False
+        self.time_since_ground[m] = 0.0
+        self.jump_buffer[m] = 0.0
+        self.facing[m] = 1
+        self.alive[m] = True
+        self.episode_time[m] = 0.0
+        self.episode_step[m] = 0
+        self.furthest_x[m] = 0
+        self.pending_spike[m] = -1
+        return self.get_state()
+
+    # Geometry helpers
+    def _centerx(self) -> np.ndarray:
+        return self.x + self.w // 2
+
+    def _centery(self) -> np.ndarray:
+        return self.y + self.h // 2
+
+    def _dist_to_exit(self) -> np.ndarray:
+        return np.hypot(self.exit_cx - self._centerx(), self.exit_cy - self._centery())
+
+    def _overlaps(self, ox, oy, ow, oh) -> np.ndarray:
+        return ((self.x < ox + ow) & (ox < self.x + self.w)
+                & (self.y < oy + oh) & (oy < self.y + self.h))
+
+    def _touching_hazard(self) -> np.ndarray:
+        hit = np.zeros(self.n, dtype=bool)
+        for i in range(len(self.haz_x)):
+            hit |= self._overlaps(self.haz_x[i], self.haz_y[i], self.haz_w[i], self.haz_h[i])
+        return hit
+
+    def get_state(self) -> np.ndarray:
+        # Vectorized QAgent.get_state
+        dx = self.exit_cx - self._centerx()
+        dy = self.exit_cy - self._centery()
+        sdx = np.clip(np.floor_divide(dx, 64), -30, 30)
+        sdy = np.clip(np.floor_divide(dy, 48), -20, 20)
+        vx = np.where(np.abs(self.vx) > 40, np.sign(self.vx), 0).astype(np.int64)
+        vy = np.where(self.vy < -50, -1, np.where(self.vy > 50, 1, 0))
+        on_g = self.on_ground.astype(np.int64)
+        # Nearby ledge hint, gathered from the layout's baked ledge map
+        under = self.layout.ledge_map.lookup_batch(self._centerx(), self.y + self.h + 8).astype(np.int64)
+        return np.stack([sdx, sdy, vx, vy, on_g, under], axis=1)
+
+    # Physics
+    def _move_axis(self, dx: np.ndarray | None, dy: np.ndarray | None):
+        if dx is not None:
+            moving = dx != 0.0
+            self.fx = np.where(moving, self.fx + dx, self.fx)
+            self.x = np.where(moving, np.trunc(self.fx).astype(np.int64), self.x)
+        if dy is not None:
+            moving = dy != 0.0
+            self.fy = np.where(moving, self.fy + dy, self.fy)
+            self.y = np.where(moving, np.trunc(self.fy).astype(np.int64), self.y)
+            # Ground check reset each Y movement
+            self.on_ground &= ~moving
+
+        for i in range(len(self.plat_x)):
+            px, py, pw, ph = self.plat_x[i], self.plat_y[i], self.plat_w[i], self.plat_h[i]
+            hit = self._overlaps(px, py, pw, ph)
+            if not hit.any():
+                continue
+            if dx is not None:
+                right = hit & (dx > 0)
+                left = hit & (dx < 0)
+                self.x = np.where(right, px - self.w, np.where(left, px + pw, self.x))
+                self.vx = np.where(right | left, 0.0, self.vx)
+            if dy is not None:
+                down = hit & (dy > 0)
+                up = hit & (dy < 0)
+                self.y = np.where(down, py - self.h, np.where(up, py + ph, self.y))
+                self.vy = np.where(down | up, 0.0, self.vy)
+                self.on_ground |= down
+                self.time_since_ground = np.where(down, 0.0, self.time_since_ground)
+
+        self.landed_this_frame = self.on_ground & (dy > 0.0) if dy is not None else np.zeros(self.n, dtype=bool)
+        # Keep float positions in sync after any collision corrections
+        self.fx = self.x.astype(np.float64)
+        self.fy = self.y.astype(np.float64)
+
+    def _update_bodies(self, dt: float, left: np.ndarray, right: np.ndarray, jump: np.ndarray):
+        # Horizontal movement
+        ax = np.where(left, -C.MOVE_ACCEL, 0.0) + np.where(right, C.MOVE_ACCEL, 0.0)
+        self.facing = np.where(right, 1, np.where(left, -1, self.facing)).astype(np.int8)
+
+        # Apply friction and braking
+        no_input = ax == 0.0
+        opposing = ((self.vx > 0) & (ax < 0)) | ((self.vx < 0) & (ax > 0))
+        vx = np.where(no_input, self.vx - self.vx * min(C.FRICTION * dt, 1.0), self.vx)
+        vx = np.where(~no_input & opposing, vx - vx * min(C.FRICTION * C.BRAKE_MULT * dt, 1.0), vx)
+        vx = np.where(~no_input, vx + ax * dt, vx)
+        # Small velocity snap-to-zero to prevent lingering drift
+        vx = np.where(np.abs(vx) < getattr(C, "STOP_EPS", 0.0), 0.0, vx)
+        # Clamp horizontal speed
+        self.vx = np.clip(vx, -C.MAX_SPEED_X, C.MAX_SPEED_X)
+
+        # Jump buffering and coyote time
+        self.time_since_ground += dt
+        self.jump_buffer = np.where(jump, 0.12, np.maximum(0.0, self.jump_buffer - dt))
+        jumping = (self.on_ground | (self.time_since_ground < 0.12)) & (self.jump_buffer > 0.0)
+        self.vy = np.where(jumping, C.JUMP_VELOCITY, self.vy)
+        self.on_ground &= ~jumping
+        self.time_since_ground = np.where(jumping, 0.5, self.time_since_ground)
+        self.jump_buffer = np.where(jumping, 0.0, self.jump_buffer)
+
+        # Gravity
+        self.vy = np.minimum(self.vy + C.GRAVITY * dt, 2000.0)
+
+        # Move and collide: X then Y
+        self._move_axis(self.vx * dt, None)
+        self._move_axis(None, self.vy * dt)
+
+        # Death condition
+        self.alive &= ~(self.y > C.HEIGHT + 200)
+
+    def step(self, actions, dt: float) -> BatchStepResult:
+        actions = np.asarray(actions, dtype=np.int64)
+        left, right, jump = ACTION_LEFT[actions], ACTION_RIGHT[actions], ACTION_JUMP[actions]
+
+        prev_dist = self._dist_to_exit()
+        prev_x = self._centerx()
+
+        self._update_bodies(dt, left, right, jump)
+        self.episode_time += dt
+
+        # Terminal conditions
+        reached_exit = self._overlaps(*self.trigger)
+        died_to_hazard = self._touching_hazard()
+        self.alive &= ~died_to_hazard
+        fell = ~self.alive
+        reached_timeout = self.episode_time >= C.EPISODE_MAX_TIME_SEC
+
+        # Reward
+        new_dist = self._dist_to_exit()
+        new_x = self._centerx()
+        idle_weight = (self.on_ground & (np.abs(self.vx) < 20)).astype(np.float64)
+        ahead = new_x > self.furthest_x
+        furthest_bonus = np.where(ahead, (new_x - self.furthest_x) * C.REWARD_FURTHEST_X_PER_PX, 0.0)
+        self.furthest_x = np.where(ahead, new_x, self.furthest_x)
+        r = compute_reward_batch(
+            prev_dist, new_dist, prev_x, new_x, reached_exit, fell, dt, idle_weight,
+            self.episode_time, reached_timeout, furthest_bonus, jump,
+        )
+        r += np.where(died_to_hazard, C.HAZARD_DEATH_PENALTY, 0.0)
+
+        # Spike clearing: first unawarded spike crossed left-to-right becomes pending,
+        # paid out once the player lands
+        if len(self.haz_x):
+            crossed = ((prev_x[:, None] < self.haz_x[None, :])
+                       & (new_x[:, None] >= (self.haz_x + self.haz_w)[None, :])
+                       & ~self.awarded_spikes)
+            first = np.argmax(crossed, axis=1)
+            newly = (self.pending_spike < 0) & crossed.any(axis=1)
+            self.pending_spike = np.where(newly, first, self.pending_spike)
+            pay = (self.pending_spike >= 0) & self.on_ground
+            idx = np.nonzero(pay)[0]
+            fresh = ~self.awarded_spikes[idx, self.pending_spike[idx]]
+            r[idx[fresh]] += 80.0
+            self.awarded_spikes[idx, self.pending_spike[idx]] = True
+            self.pending_spike[idx] = -1
+
+        self.episode_step += 1
+        done = reached_exit | fell | reached_timeout
+        self.pending_spike[done] = -1
+        res = BatchStepResult(
+            self.get_state(), r, reached_exit, fell, died_to_hazard, reached_timeout, done,
+        )
+        if self.auto_reset and done.any():
+            self.reset(done)
+        return res
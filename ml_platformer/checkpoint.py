@@ -0,0 +1,113 @@
+import os
+import glob
+import time
+import queue
+import threading
+
+from .ai_agent import STATE_BINS, STATE_MIN
+from .qtable_io import save_qtable
+
+# Periodic Q-table checkpoints written off the frame thread. The caller's thread
+# only copies the arrays (a few MB memcpy); a daemon writer thread does the file
+# I/O through qtable_io.save_qtable (temp file, fsync, atomic rename) and then
+# rotates old checkpoints so the newest `keep` remain.
+#
+# Files are named <prefix>-<seq>-<steps>.bin. The sequence number carries on from
+# the newest file already in the directory, so ordering and rotation stay correct
+# across restarts even though agent.steps starts again from 0 in each process.
+
+
+class CheckpointManager:
+    def __init__(self, directory: str, keep: int = 5, every_steps: int = 0, every_seconds: float = 0.0,
+                 prefix: str = "qtable"):
+        self.directory = directory
+        self.keep = max(1, int(keep))
+        self.every_steps = int(every_steps)
+        self.every_seconds = float(every_seconds)
+        self.prefix = prefix
+        self.last_error: Exception | None = None
+        self.written = 0
+        self._last_steps = 0
+        self._last_time = time.perf_counter()
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._seq: int | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.every_steps > 0 or self.every_seconds > 0.0
+
+    def maybe_checkpoint(self, agent) -> bool:
+        # Cheap enough to call every frame; snapshots once an interval has elapsed.
+        # Skipped while an earlier write is still queued, so a slow disk cannot pile up copies.
+        due = self.every_steps > 0 and agent.steps - self._last_steps >= self.every_steps
+        if not due and self.every_seconds > 0.0:
+            due = time.perf_counter() - self._last_time >= self.every_seconds
+        if not due or self._queue.unfinished_tasks:
+            return False
+        self.checkpoint(agent)
+        return True
+
+    def checkpoint(self, agent):
+        # Rotated checkpoint named after the next sequence number and the agent's step count
+        self._last_steps = agent.steps
+        self._last_time = time.perf_counter()
+        if self._seq is None:
+            found = self.checkpoints()
+            self._seq = _sequence(found[-1], self.prefix) if found else 0
+        self._seq += 1
+        path = os.path.join(self.directory, f"{self.prefix}-{self._seq:08d}-{agent.steps:012d}.bin")
+        self._submit(path, agent, rotate=True)
+
+    def save_to(self, agent, path: str):
+        # One-off save (e.g. the S key) through the same writer thread
+        self._submit(path, agent, rotate=False)
+
+    def checkpoints(self) -> list[str]:
+        # Oldest first, by sequence number
+        found = glob.glob(os.path.join(self.directory, f"{self.prefix}-*.bin"))
+        return sorted(found, key=lambda p: (_sequence(p, self.prefix), p))
+
+    def latest(self) -> str | None:
+        found = self.checkpoints()
+        return found[-1] if found else None
+
+    def wait(self):
+        self._queue.join()
+
+    def close(self):
+        # Flush pending writes and stop the writer
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _submit(self, path: str, agent, rotate: bool):
+        q, visits = agent.snapshot()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+            self._thread.start()
+        self._queue.put((path, q, visits, rotate))
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                path, q, visits, rotate = job
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                save_qtable(path, q, visits, STATE_MIN, STATE_BINS)
+                self.written += 1
+                if rotate:
+                    for old in self.checkpoints()[:-self.keep]:
+                        os.remove(old)
+            except Exception as e:
+                self.last_error = e
+            finally:
+                self._queue.task_done()
+
+
+def _sequence(path: str, prefix: str) -> int:
+    # Sequence number of a <prefix>-<seq>-<steps>.bin file name
+    return int(os.path.basename(path)[len(prefix) + 1:].split("-")[0])
@@ -1,3 +1,4 @@
+import os
 import math
 
 # Window
@@ -5,6 +6,7 @@ WIDTH = 960
 HEIGHT = 540
 FPS = 60
 TIME_SCALE = 0.85  # < 1.0 to run simulation a bit slower
+SWEPT_COLLISION = False  # time-of-impact collision; keeps large steps (--speedup) from tunneling
 VSYNC = 0  # 0 to rely on pygame clock; set to 1 to try vsync (may vary by GPU/driver)
 
 # World
@@ -30,8 +32,13 @@ ACTIONS = [
 ]
 AI_UPDATE_EVERY = 1  # frames between AI action decisions (more responsive)
 MIN_ACTION_HOLD_FRAMES = 4  # smooth AI inputs to reduce flicker
+MACRO_FRAMES = MIN_ACTION_HOLD_FRAMES + 1  # frames per decision with --macro (the ai_input hold cadence)
 EPISODE_MAX_STEPS = 2000
 EPISODE_MAX_TIME_SEC = 120.0  # episode time limit to avoid endless runs
+# Experience replay (opt-in with --replay)
+REPLAY_CAPACITY = 100_000
+REPLAY_BATCH = 64
+REPLAY_EVERY = 4  # sim steps per replayed minibatch when there is no frame budget (headless/turbo)
 
 REWARD_REACH_EXIT = 100.0
 REWARD_FALL_DEATH = -50.0
@@ -76,6 +83,14 @@ CAMERA_LERP = 0.1
 LEVEL_WIDTH = 3200
 LEVEL_HEIGHT = HEIGHT
 
+# Rendered asset caches (LRU). Platforms are drawn as LEVEL_CHUNK_W x HEIGHT RGBA
+# tiles (~1.1 MB each, a few visible per frame); a theme's gradient and portal
+# frames take ~2 MB.
+LEVEL_CHUNK_W = 512
+LEVEL_CHUNK_CACHE = 24  # tiles kept across (theme, layout) combinations
+THEME_CACHE_SIZE = 3
+TEXT_CACHE_SIZE = 256  # rendered HUD strings kept by UI
+
 # Sprites
 # If False, the player is drawn programmatically (no external PNG), which avoids
 # any stray edge pixels/artifacts from image scaling.
@@ -84,6 +99,21 @@ DRAW_FACE = False
 DRAW_PLAYER_OUTLINE = False
 DRAW_SHADOW = False
 DRAW_PARTICLES = False
+PARTICLE_CAPACITY = 256  # slots in a player's own particle pool
+
+# Files (kept here rather than in main so display-free tools can import them
+# without loading pygame)
+_HERE = os.path.dirname(__file__)
+SAVE_PATH = os.path.join(_HERE, "qtable.bin")
+# Older runs pickled the table; still loaded when no binary table exists yet
+LEGACY_SAVE_PATH = os.path.join(_HERE, "qtable.pkl")
+LOG_PATH = os.path.join(_HERE, "completion_times.txt")
+EPISODE_LOG_PATH = os.path.join(_HERE, "episode_log.csv")
+EPISODE_COLUMNS = ["episode", "time", "reward", "epsilon", "steps", "reason", "steps_per_sec"]
+# Columnar .npz copies of the episode log (--log-npz)
+EPISODE_NPZ_DIR = os.path.join(_HERE, "episode_chunks")
+PROFILE_LOG_PATH = os.path.join(_HERE, "profile_log.csv")
+CHECKPOINT_DIR = os.path.join(_HERE, "checkpoints")
 
 def ease_in_out_sine(t: float) -> float:
     return -(math.cos(math.pi * t) - 1) / 2
@@ -0,0 +1,79 @@
+import numpy as np
+
+from . import config as C
+from .ai_agent import STATE_BINS, action_input, discretize_state
+from .sim import Body, Simulation, build_layout
+
+# Gym-style wrapper over the display-free core for scripted training and
+# benchmark loops. All episode state (timers, furthest x, spike bonuses) lives
+# in the wrapped Simulation; nothing here touches pygame.
+#
+#   env = PlatformerEnv()
+#   obs, info = env.reset(seed=0, layout=1)
+#   obs, reward, terminated, truncated, info = env.step(2)
+
+
+class PlatformerEnv:
+    n_actions = len(C.ACTIONS)
+    observation_shape = (len(STATE_BINS),)
+
+    def __init__(self, layout: int = 0, dt: float | None = None, frame_skip: int = 1, swept: bool = False,
+                 max_steps: int | None = None):
+        # frame_skip > 1 holds each action for that many frames via Simulation.macro_step;
+        # max_steps truncates after that many step() calls on top of the episode time limit
+        self.dt = (1.0 / C.FPS) * C.TIME_SCALE if dt is None else dt
+        self.frame_skip = max(1, int(frame_skip))
+        self.max_steps = max_steps
+        self.np_random = np.random.default_rng()
+        self.layout = build_layout(layout)
+        self.body = Body(self.layout.spawn_x, self.layout.spawn_y)
+        self.body.swept = self.body.swept or swept
+        self.sim = Simulation(self.layout, self.body)
+        self.steps = 0
+        self._needs_reset = True
+
+    def observe(self) -> np.ndarray:
+        # Same fields as QAgent.get_state: (sdx, sdy, vx, vy, on_ground, under)
+        return np.array(discretize_state(self.body, self.layout), dtype=np.int64)
+
+    def reset(self, seed: int | None = None, layout: int | None = None):
+        # The simulation is deterministic; `seed` reseeds np_random for callers
+        # that sample actions from it. Switching layout forgets awarded spikes.
+        if seed is not None:
+            self.np_random = np.random.default_rng(seed)
+        if layout is not None and layout != self.layout.layout_index:
+            self.layout = build_layout(layout)
+            self.sim.level = self.layout
+            self.sim.awarded_spikes.clear()
+        self.sim.reset()
+        self.steps = 0
+        self._needs_reset = False
+        return self.observe(), self._info()
+
+    def step(self, action: int):
+        if self._needs_reset:
+            raise RuntimeError("episode is over; call reset() first")
+        inp = action_input(int(action))
+        if self.frame_skip == 1:
+            res = self.sim.step(inp, self.dt)
+        else:
+            res = self.sim.macro_step(inp, self.frame_skip, self.dt)
+        self.steps += 1
+        terminated = res.reached_exit or res.fell
+        truncated = not terminated and (res.reached_timeout or (self.max_steps is not None and self.steps >= self.max_steps))
+        self._needs_reset = terminated or truncated
+        info = self._info()
+        info["reached_exit"] = res.reached_exit
+        info["died_to_hazard"] = res.died_to_hazard
+        return self.observe(), res.reward, terminated, truncated, info
+
+    def sample_action(self) -> int:
+        return int(self.np_random.integers(self.n_actions))
+
+    def _info(self) -> dict:
+        return {
+            "layout": self.layout.layout_index,
+            "episode_time": self.sim.episode_time,
+            "episode_step": self.sim.episode_step,
+            "x": self.body.rect.centerx,
+        }
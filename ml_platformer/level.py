@@ -1,6 +1,10 @@
 import random
+from functools import lru_cache
+import numpy as np
 import pygame as pg
 from . import config as C
+from .lru import LRUCache
+from .sim import Rect, build_layout
 
 
 class Level:
@@ -37,74 +41,39 @@ class Level:
 
         # Layouts and geometry
         self.layout_index = 0
-        self.platforms: list[pg.Rect] = []
-        self.hazards: list[pg.Rect] = []
+        self.platforms: list[Rect] = []
+        self.hazards: list[Rect] = []
         self.spawn_x = 40
         self.spawn_y = C.HEIGHT - C.TILE - C.PLAYER_H
-        self.exit_rect = pg.Rect(C.LEVEL_WIDTH - 120, C.HEIGHT - C.TILE * 5 - 48, 48, 96)
+        self.exit_rect = Rect(C.LEVEL_WIDTH - 120, C.HEIGHT - C.TILE * 5 - 48, 48, 96)
         self.exit_trigger = self.exit_rect.inflate(80, 80)
         self._apply_layout(self.layout_index)
 
-        # Cached visuals
-        self.bg_surface = self._make_gradient_surface()
+        # Cached visuals. Theme assets live in an LRU keyed by theme. Platforms are
+        # drawn as LEVEL_CHUNK_W-wide tiles, rendered on first sight and kept in an
+        # LRU keyed by (theme, layout, chunk), so memory is bounded however wide the
+        # level is and rotating back to a seen combination is a lookup.
+        self.theme_cache = LRUCache(C.THEME_CACHE_SIZE)
+        self.chunk_cache = LRUCache(C.LEVEL_CHUNK_CACHE)
+        self.haze_surface = self._make_haze_surface()
         self.cloud_base = self._make_cloud_base()
         self.clouds = self._generate_clouds()
-        self.portal_frames = self._make_portal_frames()
-        self.level_surface = self._build_platform_surface()
+        self._apply_theme_assets()
 
     def _apply_layout(self, idx: int):
-        self.platforms.clear()
-        self.hazards.clear()
-        # Ground
-        ground_h = C.HEIGHT - C.TILE
-        self.platforms.append(pg.Rect(0, ground_h, C.LEVEL_WIDTH, C.TILE))
-
-        # Three curated layouts with different rhythms, fewer mid-air platforms
-        if idx % 3 == 0:
-            rng = random.Random(42)
-            x = 260
-            for i in range(6):
-                y = ground_h - (i % 3) * C.TILE * 2 - rng.randint(0, 1) * C.TILE
-                w = rng.randint(3, 5) * C.TILE
-                self.platforms.append(pg.Rect(x, y, w, C.TILE // 2))
-                x += rng.randint(260, 420)
-            self.platforms.append(pg.Rect(1550, ground_h - C.TILE * 4, C.TILE * 3, C.TILE // 2))
-            self.platforms.append(pg.Rect(2200, ground_h - C.TILE * 3, C.TILE * 5, C.TILE // 2))
-        elif idx % 3 == 1:
-            x = 200
-            for i in range(5):
-                y = ground_h - (i + 1) * (C.TILE * 1.2)
-                self.platforms.append(pg.Rect(x + i * 180, int(y), C.TILE * 3, C.TILE // 2))
-            self.platforms.append(pg.Rect(1400, ground_h - C.TILE * 5, C.TILE * 5, C.TILE // 2))
-            self.platforms.append(pg.Rect(1800, ground_h - C.TILE * 2, C.TILE * 3, C.TILE // 2))
-            self.platforms.append(pg.Rect(2050, ground_h - C.TILE * 3, C.TILE * 2, C.TILE // 2))
-            self.platforms.append(pg.Rect(2300, ground_h - C.TILE * 4, C.TILE * 3, C.TILE // 2))
-            self.platforms.append(pg.Rect(2550, ground_h - C.TILE * 5, C.TILE * 3, C.TILE // 2))
-        else:
-            x = 240
-            for i in range(4):
-                self.platforms.append(pg.Rect(x, ground_h - C.TILE * (2 + (i % 2)), C.TILE * 4, C.TILE // 2))
-                x += 420
-            self.platforms.append(pg.Rect(2200, ground_h - C.TILE * 4, C.TILE * 4, C.TILE // 2))
-            self.platforms.append(pg.Rect(2500, ground_h - C.TILE * 3, C.TILE * 3, C.TILE // 2))
-            self.platforms.append(pg.Rect(2800, ground_h - C.TILE * 2, C.TILE * 3, C.TILE // 2))
-
-        # Exit and spawn placement
-        self.spawn_x = 40
-        self.spawn_y = C.HEIGHT - C.TILE - C.PLAYER_H
-        self.exit_rect = pg.Rect(C.LEVEL_WIDTH - 120, ground_h - C.TILE * 4 - 48, 48, 96)
-        self.exit_trigger = self.exit_rect.inflate(80, 80)
-
-        # Hazards along ground: small spikes to jump over
-        spike_w = 28
-        spike_h = 22
-        gaps = [
-            (520, spike_w), (2000, spike_w), (2420, spike_w)
-        ]
-        for gx, gw in gaps:
-            hx = gx
-            hy = ground_h - spike_h + 2
-            self.hazards.append(pg.Rect(hx, hy, gw, spike_h))
+        # Geometry is built by the display-free core so training and rendering share it
+        layout = build_layout(idx)
+        self.layout = layout
+        self.platforms = layout.platforms
+        self.hazards = layout.hazards
+        # Spatial indexes for collision, hazard and ledge queries
+        self.platform_index = layout.platform_index
+        self.hazard_index = layout.hazard_index
+        self.ledge_map = layout.ledge_map
+        self.spawn_x = layout.spawn_x
+        self.spawn_y = layout.spawn_y
+        self.exit_rect = layout.exit_rect
+        self.exit_trigger = layout.exit_trigger
 
     def _generate_clouds(self):
         rng = random.Random(7)
@@ -116,7 +85,10 @@ class Level:
             scale = rng.uniform(0.5, 1.5)
             w, h = int(180 * scale), int(80 * scale)
             img = pg.transform.smoothscale(self.cloud_base, (w, h)).convert_alpha()
-            clouds.append({"x": cx, "y": cy, "speed": speed, "img": img, "alpha": int(120 + 80 * scale)})
+            alpha = int(120 + 80 * scale)
+            # Apply the cloud's overall alpha once instead of copying it every frame
+            img.set_alpha(alpha)
+            clouds.append({"x": cx, "y": cy, "speed": speed, "img": img, "alpha": alpha})
         return clouds
 
     def update_clouds(self, dt: float):
@@ -126,25 +98,31 @@ class Level:
                 c["x"] = -200
 
     def draw_background(self, surf: pg.Surface, cam_x: float):
-        # Blit cached vertical gradient background
+        # Blit cached gradient + haze, baked once per theme
         surf.blit(self.bg_surface, (0, 0))
 
-        # Add subtle atmospheric haze as a smooth vertical gradient
-        haze = pg.Surface((C.WIDTH, C.HEIGHT), pg.SRCALPHA)
-        for y in range(C.HEIGHT):
-            t = y / max(1, C.HEIGHT - 1)
-            alpha = int(10 + 38 * t)
-            color = (180, 200, 255, alpha)
-            pg.draw.line(haze, color, (0, y), (C.WIDTH, y))
-        surf.blit(haze, (0, 0))
-
-        # Parallax clouds with alpha for depth
+        # Parallax clouds (alpha pre-applied), skipping any outside the viewport
+        view_w = surf.get_width()
         for c in self.clouds:
             px = int(c["x"] - cam_x * 0.4)
-            py = int(c["y"])
-            cloud_img = c["img"].copy()
-            cloud_img.set_alpha(c["alpha"])
-            surf.blit(cloud_img, (px, py))
+            if px >= view_w or px + c["img"].get_width() <= 0:
+                continue
+            surf.blit(c["img"], (px, int(c["y"])))
+
+    def _make_haze_surface(self) -> pg.Surface:
+        # Subtle atmospheric haze as a smooth vertical gradient (theme independent)
+        haze = pg.Surface((C.WIDTH, C.HEIGHT), pg.SRCALPHA)
+        t = np.arange(C.HEIGHT) / max(1, C.HEIGHT - 1)
+        rows = np.empty((C.HEIGHT, 4), dtype=np.int64)
+        rows[:, :3] = (180, 200, 255)
+        rows[:, 3] = (10 + 38 * t).astype(np.int64)
+        _fill_rows(haze, rows)
+        return haze
+
+    def _make_background_surface(self) -> pg.Surface:
+        surf = self._make_gradient_surface()
+        surf.blit(self.haze_surface, (0, 0))
+        return surf.convert()
 
     def _make_cloud_base(self) -> pg.Surface:
         color = (220, 235, 255, 180)
@@ -155,10 +133,18 @@ class Level:
         return cloud.convert_alpha()
 
     def draw_platforms(self, surf: pg.Surface, cam_x: float):
-        # Blit cached platforms; negative x offset scrolls with camera
-        surf.blit(self.level_surface, (-int(cam_x), 0))
-        # Draw hazards on top
-        for h in self.hazards:
+        # Blit only the platform chunks overlapping the view; negative x offset scrolls with camera
+        left = int(cam_x)
+        view_w = surf.get_width()
+        chunk_w = C.LEVEL_CHUNK_W
+        first = max(0, left // chunk_w)
+        last = min((C.LEVEL_WIDTH - 1) // chunk_w, (left + view_w - 1) // chunk_w)
+        for i in range(first, last + 1):
+            surf.blit(self.platform_chunk(i), (i * chunk_w - left, 0))
+        # Draw on-screen hazards on top
+        hazards = self.hazards
+        for k in self.hazard_index.query(left - 1, left + view_w + 1):
+            h = hazards[k]
             r = pg.Rect(h.x - cam_x, h.y, h.w, h.h)
             pg.draw.polygon(
                 surf, C.HAZARD_COLOR,
@@ -170,8 +156,12 @@ class Level:
             )
 
     def draw_exit(self, surf: pg.Surface, cam_x: float, t: float):
-        # Solid beacon behind portal for visibility
+        # Skip everything while the portal's glow is off screen
         portal_center = (self.exit_rect.centerx - cam_x, self.exit_rect.centery)
+        half = max(self.portal_width, self.exit_rect.w + 12) // 2 + 1
+        if portal_center[0] + half < 0 or portal_center[0] - half > surf.get_width():
+            return
+        # Solid beacon behind portal for visibility
         core_radius = 22
         pg.draw.circle(
             surf, (255, 250, 200), (int(portal_center[0]), int(portal_center[1])), core_radius
@@ -190,62 +180,74 @@ class Level:
         base_rect = pg.Rect(
             self.exit_rect.left - cam_x - 6,
             self.exit_rect.bottom - 8,
-            self.exit_rect.width + 12,
+            self.exit_rect.w + 12,
             10,
         )
         pg.draw.rect(surf, (230, 230, 230), base_rect)
 
     def _make_gradient_surface(self) -> pg.Surface:
+        # One row colour per scanline, truncated like int() on the per-channel lerp
         surf = pg.Surface((C.WIDTH, C.HEIGHT)).convert()
-        for y in range(C.HEIGHT):
-            t = y / max(1, C.HEIGHT - 1)
-            top = self.colors["BG_TOP"]
-            bot = self.colors["BG_BOTTOM"]
-            r = int(top[0] + (bot[0] - top[0]) * t)
-            g = int(top[1] + (bot[1] - top[1]) * t)
-            b = int(top[2] + (bot[2] - top[2]) * t)
-            pg.draw.line(surf, (r, g, b), (0, y), (C.WIDTH, y))
+        t = (np.arange(C.HEIGHT) / max(1, C.HEIGHT - 1))[:, None]
+        top = np.array(self.colors["BG_TOP"], dtype=np.float64)
+        bot = np.array(self.colors["BG_BOTTOM"], dtype=np.float64)
+        _fill_rows(surf, (top + (bot - top) * t).astype(np.int64))
         return surf.convert()
 
     def _make_portal_frames(self) -> list[pg.Surface]:
+        # The alpha layout of a frame depends only on its radius (_portal_alpha);
+        # per theme each frame is one lookup from alpha to packed pixel value.
+        # Frames with equal radii share one surface.
         frames: list[pg.Surface] = []
+        by_radius: dict[int, pg.Surface] = {}
         steps = 24
+        col = self.colors["EXIT_COLOR"]
+        fmt = pg.Surface((1, 1), pg.SRCALPHA)
+        lut = np.array([fmt.map_rgb((*col, a)) & 0xFFFFFFFF for a in range(256)], dtype=np.uint32)
+        lut[0] = 0  # pixels no shape touched stay (0, 0, 0, 0)
         for i in range(steps):
             pulse = 0.5 + 0.5 * C.ease_in_out_sine(i / steps)
             radius = int(28 + 8 * pulse)
-            size = radius * 4
-            surf = pg.Surface((size, size), pg.SRCALPHA)
-            center = (size // 2, size // 2)
-            # Glow rings
-            for j in range(6):
-                alpha = int(50 - j * 8)
-                rr = radius + j * 5
-                col = self.colors["EXIT_COLOR"]
-                pg.draw.circle(surf, (*col, max(alpha, 0)), center, rr)
-            # Outline
-            pg.draw.circle(surf, self.colors["EXIT_COLOR"], center, radius, 3)
-            frames.append(surf.convert_alpha())
+            if radius not in by_radius:
+                alpha = _portal_alpha(radius)
+                surf = pg.Surface(alpha.shape[::-1], pg.SRCALPHA)
+                pg.surfarray.pixels2d(surf).T[...] = lut.take(alpha)
+                by_radius[radius] = surf.convert_alpha()
+            frames.append(by_radius[radius])
         return frames
 
-    def _build_platform_surface(self) -> pg.Surface:
-        surf = pg.Surface((C.LEVEL_WIDTH, C.HEIGHT), pg.SRCALPHA).convert_alpha()
-        for r in self.platforms:
-            pg.draw.rect(surf, self.colors["PLATFORM_COLOR"], r, border_radius=6)
-            pg.draw.line(surf, self.colors["PLATFORM_EDGE"], (r.left, r.top), (r.right, r.top), 2)
+    def _build_platform_chunk(self, i: int) -> pg.Surface:
+        # Platforms overlapping [x0, x0 + LEVEL_CHUNK_W), drawn shifted by -x0 so the
+        # pixels match one level-wide surface cut into tiles (the last one is narrower)
+        x0 = i * C.LEVEL_CHUNK_W
+        w = min(C.LEVEL_CHUNK_W, C.LEVEL_WIDTH - x0)
+        surf = pg.Surface((w, C.HEIGHT), pg.SRCALPHA).convert_alpha()
+        for k in self.platform_index.query(x0 - 1, x0 + w + 1):
+            r = self.platforms[k]
+            pg.draw.rect(surf, self.colors["PLATFORM_COLOR"], pg.Rect(r.x - x0, r.y, r.w, r.h), border_radius=6)
+            pg.draw.line(surf, self.colors["PLATFORM_EDGE"], (r.left - x0, r.top), (r.right - x0, r.top), 2)
         return surf
 
+    def platform_chunk(self, i: int) -> pg.Surface:
+        return self.chunk_cache.get_or_build(
+            (self.theme_index, self.layout_index, i), lambda: self._build_platform_chunk(i)
+        )
+
+    def _apply_theme_assets(self):
+        self.bg_surface, self.portal_frames = self.theme_cache.get_or_build(
+            self.theme_index, lambda: (self._make_background_surface(), self._make_portal_frames())
+        )
+        self.portal_width = max(f.get_width() for f in self.portal_frames)
+
     # Public API
     def next_layout(self):
         self.layout_index = (self.layout_index + 1) % 3
         self._apply_layout(self.layout_index)
-        self.level_surface = self._build_platform_surface()
 
     def next_theme(self):
         self.theme_index = (self.theme_index + 1) % len(self.themes)
         self.colors = self.themes[self.theme_index]
-        self.bg_surface = self._make_gradient_surface()
-        self.portal_frames = self._make_portal_frames()
-        self.level_surface = self._build_platform_surface()
+        self._apply_theme_assets()
 
     def reset(self, rotate_layout: bool = False, rotate_theme: bool = False):
         if rotate_layout:
@@ -253,8 +255,44 @@ class Level:
         if rotate_theme:
             self.next_theme()
 
-    def intersects_hazard(self, rect: pg.Rect) -> bool:
-        for h in self.hazards:
-            if rect.colliderect(h):
-                return True
-        return False
+    def intersects_hazard(self, rect) -> bool:
+        return self.layout.intersects_hazard(rect)
+
+    def ledge_under(self, rect) -> int:
+        return self.layout.ledge_under(rect)
+
+
+def _fill_rows(surf: pg.Surface, rows: np.ndarray):
+    # Paint scanline y of `surf` in colour rows[y] (RGB or RGBA), like one full-width
+    # pg.draw.line per row. Each distinct colour is mapped to a pixel value once
+    # (map_rgb returns it signed).
+    colors, inverse = np.unique(rows, axis=0, return_inverse=True)
+    mapped = np.array([surf.map_rgb(tuple(c)) & 0xFFFFFFFF for c in colors.tolist()], dtype=np.uint32)
+    pg.surfarray.pixels2d(surf)[...] = mapped[inverse.reshape(-1)][None, :]
+
+
+@lru_cache(maxsize=16)
+def _portal_alpha(radius: int) -> np.ndarray:
+    # Per-pixel alpha of a portal frame, (y, x) indexed to match surface memory:
+    # six glow discs growing by 5 px, then a 3 px outline at full alpha.
+    # pygame.draw overwrites rather than blends on SRCALPHA surfaces, so each
+    # later shape replaces what it covers.
+    size = radius * 4
+    alpha = np.zeros((size, size), dtype=np.uint8)
+    for j in range(6):
+        alpha[_circle_mask(size, radius + j * 5, 0).T] = max(50 - j * 8, 0)
+    alpha[_circle_mask(size, radius, 3).T] = 255
+    alpha.flags.writeable = False
+    return alpha
+
+
+@lru_cache(maxsize=64)
+def _circle_mask(size: int, radius: int, width: int) -> np.ndarray:
+    # Pixels pygame.draw.circle covers at the centre of a size x size surface, as a
+    # read-only (x, y) boolean array. Rasterized by pygame once per shape so the
+    # masks match its circle algorithm exactly.
+    surf = pg.Surface((size, size), pg.SRCALPHA)
+    pg.draw.circle(surf, (255, 255, 255, 255), (size // 2, size // 2), radius, width)
+    mask = pg.surfarray.array_alpha(surf) > 0
+    mask.flags.writeable = False
+    return mask
@@ -0,0 +1,36 @@
+from collections import OrderedDict
+
+# Small size-bounded cache with least-recently-used eviction, for rendered
+# assets that are expensive to build but cheap to keep a few of.
+
+
+class LRUCache:
+    def __init__(self, maxsize: int):
+        self.maxsize = max(1, int(maxsize))
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict = OrderedDict()
+
+    def get_or_build(self, key, build):
+        # Cached value for `key`, or build() stored under it (evicting the oldest)
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            value = build()
+            self._items[key] = value
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+            return value
+        self.hits += 1
+        self._items.move_to_end(key)
+        return value
+
+    def clear(self):
+        self._items.clear()
+
+    def __contains__(self, key) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -0,0 +1,292 @@
+import os
+import csv
+import time
+import argparse
+import multiprocessing as mp
+import numpy as np
+
+from . import config as C
+from .config import EPISODE_COLUMNS, SAVE_PATH
+from .ai_agent import QAgent
+from .training import Session, ai_input, fixed_step
+from .sim import Body, Simulation, build_layout
+from .shared_qtable import SHAPE, attach_shared_table, create_shared_table, table_views
+
+# Parallel trainer: N worker processes each run their own seeded agent and
+# headless simulation. Training proceeds in synchronous rounds: every worker
+# steps `sync_every` times, sends the coordinator the Q-value deltas and visit
+# counts for the rows it touched, and waits for the merged rows to come back.
+# Only touched rows cross the pipe, so a round costs kilobytes, not the table.
+#
+# train_shared is the lock-free alternative: all learners attach to one
+# shared-memory Q-table and update it in place (Hogwild), with nothing pickled.
+
+PARALLEL_LOG_PATH = os.path.join(os.path.dirname(__file__), "episode_log_parallel.csv")
+PARALLEL_COLUMNS = EPISODE_COLUMNS + ["worker"]
+_REASON = EPISODE_COLUMNS.index("reason")
+
+
+def merge_deltas(q: np.ndarray, visits: np.ndarray, deltas) -> np.ndarray:
+    # Visit-weighted average of worker updates: each worker's table is the shared
+    # base plus its own dq, so the average is base + sum(n_w * dq_w) / sum(n_w).
+    # Returns the sorted rows that changed.
+    touched = np.unique(np.concatenate([rows for rows, _, _ in deltas])) if deltas else np.empty(0, np.int64)
+    if touched.size == 0:
+        return touched
+    weighted = np.zeros((touched.size, q.shape[1]), dtype=np.float64)
+    counts = np.zeros((touched.size, q.shape[1]), dtype=np.float64)
+    for rows, dq, dv in deltas:
+        pos = np.searchsorted(touched, rows)
+        weighted[pos] += dq * dv
+        counts[pos] += dv
+    seen = counts > 0
+    base = q[touched].astype(np.float64)
+    base[seen] += weighted[seen] / counts[seen]
+    q[touched] = base
+    visits[touched] += counts.astype(visits.dtype)
+    return touched
+
+
+def _worker(wid: int, conn, layout_index: int, seed: int, sync_every: int, dt: float):
+    layout = build_layout(layout_index)
+    body = Body(layout.spawn_x, layout.spawn_y)
+    sim = Simulation(layout, body)
+    agent = QAgent(seed=seed + wid)
+    session = Session(training=True, ai_control=True)
+    rows: list[dict] = []
+    while True:
+        base_q = agent.q.copy()
+        base_visits = agent.visits.copy()
+        t0 = time.perf_counter()
+        for _ in range(sync_every):
+            inp = ai_input(session, agent, body, layout)
+            fixed_step(session, sim, agent, inp, dt, log_episode=rows.append)
+        elapsed = time.perf_counter() - t0
+
+        dv = agent.visits - base_visits
+        touched = np.flatnonzero(dv.any(axis=1))
+        conn.send((touched, agent.q[touched] - base_q[touched], dv[touched], rows, elapsed))
+        rows = []
+
+        msg = conn.recv()
+        if msg is None:
+            break
+        merged_rows, merged_q = msg
+        agent.q[merged_rows] = merged_q
+        # Local visits track this worker only; the coordinator owns the global counts
+    conn.close()
+
+
+def train_parallel(workers: int = 4, layout_index: int = 0, seed: int = 123, sync_every: int = 2000,
+                   max_rounds: int = 100, target_time: float | None = None, fps: int = 60,
+                   log_path: str | None = PARALLEL_LOG_PATH, save_path: str | None = None) -> dict:
+    dt = (1.0 / max(1, int(fps))) * C.TIME_SCALE
+
+    q = np.zeros(SHAPE, dtype=np.float32)
+    visits = np.zeros(q.shape, dtype=np.uint32)
+
+    ctx = mp.get_context()
+    conns, procs = [], []
+    for wid in range(workers):
+        parent, child = ctx.Pipe()
+        p = ctx.Process(target=_worker, args=(wid, child, layout_index, seed, sync_every, dt), daemon=True)
+        p.start()
+        child.close()
+        conns.append(parent)
+        procs.append(p)
+
+    log_file = None
+    writer = None
+    if log_path:
+        log_file = open(log_path, "w", newline="", encoding="utf-8")
+        writer = csv.writer(log_file)
+        writer.writerow(PARALLEL_COLUMNS)
+
+    t_start = time.perf_counter()
+    best_time = None
+    time_to_target = None
+    episodes = 0
+    rounds = 0
+    sim_seconds = 0.0
+    try:
+        while rounds < max_rounds:
+            deltas = []
+            for wid, conn in enumerate(conns):
+                touched, dq, dv, rows, elapsed = conn.recv()
+                deltas.append((touched, dq, dv))
+                sim_seconds += elapsed
+                for row in rows:
+                    episodes += 1
+                    if writer is not None:
+                        writer.writerow([row.get(k) for k in EPISODE_COLUMNS] + [wid])
+                    if row["reason"] == "exit":
+                        t = float(row["time"])
+                        if best_time is None or t < best_time:
+                            best_time = t
+            rounds += 1
+            merged = merge_deltas(q, visits, deltas)
+            if target_time is not None and best_time is not None and best_time <= target_time:
+                time_to_target = time.perf_counter() - t_start
+                break
+            if rounds >= max_rounds:
+                break
+            payload = (merged, q[merged])
+            for conn in conns:
+                conn.send(payload)
+    finally:
+        for conn in conns:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for p in procs:
+            p.join(timeout=5)
+        if log_file is not None:
+            log_file.close()
+
+    if save_path:
+        agent = QAgent()
+        agent.q, agent.visits = q, visits
+        agent.save(save_path)
+
+    wall = time.perf_counter() - t_start
+    return {
+        "workers": workers,
+        "rounds": rounds,
+        "steps": rounds * workers * sync_every,
+        "episodes": episodes,
+        "best_time": best_time,
+        "time_to_target": time_to_target,
+        "wall_seconds": wall,
+        "worker_seconds": sim_seconds,
+        "steps_per_sec": rounds * workers * sync_every / max(wall, 1e-9),
+        "q": q,
+        "visits": visits,
+    }
+
+
+def _shared_worker(wid: int, shm_name: str, results, layout_index: int, seed: int, steps: int, dt: float):
+    shm = attach_shared_table(shm_name)
+    layout = build_layout(layout_index)
+    body = Body(layout.spawn_x, layout.spawn_y)
+    sim = Simulation(layout, body)
+    agent = QAgent(seed=seed + wid, shared_buf=shm.buf)
+    session = Session(training=True, ai_control=True)
+    rows: list[dict] = []
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        inp = ai_input(session, agent, body, layout)
+        fixed_step(session, sim, agent, inp, dt, log_episode=rows.append)
+    elapsed = time.perf_counter() - t0
+    results.put((wid, rows, agent.steps, elapsed))
+    # Views into the block must go before it can be closed
+    del agent
+    shm.close()
+
+
+def train_shared(workers: int = 4, steps: int = 20000, layout_index: int = 0, seed: int = 123, fps: int = 60,
+                 log_path: str | None = PARALLEL_LOG_PATH, save_path: str | None = None) -> dict:
+    dt = (1.0 / max(1, int(fps))) * C.TIME_SCALE
+    shm = create_shared_table()
+    ctx = mp.get_context()
+    results = ctx.Queue()
+    t_start = time.perf_counter()
+    procs = [
+        ctx.Process(target=_shared_worker, args=(wid, shm.name, results, layout_index, seed, steps, dt), daemon=True)
+        for wid in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    try:
+        done = [results.get() for _ in procs]
+        for p in procs:
+            p.join(timeout=5)
+        wall = time.perf_counter() - t_start
+        q_view, visits_view = table_views(shm.buf)
+        q, visits = q_view.copy(), visits_view.copy()
+        del q_view, visits_view
+    finally:
+        shm.close()
+        shm.unlink()
+
+    best_time = None
+    episodes = 0
+    updates = 0
+    writer_rows = []
+    for wid, rows, n_updates, _ in sorted(done, key=lambda d: d[0]):
+        updates += n_updates
+        for row in rows:
+            episodes += 1
+            writer_rows.append([row.get(k) for k in EPISODE_COLUMNS] + [wid])
+            if row["reason"] == "exit":
+                t = float(row["time"])
+                if best_time is None or t < best_time:
+                    best_time = t
+    if log_path:
+        with open(log_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(PARALLEL_COLUMNS)
+            writer.writerows(writer_rows)
+
+    if save_path:
+        agent = QAgent()
+        agent.q, agent.visits = q, visits
+        agent.save(save_path)
+
+    return {
+        "workers": workers,
+        "steps": workers * steps,
+        "updates": updates,
+        "episodes": episodes,
+        "exits": sum(1 for r in writer_rows if r[_REASON] == "exit"),
+        "best_time": best_time,
+        "wall_seconds": wall,
+        "worker_seconds": sum(d[3] for d in done),
+        "steps_per_sec": workers * steps / max(wall, 1e-9),
+        "updates_per_sec": updates / max(wall, 1e-9),
+        "q": q,
+        "visits": visits,
+    }
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="ML Platformer - parallel Q-learning")
+    p.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1), help="Worker processes")
+    p.add_argument("--layout", type=int, default=0, help="Layout index every worker trains on")
+    p.add_argument("--seed", type=int, default=123, help="Base seed; worker i uses seed + i")
+    p.add_argument("--sync-every", type=int, default=2000, help="Sim steps per worker between merges")
+    p.add_argument("--rounds", type=int, default=100, help="Maximum merge rounds")
+    p.add_argument("--target-time", type=float, default=None, help="Stop once any worker reaches the exit this fast (s)")
+    p.add_argument("--fps", type=int, default=60, help="Fixed step is (1/fps) * TIME_SCALE, as in the game")
+    p.add_argument("--log", default=PARALLEL_LOG_PATH, help="Episode CSV (episode_log.csv columns + worker)")
+    p.add_argument("--save", action="store_true", help=f"Save the merged Q-table to {SAVE_PATH}")
+    p.add_argument("--shared", action="store_true",
+                   help="Hogwild: learners update one shared-memory table directly for --rounds x --sync-every steps each")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.shared:
+        res = train_shared(
+            workers=args.workers, steps=args.rounds * args.sync_every, layout_index=args.layout, seed=args.seed,
+            fps=args.fps, log_path=args.log, save_path=SAVE_PATH if args.save else None,
+        )
+        best = "—" if res["best_time"] is None else f"{res['best_time']:.2f}s"
+        print(f"workers={res['workers']} updates={res['updates']} episodes={res['episodes']} best={best}")
+        print(f"wall={res['wall_seconds']:.1f}s updates/s={res['updates_per_sec']:.0f}")
+        return
+    res = train_parallel(
+        workers=args.workers, layout_index=args.layout, seed=args.seed, sync_every=args.sync_every,
+        max_rounds=args.rounds, target_time=args.target_time, fps=args.fps, log_path=args.log,
+        save_path=SAVE_PATH if args.save else None,
+    )
+    best = "—" if res["best_time"] is None else f"{res['best_time']:.2f}s"
+    print(f"workers={res['workers']} rounds={res['rounds']} episodes={res['episodes']} best={best}")
+    print(f"wall={res['wall_seconds']:.1f}s steps/s={res['steps_per_sec']:.0f}")
+    if res["time_to_target"] is not None:
+        print(f"target reached after {res['time_to_target']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
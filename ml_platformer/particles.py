@@ -0,0 +1,120 @@
+import numpy as np
+import pygame as pg
+from . import config as C
+
+# Fixed-capacity particle pool stored as parallel NumPy arrays (struct of arrays).
+# Live particles occupy slots [0, count). update() integrates all of them at once,
+# then moves live particles from the tail into the slots of dead ones
+# (swap-remove), so a frame allocates nothing per particle. Several players can
+# emit into one pool under their own owner ids; whoever owns the pool then updates
+# and draws it once per frame.
+#
+# Particles are drawn by blitting one cached circle stamp per (colour, radius)
+# in a single Surface.blits call. The stamps are opaque: pygame ignores the
+# alpha of draw colours on the (alpha-less) screen, so the fade never showed.
+
+COLORS = ((255, 255, 255), (200, 220, 240))
+JUMP_COLOR, LAND_COLOR = 0, 1
+
+
+class ParticlePool:
+    def __init__(self, capacity: int = C.PARTICLE_CAPACITY):
+        self.capacity = int(capacity)
+        self.count = 0
+        self.dropped = 0  # particles not emitted because the pool was full
+        self.x = np.zeros(self.capacity)
+        self.y = np.zeros(self.capacity)
+        self.vx = np.zeros(self.capacity)
+        self.vy = np.zeros(self.capacity)
+        self.r = np.zeros(self.capacity)
+        self.life = np.zeros(self.capacity)
+        self.color = np.zeros(self.capacity, dtype=np.uint8)
+        self.owner = np.zeros(self.capacity, dtype=np.int32)
+        self._columns = (self.x, self.y, self.vx, self.vy, self.r, self.life, self.color, self.owner)
+        self._owners = 0
+        self._stamps: dict[tuple[int, int], pg.Surface] = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def new_owner(self) -> int:
+        # Id for one emitter sharing this pool (used by clear(owner))
+        self._owners += 1
+        return self._owners
+
+    def emit(self, owner: int, x, y, vx: np.ndarray, vy: np.ndarray, r: float, color: int) -> int:
+        # Append len(vx) particles at full life; x and y may be scalars or arrays.
+        # Returns how many fit.
+        total = len(vx)
+        n = min(total, self.capacity - self.count)
+        self.dropped += total - n
+        if n <= 0:
+            return 0
+        s = slice(self.count, self.count + n)
+        self.x[s] = np.broadcast_to(x, (total,))[:n]
+        self.y[s] = np.broadcast_to(y, (total,))[:n]
+        self.vx[s] = vx[:n]
+        self.vy[s] = vy[:n]
+        self.r[s] = r
+        self.life[s] = 1.0
+        self.color[s] = color
+        self.owner[s] = owner
+        self.count += n
+        return n
+
+    def update(self, dt: float):
+        n = self.count
+        if not n:
+            return
+        x, y, vx, vy = self.x[:n], self.y[:n], self.vx[:n], self.vy[:n]
+        r, life = self.r[:n], self.life[:n]
+        x += vx * dt
+        y += vy * dt
+        vy += C.GRAVITY * 0.6 * dt
+        life -= dt * 1.6
+        np.maximum(r - dt * 4, 1, out=r)
+        self._keep(life > 0)
+
+    def clear(self, owner: int | None = None):
+        # Drop every particle, or only those emitted under `owner`
+        if owner is None:
+            self.count = 0
+        elif self.count:
+            self._keep(self.owner[:self.count] != owner)
+
+    def _keep(self, alive: np.ndarray):
+        # Swap-remove: dead slots below the new count take the live particles above it
+        k = int(np.count_nonzero(alive))
+        if k == self.count:
+            return
+        holes = np.flatnonzero(~alive[:k])
+        movers = k + np.flatnonzero(alive[k:])
+        for col in self._columns:
+            col[holes] = col[movers]
+        self.count = k
+
+    def draw(self, surf: pg.Surface, cam_x: float):
+        n = self.count
+        if not n:
+            return
+        # Same integer centre/radius as pg.draw.circle((int(x - cam_x), int(y)), int(r))
+        xs = (self.x[:n] - cam_x).astype(np.int64)
+        ys = self.y[:n].astype(np.int64)
+        rs = self.r[:n].astype(np.int64)
+        w, h = surf.get_size()
+        vis = (xs + rs > 0) & (xs - rs < w) & (ys + rs > 0) & (ys - rs < h)
+        if not vis.any():
+            return
+        rs = rs[vis]
+        keys = self.color[:n][vis].astype(np.int64) << 16 | rs
+        stamps = [self._stamp(k) for k in keys.tolist()]
+        surf.blits(zip(stamps, zip((xs[vis] - rs).tolist(), (ys[vis] - rs).tolist())), doreturn=False)
+
+    def _stamp(self, key: int) -> pg.Surface:
+        stamp = self._stamps.get(key)
+        if stamp is None:
+            color, r = key >> 16, key & 0xFFFF
+            stamp = pg.Surface((2 * r, 2 * r), pg.SRCALPHA)
+            pg.draw.circle(stamp, COLORS[color], (r, r), r)
+            self._stamps[key] = stamp
+        return stamp
@@ -1,28 +1,27 @@
+import numpy as np
 import pygame as pg
-from dataclasses import dataclass
 from . import config as C
-
-
-@dataclass
-class InputState:
-    left: bool = False
-    right: bool = False
-    jump: bool = False
-
-
-class Player:
-    def __init__(self, spawn_x: int, spawn_y: int):
-        self.rect = pg.Rect(spawn_x, spawn_y, C.PLAYER_W, C.PLAYER_H)
-        # Subpixel position accumulators to avoid truncation-induced stickiness
-        self._fx = float(self.rect.x)
-        self._fy = float(self.rect.y)
-        self.vel = pg.Vector2(0, 0)
-        self.on_ground = False
-        self.time_since_ground = 0.0
-        self.jump_buffer = 0.0
-        self.facing = 1
-        self.alive = True
-        self.particles = []
+from .particles import JUMP_COLOR, LAND_COLOR, ParticlePool
+from .sim import Body, InputState
+
+# Particle emission templates (one entry per particle)
+_JUMP_I = np.arange(4)
+JUMP_VX = (_JUMP_I - 4) * 30.0
+JUMP_VY = -120.0 - _JUMP_I * 10.0
+_LAND_I = np.arange(5)
+LAND_DX = (_LAND_I - 5) * 2.0
+LAND_VX = (_LAND_I - 5) * 40.0
+LAND_VY = -80.0 - np.abs(_LAND_I - 5) * 10.0
+
+
+class Player(Body):
+    def __init__(self, spawn_x: int, spawn_y: int, particles: ParticlePool | None = None):
+        super().__init__(spawn_x, spawn_y)
+        # Without a pool the player keeps, updates and draws its own. A pool passed
+        # in may be shared by several players; its owner updates and draws it once.
+        self._own_particles = particles is None
+        self.particles = ParticlePool() if particles is None else particles
+        self.particle_owner = self.particles.new_owner()
         # Sprite (optional)
         self._base_sprite = None
         self.sprite = None
@@ -38,15 +37,8 @@ class Player:
         self.last_input = InputState()
 
     def reset(self, spawn_x: int, spawn_y: int):
-        self.rect.x, self.rect.y = spawn_x, spawn_y
-        self._fx, self._fy = float(self.rect.x), float(self.rect.y)
-        self.vel.update(0, 0)
-        self.on_ground = False
-        self.time_since_ground = 0.0
-        self.jump_buffer = 0.0
-        self.facing = 1
-        self.alive = True
-        self.particles.clear()
+        super().reset(spawn_x, spawn_y)
+        self.particles.clear(self.particle_owner)
         # Ensure sprite matches rect size on reset
         if self._base_sprite:
             scaled = pg.transform.scale(self._base_sprite, (self.rect.w, self.rect.h))
@@ -54,100 +46,17 @@ class Player:
 
     def update(self, dt: float, level, inp: InputState):
         self.last_input = inp
-        # Horizontal movement
-        ax = 0.0
-        if inp.left:
-            ax -= C.MOVE_ACCEL
-            self.facing = -1
-        if inp.right:
-            ax += C.MOVE_ACCEL
-            self.facing = 1
-
-        # Apply friction and braking
-        if ax == 0.0:
-            # no input: regular friction
-            self.vel.x -= self.vel.x * min(C.FRICTION * dt, 1.0)
-        else:
-            # input present
-            # if input opposes current velocity, apply stronger braking
-            if (self.vel.x > 0 and ax < 0) or (self.vel.x < 0 and ax > 0):
-                self.vel.x -= self.vel.x * min(C.FRICTION * C.BRAKE_MULT * dt, 1.0)
-            self.vel.x += ax * dt
-        # Small velocity snap-to-zero to prevent lingering drift
-        if abs(self.vel.x) < getattr(C, "STOP_EPS", 0.0):
-            self.vel.x = 0.0
-
-        # Clamp horizontal speed
-        if self.vel.x > C.MAX_SPEED_X:
-            self.vel.x = C.MAX_SPEED_X
-        if self.vel.x < -C.MAX_SPEED_X:
-            self.vel.x = -C.MAX_SPEED_X
-
-        # Jump buffering and coyote time
-        self.time_since_ground += dt
-        if inp.jump:
-            self.jump_buffer = 0.12
-        else:
-            self.jump_buffer = max(0.0, self.jump_buffer - dt)
-
-        if (self.on_ground or self.time_since_ground < 0.12) and self.jump_buffer > 0.0:
-            self.vel.y = C.JUMP_VELOCITY
-            self.on_ground = False
-            self.time_since_ground = 0.5  # prevent double-coyote
-            self.jump_buffer = 0.0
-            self._emit_jump_particles()
-
-        # Gravity
-        self.vel.y += C.GRAVITY * dt
-        if self.vel.y > 2000:
-            self.vel.y = 2000
-
-        # Move and collide: X then Y
-        self._move_axis(level.platforms, self.vel.x * dt, 0.0)
-        self._move_axis(level.platforms, 0.0, self.vel.y * dt)
-
-        # Death condition
-        if self.rect.top > C.HEIGHT + 200:
-            self.alive = False
-
+        # Physics lives in the display-free core
+        super().update(dt, level, inp)
         # Particles update
-        self._update_particles(dt)
-
-    def _move_axis(self, platforms, dx: float, dy: float):
-        if dx != 0.0:
-            self._fx += dx
-            self.rect.x = int(self._fx)
-        if dy != 0.0:
-            self._fy += dy
-            self.rect.y = int(self._fy)
-
-        # Ground check reset each Y movement
-        if dy != 0.0:
-            self.on_ground = False
+        if self._own_particles:
+            self._update_particles(dt)
 
-        for p in platforms:
-            if self.rect.colliderect(p):
-                if dx > 0:
-                    self.rect.right = p.left
-                    self.vel.x = 0
-                elif dx < 0:
-                    self.rect.left = p.right
-                    self.vel.x = 0
-                if dy > 0:
-                    self.rect.bottom = p.top
-                    self.vel.y = 0
-                    if not getattr(self, "_landed_this_frame", False):
-                        self._emit_land_particles(abs(self.vel.x))
-                    self.on_ground = True
-                    self.time_since_ground = 0.0
-                elif dy < 0:
-                    self.rect.top = p.bottom
-                    self.vel.y = 0
+    def _on_jump(self):
+        self._emit_jump_particles()
 
-        self._landed_this_frame = self.on_ground and dy > 0.0
-        # Keep float positions in sync after any collision corrections
-        self._fx = float(self.rect.x)
-        self._fy = float(self.rect.y)
+    def _on_land(self, speed_x: float):
+        self._emit_land_particles(speed_x)
 
     def draw(self, surf: pg.Surface, cam_x: float, t: float):
         # Shadow (optional)
@@ -172,54 +81,25 @@ class Player:
             pg.draw.circle(surf, (40, 40, 40), (eye_x - cam_x, eye_y), 4)
 
         # Particles
-        if getattr(C, "DRAW_PARTICLES", True):
-            for part in self.particles:
-                alpha = max(0, int(255 * part["life"]))
-                col = (*part["color"], alpha)
-                pg.draw.circle(surf, col, (int(part["x"] - cam_x), int(part["y"])), int(part["r"]))
+        if self._own_particles and getattr(C, "DRAW_PARTICLES", True):
+            self.particles.draw(surf, cam_x)
 
     def _emit_jump_particles(self):
         if not getattr(C, "DRAW_PARTICLES", True):
             return
-        for i in range(4):
-            self.particles.append({
-                "x": self.rect.centerx,
-                "y": self.rect.bottom,
-                "vx": (i - 4) * 30,
-                "vy": -120 - i * 10,
-                "r": 3,
-                "life": 1.0,
-                "color": (255, 255, 255)
-            })
+        self.particles.emit(self.particle_owner, self.rect.centerx, self.rect.bottom, JUMP_VX, JUMP_VY, 3, JUMP_COLOR)
 
     def _emit_land_particles(self, speed_x: float):
         if speed_x < 60 or not getattr(C, "DRAW_PARTICLES", True):
             return
-        for i in range(5):
-            self.particles.append({
-                "x": self.rect.centerx + (i - 5) * 2,
-                "y": self.rect.bottom + 1,
-                "vx": (i - 5) * 40,
-                "vy": -80 - abs(i - 5) * 10,
-                "r": 3,
-                "life": 1.0,
-                "color": (200, 220, 240)
-            })
+        self.particles.emit(self.particle_owner, self.rect.centerx + LAND_DX, self.rect.bottom + 1,
+                            LAND_VX, LAND_VY, 3, LAND_COLOR)
 
     def _update_particles(self, dt: float):
         if not getattr(C, "DRAW_PARTICLES", True):
-            self.particles.clear()
+            self.particles.clear(self.particle_owner)
             return
-        alive = []
-        for p in self.particles:
-            p["x"] += p["vx"] * dt
-            p["y"] += p["vy"] * dt
-            p["vy"] += C.GRAVITY * 0.6 * dt
-            p["life"] -= dt * 1.6
-            p["r"] = max(1, p["r"] - dt * 4)
-            if p["life"] > 0:
-                alive.append(p)
-        self.particles = alive
+        self.particles.update(dt)
 
     def _apply_rect_mask(self, surf: pg.Surface) -> pg.Surface:
         # Simple, robust rounded-rect mask to keep edges clean
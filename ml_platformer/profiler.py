@@ -0,0 +1,73 @@
+import os
+import csv
+import time
+import numpy as np
+
+# Per-phase frame profiler. Call sites time a phase with two perf_counter() reads
+# and add() the difference; end_frame() pushes the frame's per-phase totals into
+# a fixed ring, from which rolling p50/p95/max are computed. Every call site is
+# guarded by `if profiler is not None`, so with profiling off the loop pays one
+# None check per phase.
+
+PHASES = ("input", "decision", "physics", "reward", "learn", "replay", "logging", "render")
+CSV_COLUMNS = ["timestamp", "phase", "p50_ms", "p95_ms", "max_ms", "frames"]
+
+
+class FrameProfiler:
+    def __init__(self, window: int = 300, csv_path: str | None = None, flush_every_sec: float = 5.0):
+        self.window = window
+        self.samples = np.zeros((window, len(PHASES)), dtype=np.float64)
+        self.frames = 0
+        self._current = [0.0] * len(PHASES)
+        self._slot = {name: i for i, name in enumerate(PHASES)}
+        self.csv_path = csv_path
+        self.flush_every_sec = flush_every_sec
+        self._last_flush = time.perf_counter()
+        self._stats = None
+        self._stats_at = 0.0
+
+    def add(self, phase: str, seconds: float):
+        self._current[self._slot[phase]] += seconds
+
+    def end_frame(self):
+        self.samples[self.frames % self.window] = self._current
+        self._current = [0.0] * len(PHASES)
+        self.frames += 1
+        if self.csv_path is not None:
+            now = time.perf_counter()
+            if now - self._last_flush >= self.flush_every_sec:
+                self._last_flush = now
+                self.flush()
+
+    def stats(self, max_age: float = 0.5) -> dict:
+        # {phase: (p50_ms, p95_ms, max_ms)} over the window; recomputed at most every max_age seconds
+        now = time.perf_counter()
+        if self._stats is None or now - self._stats_at >= max_age:
+            n = min(self.frames, self.window)
+            out = {}
+            if n:
+                ms = self.samples[:n] * 1000.0
+                p50, p95 = np.percentile(ms, [50, 95], axis=0)
+                mx = ms.max(axis=0)
+                for i, name in enumerate(PHASES):
+                    out[name] = (float(p50[i]), float(p95[i]), float(mx[i]))
+            self._stats = out
+            self._stats_at = now
+        return self._stats
+
+    def flush(self):
+        stats = self.stats(max_age=0.0)
+        if not stats:
+            return
+        try:
+            new_file = not os.path.exists(self.csv_path)
+            with open(self.csv_path, "a", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                if new_file:
+                    w.writerow(CSV_COLUMNS)
+                ts = f"{time.time():.3f}"
+                n = min(self.frames, self.window)
+                for name, (p50, p95, mx) in stats.items():
+                    w.writerow([ts, name, f"{p50:.4f}", f"{p95:.4f}", f"{mx:.4f}", n])
+        except Exception:
+            pass
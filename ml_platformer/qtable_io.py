@@ -0,0 +1,111 @@
+import os
+import sys
+import pickle
+import struct
+import tempfile
+import numpy as np
+
+# Versioned binary Q-table file:
+#   [0, 128)   header: magic, version, header size, n_actions, n_fields,
+#              state_min[6], state_bins[6] (little-endian int32), zero padded
+#   [128, ..)  q      float32 (n_states, n_actions), C order
+#   [.., end)  visits uint32  (n_states, n_actions), C order
+# Both arrays are plain flat buffers, so np.memmap opens them without copying.
+
+MAGIC = b"MLPQTAB\0"
+VERSION = 1
+HEADER_SIZE = 128
+_HEADER = struct.Struct("<8sIIII6i6i")
+Q_DTYPE = np.dtype("<f4")
+VISITS_DTYPE = np.dtype("<u4")
+
+
+def _pack_header(state_min, state_bins, n_actions: int) -> bytes:
+    head = _HEADER.pack(MAGIC, VERSION, HEADER_SIZE, n_actions, len(state_bins), *state_min, *state_bins)
+    return head.ljust(HEADER_SIZE, b"\0")
+
+
+def read_header(path: str) -> dict:
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < _HEADER.size or raw[:8] != MAGIC:
+        raise ValueError(f"{path} is not a binary Q-table")
+    magic, version, header_size, n_actions, n_fields, *rest = _HEADER.unpack_from(raw)
+    if version != VERSION:
+        raise ValueError(f"{path}: unsupported Q-table version {version}")
+    return {
+        "version": version,
+        "header_size": header_size,
+        "n_actions": n_actions,
+        "state_min": tuple(rest[:n_fields]),
+        "state_bins": tuple(rest[6:6 + n_fields]),
+    }
+
+
+def is_binary_qtable(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def save_qtable(path: str, q: np.ndarray, visits: np.ndarray, state_min, state_bins):
+    # Write to a temp file next to the target, then atomically swap it in so a
+    # crash mid-save never leaves a truncated table behind
+    n_states, n_actions = q.shape
+    if n_states != int(np.prod(state_bins)) or visits.shape != q.shape:
+        raise ValueError("Q-table shape does not match the state encoding")
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".qtable-", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_pack_header(state_min, state_bins, n_actions))
+            f.write(memoryview(np.ascontiguousarray(q, dtype=Q_DTYPE)))
+            f.write(memoryview(np.ascontiguousarray(visits, dtype=VISITS_DTYPE)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def load_qtable(path: str, state_min, state_bins, n_actions: int, mode: str = "c"):
+    # Returns (q, visits) memmaps. The default copy-on-write mode maps the file
+    # without reading it; pages are only copied once the agent writes to them.
+    hdr = read_header(path)
+    if hdr["state_min"] != tuple(state_min) or hdr["state_bins"] != tuple(state_bins) or hdr["n_actions"] != n_actions:
+        raise ValueError(f"{path}: Q-table was saved with a different state encoding")
+    shape = (int(np.prod(state_bins)), n_actions)
+    q = np.memmap(path, dtype=Q_DTYPE, mode=mode, offset=hdr["header_size"], shape=shape)
+    visits_offset = hdr["header_size"] + q.nbytes
+    visits = np.memmap(path, dtype=VISITS_DTYPE, mode=mode, offset=visits_offset, shape=shape)
+    return q, visits
+
+
+def read_pickle_qtable(path: str, encode, n_states: int, n_actions: int) -> np.ndarray:
+    # Legacy {state tuple: q row} pickles carry no visit counts
+    with open(path, "rb") as f:
+        d = pickle.load(f)
+    q = np.zeros((n_states, n_actions), dtype=np.float32)
+    for k, v in d.items():
+        q[encode(k)] = v
+    return q
+
+
+def convert_pickle(pkl_path: str, out_path: str):
+    from .ai_agent import N_STATES, STATE_BINS, STATE_MIN, encode_state
+    from . import config as C
+    q = read_pickle_qtable(pkl_path, encode_state, N_STATES, len(C.ACTIONS))
+    save_qtable(out_path, q, np.zeros(q.shape, dtype=np.uint32), STATE_MIN, STATE_BINS)
+
+
+if __name__ == "__main__":
+    # python -m ml_platformer.qtable_io old_qtable.pkl new_qtable.bin
+    if len(sys.argv) != 3:
+        print("usage: python -m ml_platformer.qtable_io <in.pkl> <out.bin>")
+        sys.exit(2)
+    convert_pickle(sys.argv[1], sys.argv[2])
+    print(f"wrote {sys.argv[2]}")
@@ -0,0 +1,59 @@
+import numpy as np
+
+# Fixed-capacity transition ring for experience replay. Transitions are stored
+# column-wise with states already encoded to Q-table rows (see
+# ai_agent.encode_state), so adding one is a store per column and sampling a
+# minibatch a gather per column; no per-transition Python objects. `frames` is
+# how many sim frames a transition spans (macro-steps bootstrap with gamma**frames).
+
+
+class ReplayBuffer:
+    def __init__(self, capacity: int, seed: int = 0):
+        self.capacity = int(capacity)
+        self.states = np.zeros(self.capacity, dtype=np.int64)
+        self.actions = np.zeros(self.capacity, dtype=np.int64)
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.next_states = np.zeros(self.capacity, dtype=np.int64)
+        self.dones = np.zeros(self.capacity, dtype=bool)
+        self.frames = np.ones(self.capacity, dtype=np.int64)
+        self.pos = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, s: int, a: int, r: float, ns: int, done: bool, frames: int = 1):
+        i = self.pos
+        self.states[i] = s
+        self.actions[i] = a
+        self.rewards[i] = r
+        self.next_states[i] = ns
+        self.dones[i] = done
+        self.frames[i] = frames
+        self.pos = (i + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def add_batch(self, s, a, r, ns, dones):
+        # Vectorized add of n transitions; when n exceeds capacity only the newest are kept
+        s = np.asarray(s)
+        n = len(s)
+        if n == 0:
+            return
+        keep = slice(max(0, n - self.capacity), n)
+        idx = (self.pos + np.arange(max(0, n - self.capacity), n)) % self.capacity
+        self.states[idx] = s[keep]
+        self.actions[idx] = np.asarray(a)[keep]
+        self.rewards[idx] = np.asarray(r)[keep]
+        self.next_states[idx] = np.asarray(ns)[keep]
+        self.dones[idx] = np.asarray(dones)[keep]
+        self.frames[idx] = 1
+        self.pos = (self.pos + n) % self.capacity
+        self.size = min(self.capacity, self.size + n)
+
+    def sample(self, batch_size: int):
+        # Uniform with replacement; returns (states, actions, rewards, next_states, dones, frames)
+        idx = self.rng.integers(0, self.size, size=batch_size)
+        return (self.states[idx], self.actions[idx], self.rewards[idx], self.next_states[idx], self.dones[idx],
+                self.frames[idx])
@@ -0,0 +1,30 @@
+from multiprocessing import shared_memory
+import numpy as np
+from . import config as C
+from .ai_agent import N_STATES
+
+# One shared-memory block holding the Q-table and visit counts back to back, in
+# the same dtypes and layout as QAgent's own arrays. Learner processes attach by
+# name and update it in place (Hogwild: no locks; rare lost updates are accepted).
+
+SHAPE = (N_STATES, len(C.ACTIONS))
+Q_NBYTES = int(np.prod(SHAPE)) * np.dtype(np.float32).itemsize
+NBYTES = Q_NBYTES + int(np.prod(SHAPE)) * np.dtype(np.uint32).itemsize
+
+
+def create_shared_table(name: str | None = None) -> shared_memory.SharedMemory:
+    # Fresh zero-filled block; the creator is responsible for close() + unlink()
+    shm = shared_memory.SharedMemory(name=name, create=True, size=NBYTES)
+    shm.buf[:NBYTES] = bytes(NBYTES)
+    return shm
+
+
+def attach_shared_table(name: str) -> shared_memory.SharedMemory:
+    return shared_memory.SharedMemory(name=name)
+
+
+def table_views(buf) -> tuple[np.ndarray, np.ndarray]:
+    # (q, visits) arrays backed directly by `buf` (no copy)
+    q = np.ndarray(SHAPE, dtype=np.float32, buffer=buf, offset=0)
+    visits = np.ndarray(SHAPE, dtype=np.uint32, buffer=buf, offset=Q_NBYTES)
+    return q, visits
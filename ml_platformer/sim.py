@@ -0,0 +1,693 @@
+import math
+import time
+import random
+from dataclasses import dataclass
+import numpy as np
+from . import config as C
+
+# Display-free simulation core. Nothing in here touches pygame, so training can
+# step the world as fast as the CPU allows; the interactive game drives the same
+# code through Level/Player so behaviour stays identical.
+
+
+@dataclass
+class InputState:
+    left: bool = False
+    right: bool = False
+    jump: bool = False
+
+
+class Rect:
+    # Minimal integer rect mirroring the parts of pygame.Rect the physics uses
+    __slots__ = ("x", "y", "w", "h")
+
+    def __init__(self, x, y, w, h):
+        self.x = int(x)
+        self.y = int(y)
+        self.w = int(w)
+        self.h = int(h)
+
+    @property
+    def left(self) -> int:
+        return self.x
+
+    @left.setter
+    def left(self, v: int):
+        self.x = int(v)
+
+    @property
+    def right(self) -> int:
+        return self.x + self.w
+
+    @right.setter
+    def right(self, v: int):
+        self.x = int(v) - self.w
+
+    @property
+    def top(self) -> int:
+        return self.y
+
+    @top.setter
+    def top(self, v: int):
+        self.y = int(v)
+
+    @property
+    def bottom(self) -> int:
+        return self.y + self.h
+
+    @bottom.setter
+    def bottom(self, v: int):
+        self.y = int(v) - self.h
+
+    @property
+    def centerx(self) -> int:
+        return self.x + self.w // 2
+
+    @property
+    def centery(self) -> int:
+        return self.y + self.h // 2
+
+    def colliderect(self, o) -> bool:
+        return (self.x < o.x + o.w and o.x < self.x + self.w
+                and self.y < o.y + o.h and o.y < self.y + self.h)
+
+    def move(self, dx: int, dy: int) -> "Rect":
+        return Rect(self.x + dx, self.y + dy, self.w, self.h)
+
+    def inflate(self, dx: int, dy: int) -> "Rect":
+        return Rect(self.x - dx // 2, self.y - dy // 2, self.w + dx, self.h + dy)
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.w, self.h))
+
+    def __repr__(self) -> str:
+        return f"Rect({self.x}, {self.y}, {self.w}, {self.h})"
+
+
+class Vec:
+    __slots__ = ("x", "y")
+
+    def __init__(self, x: float = 0.0, y: float = 0.0):
+        self.x = x
+        self.y = y
+
+    def update(self, x: float, y: float):
+        self.x = x
+        self.y = y
+
+
+class GridIndex:
+    # Uniform grid over x bucketed by C.TILE columns. The level is wide and short,
+    # so columns alone keep each query to a handful of rects. Queries return rect
+    # indices in list order, so callers resolve collisions in the same order as a
+    # full scan would.
+    def __init__(self, rects, cell: int = C.TILE):
+        self.rects = list(rects)
+        self.cell = cell
+        self.origin = min((r.left for r in self.rects), default=0)
+        end = max((r.right for r in self.rects), default=0)
+        self.ncols = (end - self.origin) // cell + 1
+        self.columns: list[list[int]] = [[] for _ in range(self.ncols)]
+        for i, r in enumerate(self.rects):
+            # Right edge inclusive so closed-interval probes are covered too
+            for c in range(self._col(r.left), self._col(r.right) + 1):
+                self.columns[c].append(i)
+        self._spans: dict[tuple[int, int], tuple[int, ...]] = {}
+
+    def _col(self, x: int) -> int:
+        return max(0, min(self.ncols - 1, (x - self.origin) // self.cell))
+
+    def query(self, left: int, right: int) -> tuple[int, ...]:
+        # Indices of rects that may overlap x in [left, right], ascending
+        key = (self._col(left), self._col(right))
+        hit = self._spans.get(key)
+        if hit is None:
+            if key[0] == key[1]:
+                hit = tuple(self.columns[key[0]])
+            else:
+                found = set()
+                for c in range(key[0], key[1] + 1):
+                    found.update(self.columns[c])
+                hit = tuple(sorted(found))
+            self._spans[key] = hit
+        return hit
+
+    def first_overlap(self, rect) -> int | None:
+        # Index of the first rect colliding with `rect`, if any
+        rects = self.rects
+        for i in self.query(rect.left, rect.right):
+            if rect.colliderect(rects[i]):
+                return i
+        return None
+
+
+class LedgeMap:
+    # The get_state "under" hint baked per pixel: 1 where a platform top lies 0..64px
+    # below feet.bottom and feet.centerx is within its [left, right]. Rows are
+    # feet.bottom, columns feet.centerx, covering only the band that can be 1.
+    def __init__(self, platforms):
+        platforms = list(platforms)
+        self.x0 = min((p.left for p in platforms), default=0)
+        self.y0 = min((p.top - 64 for p in platforms), default=0)
+        self.w = max((p.right for p in platforms), default=-1) - self.x0 + 1
+        self.h = max((p.top for p in platforms), default=-65) - self.y0 + 1
+        self.grid = np.zeros((max(self.h, 0), max(self.w, 0)), dtype=np.uint8)
+        for p in platforms:
+            self.grid[p.top - 64 - self.y0:p.top - self.y0 + 1, p.left - self.x0:p.right - self.x0 + 1] = 1
+        # bytes indexing is the cheapest scalar read from Python
+        self._flat = self.grid.tobytes()
+
+    def lookup(self, cx: int, bottom: int) -> int:
+        r = bottom - self.y0
+        c = cx - self.x0
+        if 0 <= r < self.h and 0 <= c < self.w:
+            return self._flat[r * self.w + c]
+        return 0
+
+    def lookup_batch(self, cx: np.ndarray, bottom: np.ndarray) -> np.ndarray:
+        r = np.asarray(bottom) - self.y0
+        c = np.asarray(cx) - self.x0
+        inside = (r >= 0) & (r < self.h) & (c >= 0) & (c < self.w)
+        out = np.zeros(r.shape, dtype=np.uint8)
+        out[inside] = self.grid[r[inside], c[inside]]
+        return out
+
+
+# Ledge maps depend only on geometry, which build_layout derives from the index alone
+_LEDGE_MAPS: dict[int, LedgeMap] = {}
+
+
+class Layout:
+    # Static level geometry; duck-types the attributes Level exposes to the physics
+    def __init__(self, layout_index: int = 0):
+        self.layout_index = layout_index
+        self.platforms: list[Rect] = []
+        self.hazards: list[Rect] = []
+        self.spawn_x = 40
+        self.spawn_y = C.HEIGHT - C.TILE - C.PLAYER_H
+        self.exit_rect = Rect(0, 0, 0, 0)
+        self.exit_trigger = Rect(0, 0, 0, 0)
+        self.build_index()
+
+    def build_index(self, ledge_map: LedgeMap | None = None):
+        self.platform_index = GridIndex(self.platforms)
+        self.hazard_index = GridIndex(self.hazards)
+        self.ledge_map = ledge_map if ledge_map is not None else LedgeMap(self.platforms)
+
+    def intersects_hazard(self, rect) -> bool:
+        return self.hazard_index.first_overlap(rect) is not None
+
+    def ledge_under(self, rect) -> int:
+        # Nearby ledge hint: is there a platform under `rect` within a small drop?
+        # Feet are the rect moved 8px down.
+        return self.ledge_map.lookup(rect.centerx, rect.bottom + 8)
+
+
+def build_layout(idx: int) -> Layout:
+    layout = Layout(idx)
+    platforms = layout.platforms
+    # Ground
+    ground_h = C.HEIGHT - C.TILE
+    platforms.append(Rect(0, ground_h, C.LEVEL_WIDTH, C.TILE))
+
+    # Three curated layouts with different rhythms, fewer mid-air platforms
+    if idx % 3 == 0:
+        rng = random.Random(42)
+        x = 260
+        for i in range(6):
+            y = ground_h - (i % 3) * C.TILE * 2 - rng.randint(0, 1) * C.TILE
+            w = rng.randint(3, 5) * C.TILE
+            platforms.append(Rect(x, y, w, C.TILE // 2))
+            x += rng.randint(260, 420)
+        platforms.append(Rect(1550, ground_h - C.TILE * 4, C.TILE * 3, C.TILE // 2))
+        platforms.append(Rect(2200, ground_h - C.TILE * 3, C.TILE * 5, C.TILE // 2))
+    elif idx % 3 == 1:
+        x = 200
+        for i in range(5):
+            y = ground_h - (i + 1) * (C.TILE * 1.2)
+            platforms.append(Rect(x + i * 180, int(y), C.TILE * 3, C.TILE // 2))
+        platforms.append(Rect(1400, ground_h - C.TILE * 5, C.TILE * 5, C.TILE // 2))
+        platforms.append(Rect(1800, ground_h - C.TILE * 2, C.TILE * 3, C.TILE // 2))
+        platforms.append(Rect(2050, ground_h - C.TILE * 3, C.TILE * 2, C.TILE // 2))
+        platforms.append(Rect(2300, ground_h - C.TILE * 4, C.TILE * 3, C.TILE // 2))
+        platforms.append(Rect(2550, ground_h - C.TILE * 5, C.TILE * 3, C.TILE // 2))
+    else:
+        x = 240
+        for i in range(4):
+            platforms.append(Rect(x, ground_h - C.TILE * (2 + (i % 2)), C.TILE * 4, C.TILE // 2))
+            x += 420
+        platforms.append(Rect(2200, ground_h - C.TILE * 4, C.TILE * 4, C.TILE // 2))
+        platforms.append(Rect(2500, ground_h - C.TILE * 3, C.TILE * 3, C.TILE // 2))
+        platforms.append(Rect(2800, ground_h - C.TILE * 2, C.TILE * 3, C.TILE // 2))
+
+    # Exit and spawn placement
+    layout.spawn_x = 40
+    layout.spawn_y = C.HEIGHT - C.TILE - C.PLAYER_H
+    layout.exit_rect = Rect(C.LEVEL_WIDTH - 120, ground_h - C.TILE * 4 - 48, 48, 96)
+    layout.exit_trigger = layout.exit_rect.inflate(80, 80)
+
+    # Hazards along ground: small spikes to jump over
+    spike_w = 28
+    spike_h = 22
+    gaps = [
+        (520, spike_w), (2000, spike_w), (2420, spike_w)
+    ]
+    for gx, gw in gaps:
+        hx = gx
+        hy = ground_h - spike_h + 2
+        layout.hazards.append(Rect(hx, hy, gw, spike_h))
+    if idx not in _LEDGE_MAPS:
+        _LEDGE_MAPS[idx] = LedgeMap(platforms)
+    layout.build_index(_LEDGE_MAPS[idx])
+    return layout
+
+
+class Body:
+    # Player physics state and integration, without sprites or particles
+    def __init__(self, spawn_x: int, spawn_y: int):
+        self.rect = Rect(spawn_x, spawn_y, C.PLAYER_W, C.PLAYER_H)
+        # Subpixel position accumulators to avoid truncation-induced stickiness
+        self._fx = float(self.rect.x)
+        self._fy = float(self.rect.y)
+        self.vel = Vec(0, 0)
+        self.on_ground = False
+        self.time_since_ground = 0.0
+        self.jump_buffer = 0.0
+        self.facing = 1
+        self.alive = True
+        self._landed_this_frame = False
+        # Swept collision: stop at the first platform face crossed during a move and
+        # flag hazards the path passed through, so large dt cannot tunnel
+        self.swept = C.SWEPT_COLLISION
+        self.hit_hazard = False
+
+    def reset(self, spawn_x: int, spawn_y: int):
+        self.rect.x, self.rect.y = spawn_x, spawn_y
+        self._fx, self._fy = float(self.rect.x), float(self.rect.y)
+        self.vel.update(0, 0)
+        self.on_ground = False
+        self.time_since_ground = 0.0
+        self.jump_buffer = 0.0
+        self.facing = 1
+        self.alive = True
+        self.hit_hazard = False
+
+    def update(self, dt: float, level, inp: InputState):
+        # Horizontal movement
+        ax = 0.0
+        if inp.left:
+            ax -= C.MOVE_ACCEL
+            self.facing = -1
+        if inp.right:
+            ax += C.MOVE_ACCEL
+            self.facing = 1
+
+        # Apply friction and braking
+        if ax == 0.0:
+            # no input: regular friction
+            self.vel.x -= self.vel.x * min(C.FRICTION * dt, 1.0)
+        else:
+            # input present
+            # if input opposes current velocity, apply stronger braking
+            if (self.vel.x > 0 and ax < 0) or (self.vel.x < 0 and ax > 0):
+                self.vel.x -= self.vel.x * min(C.FRICTION * C.BRAKE_MULT * dt, 1.0)
+            self.vel.x += ax * dt
+        # Small velocity snap-to-zero to prevent lingering drift
+        if abs(self.vel.x) < getattr(C, "STOP_EPS", 0.0):
+            self.vel.x = 0.0
+
+        # Clamp horizontal speed
+        if self.vel.x > C.MAX_SPEED_X:
+            self.vel.x = C.MAX_SPEED_X
+        if self.vel.x < -C.MAX_SPEED_X:
+            self.vel.x = -C.MAX_SPEED_X
+
+        # Jump buffering and coyote time
+        self.time_since_ground += dt
+        if inp.jump:
+            self.jump_buffer = 0.12
+        else:
+            self.jump_buffer = max(0.0, self.jump_buffer - dt)
+
+        if (self.on_ground or self.time_since_ground < 0.12) and self.jump_buffer > 0.0:
+            self.vel.y = C.JUMP_VELOCITY
+            self.on_ground = False
+            self.time_since_ground = 0.5  # prevent double-coyote
+            self.jump_buffer = 0.0
+            self._on_jump()
+
+        # Gravity
+        self.vel.y += C.GRAVITY * dt
+        if self.vel.y > 2000:
+            self.vel.y = 2000
+
+        # Move and collide: X then Y
+        if self.swept:
+            x0, y0 = self.rect.x, self.rect.y
+            self._move_axis(level.platform_index, self.vel.x * dt, 0.0)
+            x1 = self.rect.x
+            self._move_axis(level.platform_index, 0.0, self.vel.y * dt)
+            y1 = self.rect.y
+            # Hazards touched anywhere along the X leg or the Y leg of the path
+            w, h = self.rect.w, self.rect.h
+            hazards = level.hazard_index
+            self.hit_hazard = (hazards.first_overlap(Rect(min(x0, x1), y0, abs(x1 - x0) + w, h)) is not None
+                               or hazards.first_overlap(Rect(x1, min(y0, y1), w, abs(y1 - y0) + h)) is not None)
+        else:
+            self._move_axis(level.platform_index, self.vel.x * dt, 0.0)
+            self._move_axis(level.platform_index, 0.0, self.vel.y * dt)
+
+        # Death condition
+        if self.rect.top > C.HEIGHT + 200:
+            self.alive = False
+
+    def _move_axis(self, index: GridIndex, dx: float, dy: float):
+        start = self.rect.x if dx != 0.0 else self.rect.y
+        if dx != 0.0:
+            self._fx += dx
+            self.rect.x = int(self._fx)
+        if dy != 0.0:
+            self._fy += dy
+            self.rect.y = int(self._fy)
+
+        # Ground check reset each Y movement
+        if dy != 0.0:
+            self.on_ground = False
+
+        if self.swept:
+            self._sweep(index, start, dx, dy)
+
+        # Visit nearby platforms in list order; a correction moves the rect, so the
+        # remaining candidates are re-queried around its new position
+        platforms = index.rects
+        cands = index.query(self.rect.left, self.rect.right)
+        k = 0
+        while k < len(cands):
+            i = cands[k]
+            k += 1
+            p = platforms[i]
+            if self.rect.colliderect(p):
+                self._resolve(p, dx, dy)
+                if dx != 0.0:
+                    cands = [j for j in index.query(self.rect.left, self.rect.right) if j > i]
+                    k = 0
+
+        self._landed_this_frame = self.on_ground and dy > 0.0
+        # Keep float positions in sync after any collision corrections
+        self._fx = float(self.rect.x)
+        self._fy = float(self.rect.y)
+
+    def _resolve(self, p, dx: float, dy: float):
+        # Push out of platform `p` against the direction of motion
+        if dx > 0:
+            self.rect.right = p.left
+            self.vel.x = 0
+        elif dx < 0:
+            self.rect.left = p.right
+            self.vel.x = 0
+        if dy > 0:
+            self.rect.bottom = p.top
+            self.vel.y = 0
+            if not self._landed_this_frame:
+                self._on_land(abs(self.vel.x))
+            self.on_ground = True
+            self.time_since_ground = 0.0
+        elif dy < 0:
+            self.rect.top = p.bottom
+            self.vel.y = 0
+
+    def _sweep(self, index: GridIndex, start: int, dx: float, dy: float):
+        # Time of impact along the move from `start` (rect.x or rect.y before it):
+        # resolve against the nearest platform face the leading edge crossed, among
+        # platforms that overlap the rect on the other axis. For moves that end
+        # inside that platform this is exactly what the overlap pass would do.
+        r = self.rect
+        hit = None
+        if dx != 0.0:
+            end = r.x
+            lead0, lead1 = (start + r.w, r.right) if dx > 0 else (start, r.left)
+            for i in index.query(min(start, end), max(start, end) + r.w):
+                p = index.rects[i]
+                if not (r.top < p.bottom and r.bottom > p.top):
+                    continue
+                if dx > 0 and lead0 <= p.left < lead1:
+                    if hit is None or p.left < hit.left:
+                        hit = p
+                elif dx < 0 and lead1 < p.right <= lead0:
+                    if hit is None or p.right > hit.right:
+                        hit = p
+        else:
+            end = r.y
+            lead0, lead1 = (start + r.h, r.bottom) if dy > 0 else (start, r.top)
+            for i in index.query(r.left, r.right):
+                p = index.rects[i]
+                if not (r.left < p.right and r.right > p.left):
+                    continue
+                if dy > 0 and lead0 <= p.top < lead1:
+                    if hit is None or p.top < hit.top:
+                        hit = p
+                elif dy < 0 and lead1 < p.bottom <= lead0:
+                    if hit is None or p.bottom > hit.bottom:
+                        hit = p
+        if hit is not None:
+            self._resolve(hit, dx, dy)
+
+    # Hooks for cosmetic effects (particles) in the rendered Player
+    def _on_jump(self):
+        pass
+
+    def _on_land(self, speed_x: float):
+        pass
+
+
+def dist_to_exit(body, level) -> float:
+    dx = level.exit_rect.centerx - body.rect.centerx
+    dy = level.exit_rect.centery - body.rect.centery
+    return math.hypot(dx, dy)
+
+
+def compute_reward(prev_dist, new_dist, prev_x, new_x, reached_exit, fell, dt, idle_weight: float, episode_time: float, reached_timeout: bool, furthest_x_reward: float, cur_input: InputState):
+    r = 0.0
+    # Penalize elapsed time per second (frame-rate independent)
+    r -= C.REWARD_TIME_PENALTY_PER_SEC * dt
+    # Reward progress towards exit using Euclidean distance and horizontal movement to the right
+    r += C.REWARD_PROGRESS_SCALE * (prev_dist - new_dist)
+    dx = new_x - prev_x
+    if dx > 0:
+        r += C.REWARD_PROGRESS_X_SCALE * dx
+    elif dx < 0:
+        r += -C.LEFT_MOVE_PENALTY_PER_PX * (-dx)
+    # Idle penalty when agent stays grounded and near-zero velocity
+    r -= C.IDLE_PENALTY_PER_SEC * idle_weight * dt
+    # Reward for pushing furthest x this episode
+    r += furthest_x_reward
+    # Penalize jumping slightly to bias towards forward motion when not needed
+    if cur_input.jump:
+        r -= C.JUMP_PENALTY_PER_SEC * dt
+    # Terminal rewards
+    if reached_exit:
+        # Add a large bonus for finishing quickly: bonus/time
+        time_bonus = C.REWARD_TIME_BONUS / max(0.5, episode_time)
+        r += C.REWARD_REACH_EXIT + time_bonus
+    if fell:
+        r += C.REWARD_FALL_DEATH
+    if reached_timeout:
+        r += C.TIMEOUT_PENALTY
+    return r
+
+
+@dataclass
+class StepResult:
+    reward: float
+    reached_exit: bool
+    fell: bool
+    died_to_hazard: bool
+    reached_timeout: bool
+    prev_hazard: bool
+    hazard_now: bool
+
+    @property
+    def done(self) -> bool:
+        return self.reached_exit or self.fell or self.reached_timeout
+
+
+class Simulation:
+    # One fixed step of physics, terminal checks and shaped reward. `level` is
+    # either a Layout or the rendered Level, `body` a Body or the rendered Player.
+    def __init__(self, level, body: Body):
+        self.level = level
+        self.body = body
+        self.episode_time = 0.0
+        self.episode_step = 0
+        self.furthest_x = 0
+        # Track spikes already awarded (across episodes) and pending boost
+        # Keyed by (layout_index, spike_idx) so each physical spike awards once per layout
+        self.awarded_spikes: set[tuple[int, int]] = set()
+        self.pending_spike_boost: tuple[int, int] | None = None
+        # Optional FrameProfiler; splits step() into physics and reward time
+        self.profiler = None
+
+    def reset(self):
+        self.body.reset(self.level.spawn_x, self.level.spawn_y)
+        self.episode_time = 0.0
+        self.episode_step = 0
+        self.furthest_x = 0
+        self.pending_spike_boost = None
+
+    def touching_hazard(self) -> bool:
+        # Swept bodies also report hazards their last move passed through
+        return self.body.hit_hazard or self.level.hazard_index.first_overlap(self.body.rect) is not None
+
+    def step(self, inp: InputState, dt: float) -> StepResult:
+        body, level = self.body, self.level
+        prof = self.profiler
+        if prof is not None:
+            t_start = time.perf_counter()
+        # Distance to exit before step
+        prev_dist = dist_to_exit(body, level)
+        prev_x = body.rect.centerx
+        prev_hazard = self.touching_hazard()
+
+        # Step simulation
+        if prof is not None:
+            t_phys = time.perf_counter()
+        body.update(dt, level, inp)
+        if prof is not None:
+            phys = time.perf_counter() - t_phys
+        self.episode_time += dt
+
+        # Check terminal conditions
+        reached_exit = body.rect.colliderect(level.exit_trigger)
+        # Hazard contact knocks out the player (spikes only, not ground)
+        hazard_now = self.touching_hazard()
+        died_to_hazard = False
+        if hazard_now:
+            body.alive = False
+            died_to_hazard = True
+        fell = not body.alive
+        reached_timeout = self.episode_time >= C.EPISODE_MAX_TIME_SEC
+
+        # Reward
+        new_dist = dist_to_exit(body, level)
+        new_x = body.rect.centerx
+        idle_weight = 1.0 if (body.on_ground and abs(body.vel.x) < 20) else 0.0
+        furthest_bonus = 0.0
+        if new_x > self.furthest_x:
+            furthest_bonus = (new_x - self.furthest_x) * C.REWARD_FURTHEST_X_PER_PX
+            self.furthest_x = new_x
+        r = compute_reward(
+            prev_dist, new_dist, prev_x, new_x, reached_exit, fell, dt, idle_weight, self.episode_time, reached_timeout, furthest_bonus, inp
+        )
+        # If died to hazard, add extra penalty
+        if died_to_hazard:
+            r += C.HAZARD_DEATH_PENALTY
+
+        r += self._spike_bonus(prev_x, new_x)
+
+        self.episode_step += 1
+        res = StepResult(r, reached_exit, fell, died_to_hazard, reached_timeout, prev_hazard, hazard_now)
+        if res.done:
+            self.pending_spike_boost = None
+        if prof is not None:
+            prof.add("physics", phys)
+            prof.add("reward", time.perf_counter() - t_start - phys)
+        return res
+
+    def macro_step(self, inp: InputState, frames: int, dt: float) -> StepResult:
+        # Up to `frames` fixed steps holding one input, stopping after the first
+        # terminal frame (episode_step counts the frames run). The reward equals
+        # the sum of what step() would give frame by frame, but the distance and
+        # furthest-x terms telescope, so they are evaluated once per macro-step.
+        body, level = self.body, self.level
+        prof = self.profiler
+        if prof is not None:
+            t_start = time.perf_counter()
+            phys = 0.0
+        hazard_index, exit_trigger = level.hazard_index, level.exit_trigger
+        start_dist = dist_to_exit(body, level)
+        start_furthest = self.furthest_x
+        prev_hazard = self.touching_hazard()
+        x = body.rect.centerx
+        r = 0.0
+        n = idle_frames = 0
+        reached_exit = died_to_hazard = reached_timeout = hazard_now = False
+        while n < frames:
+            if prof is not None:
+                t_phys = time.perf_counter()
+            body.update(dt, level, inp)
+            if prof is not None:
+                phys += time.perf_counter() - t_phys
+            self.episode_time += dt
+            n += 1
+
+            reached_exit = body.rect.colliderect(exit_trigger)
+            hazard_now = body.hit_hazard or hazard_index.first_overlap(body.rect) is not None
+            if hazard_now:
+                body.alive = False
+                died_to_hazard = True
+            reached_timeout = self.episode_time >= C.EPISODE_MAX_TIME_SEC
+
+            new_x = body.rect.centerx
+            if new_x > x:
+                r += C.REWARD_PROGRESS_X_SCALE * (new_x - x)
+            elif new_x < x:
+                r -= C.LEFT_MOVE_PENALTY_PER_PX * (x - new_x)
+            if body.on_ground and abs(body.vel.x) < 20:
+                idle_frames += 1
+            if new_x > self.furthest_x:
+                self.furthest_x = new_x
+            r += self._spike_bonus(x, new_x)
+            x = new_x
+            self.episode_step += 1
+            if reached_exit or not body.alive or reached_timeout:
+                break
+
+        fell = not body.alive
+        elapsed = n * dt
+        r -= C.REWARD_TIME_PENALTY_PER_SEC * elapsed
+        r += C.REWARD_PROGRESS_SCALE * (start_dist - dist_to_exit(body, level))
+        r -= C.IDLE_PENALTY_PER_SEC * idle_frames * dt
+        r += (self.furthest_x - start_furthest) * C.REWARD_FURTHEST_X_PER_PX
+        if inp.jump:
+            r -= C.JUMP_PENALTY_PER_SEC * elapsed
+        if reached_exit:
+            r += C.REWARD_REACH_EXIT + C.REWARD_TIME_BONUS / max(0.5, self.episode_time)
+        if fell:
+            r += C.REWARD_FALL_DEATH
+        if reached_timeout:
+            r += C.TIMEOUT_PENALTY
+        if died_to_hazard:
+            r += C.HAZARD_DEATH_PENALTY
+
+        res = StepResult(r, reached_exit, fell, died_to_hazard, reached_timeout, prev_hazard, hazard_now)
+        if res.done:
+            self.pending_spike_boost = None
+        if prof is not None:
+            prof.add("physics", phys)
+            prof.add("reward", time.perf_counter() - t_start - phys)
+        return res
+
+    def _spike_bonus(self, prev_x: int, new_x: int) -> float:
+        # Detect if player crosses a spike from left to right in this frame.
+        # We only award the bonus once per spike (per layout) and only after landing.
+        level = self.level
+        cur_layout = getattr(level, "layout_index", 0)
+        if self.pending_spike_boost is None and new_x > prev_x:
+            hazards = level.hazards
+            for idx in level.hazard_index.query(prev_x, new_x):
+                h = hazards[idx]
+                key = (cur_layout, idx)
+                if key in self.awarded_spikes:
+                    continue
+                if prev_x < h.left and new_x >= h.right:
+                    self.pending_spike_boost = key
+                    break
+
+        # Only give boost after landing on ground after clearing a spike
+        if self.pending_spike_boost is not None and self.body.on_ground:
+            # Award once and mark as awarded
+            self.pending_spike_boost, key = None, self.pending_spike_boost
+            if key not in self.awarded_spikes:
+                self.awarded_spikes.add(key)
+                return 80.0  # reward boost for passing spike and landing
+        return 0.0
@@ -0,0 +1,107 @@
+import os
+import csv
+import time
+import numpy as np
+
+# Buffered episode telemetry. Rows are kept in memory and written in one open()
+# per flush, triggered by row count, age of the oldest buffered entry, or close().
+# The age is checked on every log call and by maybe_flush(), which the training
+# loops poll every frame/step so a long episode cannot hold rows back.
+# With `npz_dir` set, each flush also writes the batch as one columnar .npz chunk
+# (episodes-<run start>-<seq>.npz), which loads without parsing text.
+# Like the rest of the logging, I/O errors never interrupt training; the last
+# one is kept in `last_error`.
+
+# dtype per known column for .npz chunks; anything else is stored as text
+NPZ_DTYPES = {
+    "episode": np.int64, "time": np.float64, "reward": np.float64, "epsilon": np.float64,
+    "steps": np.int64, "steps_per_sec": np.float64, "worker": np.int64,
+}
+
+
+class EpisodeLogger:
+    def __init__(self, csv_path: str, columns: list[str], completion_path: str | None = None,
+                 npz_dir: str | None = None, flush_rows: int = 256, flush_secs: float = 5.0):
+        self.csv_path = csv_path
+        self.columns = list(columns)
+        self.completion_path = completion_path
+        self.npz_dir = npz_dir
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_secs = flush_secs
+        self.last_error: Exception | None = None
+        self._rows: list[dict] = []
+        self._completions: list[str] = []
+        self._oldest = 0.0
+        self._run = time.strftime("%Y%m%d-%H%M%S")
+        self._chunk = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._rows) + len(self._completions)
+
+    def log(self, row: dict):
+        self._touch()
+        self._rows.append(row)
+        if len(self._rows) >= self.flush_rows or time.perf_counter() - self._oldest >= self.flush_secs:
+            self.flush()
+
+    def log_completion(self, episode: int, seconds: float):
+        self._touch()
+        self._completions.append(f"{episode},{seconds:.4f}\n")
+
+    def maybe_flush(self) -> bool:
+        # Flush once the oldest buffered entry is flush_secs old; cheap when nothing is buffered
+        if (self._rows or self._completions) and time.perf_counter() - self._oldest >= self.flush_secs:
+            self.flush()
+            return True
+        return False
+
+    def _touch(self):
+        if not self._rows and not self._completions:
+            self._oldest = time.perf_counter()
+
+    def flush(self):
+        rows, self._rows = self._rows, []
+        completions, self._completions = self._completions, []
+        try:
+            if rows:
+                with open(self.csv_path, "a", newline="", encoding="utf-8") as f:
+                    csv.writer(f).writerows([row.get(k) for k in self.columns] for row in rows)
+                if self.npz_dir:
+                    self._write_npz(rows)
+            if completions and self.completion_path:
+                with open(self.completion_path, "a", encoding="utf-8") as f:
+                    f.writelines(completions)
+        except Exception as e:
+            self.last_error = e
+
+    def close(self):
+        self.flush()
+
+    def _write_npz(self, rows: list[dict]):
+        os.makedirs(self.npz_dir, exist_ok=True)
+        arrays = {}
+        for k in self.columns:
+            values = [row.get(k) for row in rows]
+            dtype = NPZ_DTYPES.get(k)
+            if dtype is None:
+                arrays[k] = np.array(["" if v is None else str(v) for v in values])
+            else:
+                arrays[k] = np.array([np.nan if v in (None, "") else float(v) for v in values]).astype(dtype)
+        path = os.path.join(self.npz_dir, f"episodes-{self._run}-{self._chunk:06d}.npz")
+        self._chunk += 1
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+
+def load_npz_chunks(npz_dir: str) -> dict[str, np.ndarray]:
+    # Concatenate every chunk, oldest run first, into one array per column
+    names = sorted(n for n in os.listdir(npz_dir) if n.startswith("episodes-") and n.endswith(".npz"))
+    parts: dict[str, list[np.ndarray]] = {}
+    for n in names:
+        with np.load(os.path.join(npz_dir, n)) as z:
+            for k in z.files:
+                parts.setdefault(k, []).append(z[k])
+    return {k: np.concatenate(v) for k, v in parts.items()}
@@ -0,0 +1,222 @@
+import time
+import csv
+from dataclasses import dataclass, field
+
+from . import config as C
+from .ai_agent import QAgent
+from .sim import InputState, Simulation
+from .profiler import FrameProfiler
+from .checkpoint import CheckpointManager
+from .telemetry import EpisodeLogger
+from .config import LOG_PATH, EPISODE_LOG_PATH, EPISODE_COLUMNS
+
+# Display-free pieces of the training loop: per-run session state, the AI
+# decision gate, one learned fixed step or macro-step, episode bookkeeping and
+# replay scheduling. main drives them from the game and headless loops; the
+# parallel and actor workers use them without importing pygame.
+
+
+@dataclass
+class Session:
+    # Loop state shared by the interactive game and the headless trainer
+    training: bool = True
+    ai_control: bool = True
+    best_time: float | None = None  # best episode time (seconds)
+    last_reset_reason: str | None = None
+    episode_idx: int = 1  # sequential episode counter for logging
+    last_action: int = 0
+    action_hold: int = 0
+    ai_frame_accum: int = 0
+    # Keep last state for proper Q-learning update
+    last_state: tuple | None = None
+    episodes_to_run: int = 0
+    episodes_completed: int = 0
+    # Wall clock at episode start, for the per-episode sim steps/sec column
+    episode_started: float = field(default_factory=time.perf_counter)
+    # Buffered episode/completion log writer; None falls back to direct appends
+    telemetry: EpisodeLogger | None = None
+    # Per-phase timers; None keeps instrumentation off
+    profiler: FrameProfiler | None = None
+    # Background Q-table writer for periodic checkpoints and saves
+    checkpoints: CheckpointManager | None = None
+
+
+def ai_input(session: Session, agent: QAgent, player, level) -> InputState:
+    session.ai_frame_accum += 1
+    if session.ai_frame_accum >= C.AI_UPDATE_EVERY:
+        session.ai_frame_accum = 0
+        if session.action_hold <= 0:
+            state = agent.get_state(player, level)
+            session.last_action = agent.act(state)
+            session.last_state = state
+            session.action_hold = C.MIN_ACTION_HOLD_FRAMES
+        else:
+            session.action_hold -= 1
+    return agent.to_input(int(session.last_action))
+
+
+def fixed_step(session: Session, sim: Simulation, agent: QAgent, inp: InputState, dt: float, log_episode=None) -> bool:
+    # Advance one fixed step, learn from it and handle episode end. Finished
+    # episodes go to `log_episode(row)` if given, else to the log files.
+    # Returns True once the --episodes budget is exhausted.
+    res = sim.step(inp, dt)
+    player, level = sim.body, sim.level
+    prof = session.profiler
+    if prof is not None:
+        t_learn = time.perf_counter()
+
+    # Learn from both AI and human play
+    if session.training and session.last_state is not None:
+        next_state = agent.get_state(player, level)
+        # If human passes a hazard (was not touching, now is), give a positive reward
+        if not session.ai_control and not res.prev_hazard and res.hazard_now:
+            agent.reward(10.0, session.last_state, next_state, session.last_action, res.done)
+        agent.reward(res.reward, session.last_state, next_state, session.last_action, res.done)
+
+    if prof is not None:
+        t_log = time.perf_counter()
+        prof.add("learn", t_log - t_learn)
+    if not res.done:
+        return False
+    done = _end_episode(session, sim, agent, res, log_episode)
+    if prof is not None:
+        prof.add("logging", time.perf_counter() - t_log)
+    return done
+
+
+def macro_step(session: Session, sim: Simulation, agent: QAgent, dt: float, frames: int = C.MACRO_FRAMES,
+               log_episode=None) -> tuple[bool, int]:
+    # One AI decision held for up to `frames` sim frames (Simulation.macro_step),
+    # learned from once with gamma**k over the k frames actually run.
+    # Returns (--episodes budget exhausted, k).
+    player, level = sim.body, sim.level
+    prof = session.profiler
+    if prof is not None:
+        t_decide = time.perf_counter()
+    state = agent.get_state(player, level)
+    action = agent.act(state)
+    session.last_state, session.last_action = state, action
+    if prof is not None:
+        prof.add("decision", time.perf_counter() - t_decide)
+
+    start = sim.episode_step
+    res = sim.macro_step(agent.to_input(action), frames, dt)
+    k = sim.episode_step - start
+
+    if prof is not None:
+        t_learn = time.perf_counter()
+    if session.training:
+        agent.reward(res.reward, state, agent.get_state(player, level), action, res.done, frames=k)
+    if prof is not None:
+        t_log = time.perf_counter()
+        prof.add("learn", t_log - t_learn)
+    if not res.done:
+        return False, k
+    finished = _end_episode(session, sim, agent, res, log_episode)
+    if prof is not None:
+        prof.add("logging", time.perf_counter() - t_log)
+    return finished, k
+
+
+def _end_episode(session: Session, sim: Simulation, agent: QAgent, res, log_episode) -> bool:
+    # Best time, reset reason, log rows and the --episodes budget
+    episode_time = sim.episode_time
+    if res.reached_exit:
+        if session.best_time is None or episode_time < session.best_time:
+            session.best_time = episode_time
+        session.last_reset_reason = "exit"
+        # Log AI completion time
+        if session.ai_control and log_episode is None:
+            if session.telemetry is not None:
+                session.telemetry.log_completion(session.episode_idx, episode_time)
+            else:
+                try:
+                    with open(LOG_PATH, "a", encoding="utf-8") as f:
+                        f.write(f"{session.episode_idx},{episode_time:.4f}\n")
+                except Exception:
+                    pass
+    elif res.fell:
+        session.last_reset_reason = "fell"
+        # Set agent reward to 30% of best score to encourage survival
+        percent = 0.3
+        if session.best_time is not None and session.best_time > 0:
+            best_score = C.REWARD_TIME_BONUS / session.best_time
+            agent.total_reward = percent * best_score
+        else:
+            agent.total_reward = 0.0
+    else:
+        session.last_reset_reason = "timeout"
+
+    # Append rich episode CSV row
+    now = time.perf_counter()
+    wall = now - session.episode_started
+    session.episode_started = now
+    row = {
+        "episode": session.episode_idx,
+        "time": f"{episode_time:.4f}",
+        "reward": f"{agent.total_reward:.4f}",
+        "epsilon": f"{agent.epsilon:.4f}",
+        "steps": sim.episode_step,
+        "reason": session.last_reset_reason,
+        "steps_per_sec": f"{sim.episode_step / wall:.1f}" if wall > 0 else "",
+    }
+    if log_episode is not None:
+        log_episode(row)
+    elif session.telemetry is not None:
+        session.telemetry.log(row)
+    else:
+        try:
+            _append_episode_csv(row)
+        except Exception:
+            pass
+
+    sim.reset()
+    session.last_state = None
+    session.episode_idx += 1
+
+    # Respect --episodes budget
+    if session.episodes_to_run > 0:
+        session.episodes_completed += 1
+        if session.episodes_completed >= session.episodes_to_run:
+            return True
+    return False
+
+
+def replay_steps(session: Session, agent: QAgent, batches: int, batch_size: int) -> int:
+    prof = session.profiler
+    if prof is not None:
+        t_replay = time.perf_counter()
+    n = agent.replay(batch_size, batches)
+    if prof is not None:
+        prof.add("replay", time.perf_counter() - t_replay)
+    return n
+
+
+def replay_until(session: Session, agent: QAgent, deadline: float, batch_size: int) -> int:
+    # Spend the frame time left before `deadline` on replayed minibatches
+    prof = session.profiler
+    if prof is not None:
+        t_replay = time.perf_counter()
+    n = 0
+    while time.perf_counter() < deadline:
+        done = agent.replay(batch_size)
+        if not done:
+            break
+        n += done
+    if prof is not None:
+        prof.add("replay", time.perf_counter() - t_replay)
+    return n
+
+
+def set_profiler(session: Session, sim: Simulation, profiler: FrameProfiler | None):
+    session.profiler = profiler
+    sim.profiler = profiler
+
+
+def _append_episode_csv(row: dict):
+    try:
+        with open(EPISODE_LOG_PATH, "a", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow([row.get(k) for k in EPISODE_COLUMNS])
+    except Exception:
+        pass
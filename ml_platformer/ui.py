@@ -1,11 +1,26 @@
 import pygame as pg
 from . import config as C
+from .lru import LRUCache
 
 
 class UI:
+    KEY_BOX = 32
+    KEY_GAP = 6
+
     def __init__(self):
         pg.font.init()
         self.font = pg.font.SysFont("consolas", 18)
+        self._profile_bg = None
+        # Profile panel lines change with every stats refresh, so they are kept
+        # apart from text_cache (where they would push out the static HUD strings)
+        self._profile_text: list[str] = []
+        self._profile_imgs: list[pg.Surface] = []
+        # Rendered text keyed by (text, color): a line is re-rendered only when its
+        # displayed value changes. WASD key caps are prebuilt in both states.
+        self.text_cache = LRUCache(C.TEXT_CACHE_SIZE)
+        self._keys = {
+            (label, down): self._make_key(label, down, self.KEY_BOX) for label in "WASD" for down in (False, True)
+        }
 
     def draw(self, surf, info: dict):
         best = info.get("best_time")
@@ -18,6 +33,8 @@ class UI:
             f"Reward: {info['reward']:.2f}{reason_str}",
             f"Time: {info.get('time', 0.0):.2f}s  Best: {best_str}",
         ]
+        if info.get("steps_per_sec") is not None:
+            lines.append(f"Sim: {info['steps_per_sec']:.0f} steps/s")
         x, y = 12, 10
         for ln in lines:
             self._text(surf, ln, x + 1, y + 1, (0, 0, 0))
@@ -28,15 +45,20 @@ class UI:
         if info.get("ai_control") and info.get("ai_wasd"):
             self._draw_wasd(surf, info["ai_wasd"])
 
+        if info.get("profile"):
+            self._draw_profile(surf, info["profile"])
+
+    def _render(self, txt: str, color) -> pg.Surface:
+        return self.text_cache.get_or_build((txt, color), lambda: self.font.render(txt, True, color))
+
     def _text(self, surf, txt, x, y, color):
-        img = self.font.render(txt, True, color)
-        surf.blit(img, (x, y))
+        surf.blit(self._render(txt, color), (x, y))
 
     def _draw_wasd(self, surf, pressed: dict):
         # Layout near top-right
         sw = surf.get_width()
-        box = 32
-        gap = 6
+        box = self.KEY_BOX
+        gap = self.KEY_GAP
         total_w = box * 3 + gap * 2
         x0 = sw - total_w - 16
         y0 = 16 + 20 * 4  # position below the text block
@@ -49,11 +71,37 @@ class UI:
         self._draw_key(surf, "S", x0 + box + gap, y1, bool(pressed.get("s")), box)
         self._draw_key(surf, "D", x0 + (box + gap) * 2, y1, bool(pressed.get("d")), box)
         # Small caption
-        cap = "AI inputs"
-        cap_img = self.font.render(cap, True, C.TEXT_COLOR)
-        surf.blit(cap_img, (x0, y1 + box + gap))
+        self._text(surf, "AI inputs", x0, y1 + box + gap, C.TEXT_COLOR)
+
+    def _draw_profile(self, surf, stats: dict):
+        # Bottom-left panel: rolling per-phase frame time in milliseconds
+        lines = [f"{'phase':<9}{'p50':>7}{'p95':>7}{'max':>7}"]
+        for name, (p50, p95, mx) in stats.items():
+            lines.append(f"{name:<9}{p50:>7.2f}{p95:>7.2f}{mx:>7.2f}")
+        line_h = 18
+        w, h = 8 + 30 * 10, 8 + line_h * len(lines)
+        if self._profile_bg is None or self._profile_bg.get_size() != (w, h):
+            self._profile_bg = pg.Surface((w, h), pg.SRCALPHA)
+            self._profile_bg.fill((10, 12, 16, 170))
+        x0, y0 = 12, surf.get_height() - h - 12
+        surf.blit(self._profile_bg, (x0, y0))
+        if lines != self._profile_text:
+            self._profile_imgs = [self.font.render(ln, True, C.TEXT_COLOR) for ln in lines]
+            self._profile_text = lines
+        y = y0 + 4
+        for img in self._profile_imgs:
+            surf.blit(img, (x0 + 4, y))
+            y += line_h
 
     def _draw_key(self, surf, label: str, px: int, py: int, is_down: bool, box: int):
+        # Prebuilt cap includes the 3 px base border around the box
+        surf.blit(self._keys[(label, is_down)], (px - 3, py - 3))
+
+    def _make_key(self, label: str, is_down: bool, box: int) -> pg.Surface:
+        # Key cap on a transparent surface; every drawn pixel is opaque, so one blit
+        # gives the same pixels as drawing it in place
+        surf = pg.Surface((box + 6, box + 6), pg.SRCALPHA)
+        px = py = 3
         rect = pg.Rect(px, py, box, box)
         base = (30, 34, 42)
         on = (90, 200, 255)
@@ -66,3 +114,4 @@ class UI:
         label_img = self.font.render(label, True, (15, 18, 22))
         lw, lh = label_img.get_size()
         surf.blit(label_img, (px + (box - lw) // 2, py + (box - lh) // 2))
+        return surf
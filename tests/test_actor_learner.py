@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+import threading
+import subprocess
+
+import numpy as np
+
+from ml_platformer import actor_learner as al
+from ml_platformer.actor_learner import train_actor_learner
+
+
+def test_learner_ingests_every_pushed_transition():
+    # A tiny ring forces wraparound and makes actors wait on the learner
+    res = train_actor_learner(actors=2, seconds=1.5, capacity=64, batch=32, refresh_every=50, publish_every=0.01)
+    assert res["transitions"] > 64
+    assert sum(res["per_actor"]) == res["transitions"]
+    # One visit per ingested transition, and the table actually learned
+    assert res["visits"].sum() == res["transitions"]
+    assert np.abs(res["q"]).max() > 0
+    assert res["versions"] > 0
+    assert 0 <= res["staleness_mean"] <= res["staleness_max"]
+    assert res["staleness_p95"] <= res["staleness_max"]
+
+
+def test_policy_read_waits_out_a_publish_in_progress():
+    ctrl = np.zeros(al._HEADER, dtype=np.int64)
+    shared_q = np.zeros((4, 3))
+    al._publish(ctrl, shared_q, np.full((4, 3), 1.0), 1)
+    assert ctrl[al._SEQ] == 2
+
+    # A publish of version 2 is half written: the reader must not pair the new
+    # rows with version 1, nor return before the writer finishes
+    ctrl[al._SEQ] += 1
+    shared_q[:2] = 2.0
+
+    def finish():
+        time.sleep(0.05)
+        shared_q[2:] = 2.0
+        ctrl[al._VERSION] = 2
+        ctrl[al._SEQ] += 1
+
+    writer = threading.Thread(target=finish)
+    writer.start()
+    q = np.zeros_like(shared_q)
+    version = al._read_policy(ctrl, shared_q, q)
+    writer.join()
+    assert version == 2 and (q == 2.0).all()
+
+
+def test_workers_do_not_import_pygame():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = "import sys, ml_platformer.actor_learner; print('pygame' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from ml_platformer.ai_agent import N_STATES, QAgent, decode_state, encode_state, encode_states
+
+
+def test_state_encoding_roundtrip_and_bounds():
+    lo = (-30, -20, -1, -1, 0, 0)
+    hi = (30, 20, 1, 1, 1, 1)
+    assert encode_state(lo) == 0
+    assert encode_state(hi) == N_STATES - 1
+    s = (5, -3, 1, -1, 1, 0)
+    assert decode_state(encode_state(s)) == s
+    assert encode_states(np.array([lo, s, hi])).tolist() == [0, encode_state(s), N_STATES - 1]
+    # One state on its own is a single index, not passed through as if encoded
+    assert encode_states(s) == encode_state(s) and encode_states(np.array(s)).shape == ()
+    with pytest.raises(ValueError):
+        encode_states([1, 2, 3])
+
+
+def test_scalar_and_batch_encoding_agree_on_every_state():
+    states = np.array([decode_state(i) for i in range(N_STATES)])
+    assert encode_states(states).tolist() == list(range(N_STATES))
+    assert [encode_state(tuple(row)) for row in states.tolist()] == list(range(N_STATES))
+
+
+def test_reward_batch_matches_sequential_updates_for_distinct_pairs():
+    states = [(1, 2, 0, 0, 1, 0), (3, -4, 1, 1, 0, 1), (-7, 0, -1, 0, 1, 1)]
+    next_states = [(2, 2, 0, 0, 1, 0), (4, -4, 1, 0, 0, 1), (-6, 0, -1, 0, 1, 1)]
+    actions = [2, 5, 0]
+    rewards = [1.5, -2.0, 10.0]
+    dones = [False, False, True]
+
+    seq, bat = QAgent(), QAgent()
+    for ag in (seq, bat):
+        ag.q[:] = np.random.default_rng(1).normal(size=ag.q.shape)
+    for s, ns, a, r, d in zip(states, next_states, actions, rewards, dones):
+        seq.reward(r, s, ns, a, d)
+    bat.reward_batch(rewards, np.array(states), np.array(next_states), actions, dones)
+
+    assert np.allclose(seq.q, bat.q)
+    assert bat.steps == seq.steps and bat.episodes == seq.episodes
+    assert np.isclose(bat.epsilon, seq.epsilon)
+
+
+def test_agents_on_shared_block_see_each_others_updates(tmp_path):
+    from ml_platformer.shared_qtable import create_shared_table
+
+    shm = create_shared_table()
+    try:
+        a = QAgent(seed=1, shared_buf=shm.buf)
+        b = QAgent(seed=2, shared_buf=shm.buf)
+        s, ns = (1, 1, 0, 0, 1, 0), (2, 1, 0, 0, 1, 0)
+        a.reward(4.0, s, ns, 2, False)
+        assert b.q[encode_state(s), 2] == a.q[encode_state(s), 2] != 0.0
+        assert b.visits[encode_state(s), 2] == 1
+
+        # Loading into a shared agent fills the block in place
+        path = str(tmp_path / "q.bin")
+        other = QAgent()
+        other.q[encode_state(ns), 3] = 7.0
+        other.save(path)
+        b.load(path)
+        assert a.q[encode_state(ns), 3] == 7.0
+        del a, b
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_macro_step_update_discounts_by_frames():
+    agent = QAgent(seed=0)
+    s, ns = (1, 1, 0, 0, 1, 0), (2, 1, 0, 0, 1, 0)
+    agent.q[encode_state(ns)] = 10.0
+    eps = agent.epsilon
+    agent.reward(1.0, s, ns, 2, False, frames=5)
+    assert np.isclose(agent.q[encode_state(s), 2], agent.alpha * (1.0 + agent.gamma ** 5 * 10.0))
+    assert np.isclose(agent.epsilon, eps * agent.decay ** 5)
+    assert agent.steps == 1
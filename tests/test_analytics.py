@@ -0,0 +1,76 @@
+import os
+import json
+import subprocess
+import sys
+
+import numpy as np
+
+from ml_platformer.analytics import (EpisodeLogTail, main, parse_rows, rolling_min, summarize, window_medians)
+from ml_platformer.config import EPISODE_COLUMNS
+
+
+def _line(i, reason, t):
+    return f"{i},{t:.4f},0.0000,0.1000,{int(t * 60)},{reason},2500.0\n"
+
+
+def test_tail_reads_only_new_complete_rows(tmp_path):
+    path = tmp_path / "episode_log.csv"
+    path.write_text(",".join(EPISODE_COLUMNS) + "\n" + _line(1, "fell", 1.0) + _line(2, "exit", 12.5))
+    tail = EpisodeLogTail(str(path), block_bytes=4096)
+    assert tail.poll() == 2
+    with open(path, "a") as f:
+        f.write(_line(3, "timeout", 30.0) + "4,9.0")
+    assert tail.poll() == 1
+    with open(path, "a") as f:
+        f.write("000,0.0000,0.1000,540,exit,\n")
+    assert tail.poll() == 1
+    cols = tail.arrays()
+    assert cols["episode"].tolist() == [1, 2, 3, 4]
+    assert cols["reason"].tolist() == ["fell", "exit", "timeout", "exit"]
+    assert np.isnan(cols["steps_per_sec"][3]) and cols["time"][3] == 9.0
+    assert tail.poll() == 0
+
+    path.write_text(",".join(EPISODE_COLUMNS) + "\n" + _line(1, "exit", 5.0))
+    assert tail.poll() == 1 and tail.rows == 1
+
+
+def test_parse_rows_keeps_extra_text_columns():
+    cols = parse_rows(b"1,2.5,exit,3\n", ["episode", "time", "reason", "worker"])
+    assert cols["reason"].tolist() == ["exit"] and cols["worker"].tolist() == [3]
+
+
+def test_rolling_statistics_match_brute_force():
+    rng = np.random.default_rng(0)
+    x = np.where(rng.random(500) < 0.3, rng.uniform(5, 40, 500), np.nan)
+    for w in (1, 7, 64, 1000):
+        brute_min = [np.nanmin(np.append(x[max(0, i - w + 1):i + 1], np.inf)) for i in range(len(x))]
+        assert np.array_equal(rolling_min(np.nan_to_num(x, nan=np.inf), w), brute_min)
+        ends = np.arange(0, 500, 13)
+        brute_med = [np.median(v[~np.isnan(v)]) if (~np.isnan(v)).any() else np.nan
+                     for v in (x[max(0, i - w + 1):i + 1] for i in ends)]
+        assert np.allclose(window_medians(x, w, ends), brute_med, equal_nan=True)
+
+
+def test_summary_and_cli_json(tmp_path):
+    path = tmp_path / "episode_log.csv"
+    reasons = ["fell"] * 6 + ["exit", "fell", "exit", "timeout"]
+    times = [1, 2, 3, 1, 2, 3, 20, 1, 15, 40]
+    path.write_text(",".join(EPISODE_COLUMNS) + "\n" + "".join(
+        _line(i + 1, r, t) for i, (r, t) in enumerate(zip(reasons, times))))
+    out = tmp_path / "summary.json"
+    main([str(path), "--window", "4", "--points", "5", "--out", str(out)])
+    s = json.loads(out.read_text())
+    assert s["rows"] == 10 and s["offset"] == path.stat().st_size
+    assert s["reasons"] == {"exit": 2, "fell": 7, "timeout": 1}
+    assert s["best_time"] == 15.0 and s["best_episode"] == 9 and s["first_exit_episode"] == 7
+    assert s["recent"]["completion_rate"] == 0.5 and s["recent"]["median_time"] == 17.5
+    assert s["curve"]["episode"] == [1, 3, 5, 8, 10]
+    assert s["curve"]["best_time"][:3] == [None, None, None]
+    assert summarize({"reason": np.empty(0, dtype=str)}) == {"rows": 0, "window": 100}
+
+
+def test_import_does_not_load_pygame():
+    code = "import sys, ml_platformer.analytics; print('pygame' in sys.modules)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
@@ -0,0 +1,30 @@
+import numpy as np
+
+from ml_platformer.ai_agent import QAgent
+from ml_platformer.batch_env import BatchEnv
+from ml_platformer.sim import Body, Simulation, build_layout
+
+
+def test_batch_env_matches_scalar_simulation():
+    n, dt = 16, 1.0 / 60 * 0.85
+    rng = np.random.default_rng(3)
+    agent = QAgent()
+    for layout_index in range(3):
+        env = BatchEnv(n, layout_index)
+        sims = []
+        for _ in range(n):
+            layout = build_layout(layout_index)
+            sims.append(Simulation(layout, Body(layout.spawn_x, layout.spawn_y)))
+        actions = rng.integers(0, 6, size=n)
+        for step in range(900):
+            if step % 6 == 0:
+                actions = rng.integers(0, 6, size=n)
+            res = env.step(actions, dt)
+            for i, s in enumerate(sims):
+                r = s.step(agent.to_input(int(actions[i])), dt)
+                assert tuple(res.state[i]) == agent.get_state(s.body, s.level)
+                assert np.isclose(res.reward[i], r.reward)
+                assert res.done[i] == r.done
+                if r.done:
+                    s.reset()
+                assert (env.x[i], env.y[i]) == (s.body.rect.x, s.body.rect.y)
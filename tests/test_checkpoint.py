@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+
+from ml_platformer.ai_agent import QAgent
+from ml_platformer.checkpoint import CheckpointManager
+
+
+def test_interval_checkpoints_rotate_and_hold_snapshot(tmp_path):
+    agent = QAgent(seed=0)
+    mgr = CheckpointManager(str(tmp_path / "ckpt"), keep=2, every_steps=10)
+    s, ns = (1, 1, 0, 0, 1, 0), (2, 1, 0, 0, 1, 0)
+    expected = None
+    for i in range(45):
+        agent.reward(1.0, s, ns, i % 6, False)
+        if mgr.maybe_checkpoint(agent):
+            expected = agent.q.copy()
+            mgr.wait()
+    mgr.close()
+    files = mgr.checkpoints()
+    assert [os.path.basename(f) for f in files] == ["qtable-00000003-000000000030.bin",
+                                                     "qtable-00000004-000000000040.bin"]
+    assert mgr.written == 4 and mgr.last_error is None
+
+    # The file holds the table as it was when snapshotted, not later updates
+    loaded = QAgent()
+    loaded.load(mgr.latest())
+    assert np.array_equal(loaded.q, expected)
+    assert not np.array_equal(loaded.q, agent.q)
+
+
+def test_restart_continues_sequence_and_keeps_newest(tmp_path):
+    # A second process starts again from step 0; its checkpoints must still count
+    # as newer than the first run's and survive rotation
+    directory = str(tmp_path / "ckpt")
+    first = QAgent(seed=0)
+    mgr = CheckpointManager(directory, keep=2)
+    for steps in (300000, 400000, 500000):
+        first.steps = steps
+        mgr.checkpoint(first)
+    mgr.close()
+
+    second = QAgent(seed=1)
+    second.q[3, 1] = 7.0
+    mgr = CheckpointManager(directory, keep=2)
+    for steps in (1000, 2000, 3000):
+        second.steps = steps
+        mgr.checkpoint(second)
+        mgr.wait()
+        assert mgr.latest().endswith(f"-{steps:012d}.bin")
+    mgr.close()
+    assert [os.path.basename(f) for f in mgr.checkpoints()] == ["qtable-00000005-000000002000.bin",
+                                                               "qtable-00000006-000000003000.bin"]
+    loaded = QAgent()
+    loaded.load(mgr.latest())
+    assert loaded.q[3, 1] == 7.0
+
+
+def test_save_to_writes_through_background_thread(tmp_path):
+    agent = QAgent(seed=0)
+    agent.q[5, 2] = 3.0
+    mgr = CheckpointManager(str(tmp_path))
+    assert not mgr.enabled and not mgr.maybe_checkpoint(agent)
+    path = str(tmp_path / "qtable.bin")
+    mgr.save_to(agent, path)
+    agent.q[5, 2] = 9.0
+    mgr.close()
+    loaded = QAgent()
+    loaded.load(path)
+    assert loaded.q[5, 2] == 3.0
+    assert mgr.checkpoints() == []
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from ml_platformer import config as C
+from ml_platformer.ai_agent import QAgent
+from ml_platformer.env import PlatformerEnv
+from ml_platformer.sim import Body, InputState, Simulation, build_layout
+
+
+def test_observation_matches_agent_state():
+    env = PlatformerEnv()
+    obs, info = env.reset(seed=0, layout=2)
+    agent = QAgent()
+    assert obs.shape == PlatformerEnv.observation_shape
+    assert tuple(obs) == agent.get_state(env.body, env.layout)
+    assert info["layout"] == 2
+    for _ in range(50):
+        obs, *_ = env.step(5)
+    assert tuple(obs) == agent.get_state(env.body, env.layout)
+
+
+def test_rewards_match_simulation():
+    env = PlatformerEnv(layout=1)
+    env.reset()
+    layout = build_layout(1)
+    sim = Simulation(layout, Body(layout.spawn_x, layout.spawn_y))
+    dt = (1.0 / C.FPS) * C.TIME_SCALE
+    for _ in range(200):
+        _, r, terminated, truncated, _ = env.step(2)
+        res = sim.step(InputState(right=True), dt)
+        assert r == res.reward
+        if terminated or truncated:
+            break
+
+
+def test_terminated_truncated_and_reset_required():
+    env = PlatformerEnv(max_steps=10)
+    env.reset()
+    for _ in range(10):
+        _, _, terminated, truncated, _ = env.step(0)
+    assert truncated and not terminated
+    with pytest.raises(RuntimeError):
+        env.step(0)
+
+    env = PlatformerEnv()
+    env.reset()
+    spike = env.layout.hazards[0]
+    env.body.rect.x, env.body.rect.y = spike.x, spike.y - C.PLAYER_H + 10
+    env.body._fx, env.body._fy = float(env.body.rect.x), float(env.body.rect.y)
+    _, _, terminated, truncated, info = env.step(0)
+    assert terminated and not truncated and info["died_to_hazard"]
+    obs, info = env.reset()
+    assert info["episode_step"] == 0 and env.body.rect.x == env.layout.spawn_x
+
+
+def test_seeded_sampling_and_frame_skip():
+    a, b = PlatformerEnv(), PlatformerEnv(frame_skip=5)
+    a.reset(seed=7)
+    b.reset(seed=7)
+    assert [a.sample_action() for _ in range(20)] == [b.sample_action() for _ in range(20)]
+    obs, *_ = b.step(2)
+    assert b.sim.episode_step == 5
+    assert np.array_equal(obs, b.observe())
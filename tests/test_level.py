@@ -0,0 +1,103 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame as pg  # noqa: E402
+
+from ml_platformer import config as C  # noqa: E402
+from ml_platformer.level import Level  # noqa: E402
+from ml_platformer.lru import LRUCache  # noqa: E402
+
+pg.init()
+pg.display.set_mode((C.WIDTH, C.HEIGHT))
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    built = []
+    for key in ("a", "b", "a", "c", "b"):
+        cache.get_or_build(key, lambda k=key: built.append(k) or k.upper())
+    assert built == ["a", "b", "c", "b"]
+    assert "a" not in cache and "c" in cache and len(cache) == 2
+    assert cache.hits == 1 and cache.misses == 4
+
+
+def test_rotating_back_reuses_cached_surfaces():
+    level = Level()
+    bg, portal, chunk = level.bg_surface, level.portal_frames, level.platform_chunk(0)
+    for _ in range(len(level.themes)):
+        level.next_theme()
+    assert level.bg_surface is bg and level.portal_frames is portal and level.platform_chunk(0) is chunk
+    for _ in range(3):
+        level.next_layout()
+    assert level.platform_chunk(0) is chunk
+
+
+def _reference_draw(level: Level, surf: pg.Surface, cam_x: float):
+    # The whole level drawn onto one surface, then every hazard, no culling
+    full = pg.Surface((C.LEVEL_WIDTH, C.HEIGHT), pg.SRCALPHA).convert_alpha()
+    for r in level.platforms:
+        pg.draw.rect(full, level.colors["PLATFORM_COLOR"], pg.Rect(*r), border_radius=6)
+        pg.draw.line(full, level.colors["PLATFORM_EDGE"], (r.left, r.top), (r.right, r.top), 2)
+    surf.blit(full, (-int(cam_x), 0))
+    for h in level.hazards:
+        r = pg.Rect(h.x - cam_x, h.y, h.w, h.h)
+        points = [(r.left, r.bottom), (r.centerx, r.top), (r.right, r.bottom)]
+        pg.draw.polygon(surf, C.HAZARD_COLOR, points)
+        pg.draw.polygon(surf, C.HAZARD_EDGE, points, 2)
+
+
+def test_chunked_platforms_match_full_surface_and_cull():
+    level = Level()
+    level.next_layout()
+    screen = pg.display.get_surface()
+    ref = pg.Surface(screen.get_size()).convert()
+    for cam_x in (0.0, 511.5, 1200.0, C.LEVEL_WIDTH - C.WIDTH):
+        ref.fill((0, 0, 0))
+        _reference_draw(level, ref, cam_x)
+        screen.fill((0, 0, 0))
+        level.chunk_cache.clear()
+        level.draw_platforms(screen, cam_x)
+        assert pg.image.tobytes(screen, "RGB") == pg.image.tobytes(ref, "RGB")
+        first, last = int(cam_x) // C.LEVEL_CHUNK_W, (int(cam_x) + C.WIDTH - 1) // C.LEVEL_CHUNK_W
+        assert len(level.chunk_cache) == last - first + 1
+        assert (level.theme_index, level.layout_index, last) in level.chunk_cache
+
+    # Far from the exit nothing of the portal is drawn
+    screen.fill((0, 0, 0))
+    level.draw_exit(screen, 0.0, 0.5)
+    assert not any(pg.image.tobytes(screen, "RGB"))
+
+
+def _legacy_gradient(colors) -> pg.Surface:
+    surf = pg.Surface((C.WIDTH, C.HEIGHT)).convert()
+    top, bot = colors["BG_TOP"], colors["BG_BOTTOM"]
+    for y in range(C.HEIGHT):
+        t = y / max(1, C.HEIGHT - 1)
+        pg.draw.line(surf, tuple(int(a + (b - a) * t) for a, b in zip(top, bot)), (0, y), (C.WIDTH, y))
+    return surf
+
+
+def _legacy_portal(colors, radius: int) -> pg.Surface:
+    size = radius * 4
+    surf = pg.Surface((size, size), pg.SRCALPHA)
+    for j in range(6):
+        pg.draw.circle(surf, (*colors["EXIT_COLOR"], max(50 - j * 8, 0)), (size // 2, size // 2), radius + j * 5)
+    pg.draw.circle(surf, colors["EXIT_COLOR"], (size // 2, size // 2), radius, 3)
+    return surf
+
+
+def test_array_generated_assets_match_draw_calls():
+    level = Level()
+    haze = pg.Surface((C.WIDTH, C.HEIGHT), pg.SRCALPHA)
+    for y in range(C.HEIGHT):
+        pg.draw.line(haze, (180, 200, 255, int(10 + 38 * y / (C.HEIGHT - 1))), (0, y), (C.WIDTH, y))
+    assert pg.image.tobytes(level.haze_surface, "RGBA") == pg.image.tobytes(haze, "RGBA")
+    for theme in range(len(level.themes)):
+        gradient = level._make_gradient_surface()
+        assert pg.image.tobytes(gradient, "RGB") == pg.image.tobytes(_legacy_gradient(level.colors), "RGB")
+        for frame in level.portal_frames:
+            radius = frame.get_width() // 4
+            assert pg.image.tobytes(frame, "RGBA") == pg.image.tobytes(_legacy_portal(level.colors, radius), "RGBA")
+        level.next_theme()
@@ -0,0 +1,53 @@
+import os
+import csv
+import sys
+import subprocess
+
+import numpy as np
+
+from ml_platformer.parallel import PARALLEL_COLUMNS, merge_deltas, train_parallel
+
+
+def test_merge_is_visit_weighted_average_of_deltas():
+    q = np.zeros((4, 2), dtype=np.float32)
+    q[1] = 1.0
+    visits = np.zeros(q.shape, dtype=np.uint32)
+    deltas = [
+        (np.array([1]), np.array([[3.0, 0.0]]), np.array([[3, 0]])),
+        (np.array([1, 2]), np.array([[-1.0, 0.0], [0.0, 2.0]]), np.array([[1, 0], [0, 5]])),
+    ]
+    changed = merge_deltas(q, visits, deltas)
+    assert changed.tolist() == [1, 2]
+    # (3 * 3 + 1 * -1) / 4 = 2 on top of the shared base of 1
+    assert np.isclose(q[1, 0], 3.0)
+    assert q[1, 1] == 1.0  # no visits, base kept
+    assert q[2, 1] == 2.0
+    assert visits[1, 0] == 4 and visits[2, 1] == 5
+
+
+def test_two_workers_share_one_table(tmp_path):
+    log = tmp_path / "par.csv"
+    res = train_parallel(workers=2, sync_every=400, max_rounds=2, log_path=str(log))
+    assert res["rounds"] == 2
+    # Every learning update from both workers is counted once in the merged visits
+    assert 0 < res["visits"].sum() <= 2 * 2 * 400
+    with open(log, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == PARALLEL_COLUMNS
+    assert {r[-1] for r in rows[1:]} <= {"0", "1"}
+
+
+def test_shared_learners_update_one_table():
+    from ml_platformer.parallel import train_shared
+
+    res = train_shared(workers=2, steps=400, log_path=None)
+    assert res["updates"] > 0
+    # Hogwild may drop a racing increment, never invent one
+    assert 0 < res["visits"].sum() <= res["updates"]
+
+
+def test_workers_do_not_import_pygame():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = "import sys, ml_platformer.parallel; print('pygame' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
@@ -0,0 +1,87 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np  # noqa: E402
+import pygame as pg  # noqa: E402
+
+from ml_platformer import config as C  # noqa: E402
+from ml_platformer.particles import COLORS, ParticlePool  # noqa: E402
+from ml_platformer.player import JUMP_VX, JUMP_VY, Player  # noqa: E402
+
+pg.init()
+pg.display.set_mode((C.WIDTH, C.HEIGHT))
+
+
+def _reference_step(parts, dt):
+    # The per-dict update the pool replaces
+    alive = []
+    for p in parts:
+        p["x"] += p["vx"] * dt
+        p["y"] += p["vy"] * dt
+        p["vy"] += C.GRAVITY * 0.6 * dt
+        p["life"] -= dt * 1.6
+        p["r"] = max(1, p["r"] - dt * 4)
+        if p["life"] > 0:
+            alive.append(p)
+    return alive
+
+
+def test_update_matches_per_dict_integration():
+    pool = ParticlePool(64)
+    owner = pool.new_owner()
+    ref = []
+    dt = 1 / 60
+    for frame in range(90):
+        if frame % 20 == 0:
+            pool.emit(owner, 100 + frame, 400, JUMP_VX, JUMP_VY, 3, 0)
+            ref += [{"x": 100 + frame, "y": 400, "vx": vx, "vy": vy, "r": 3, "life": 1.0}
+                    for vx, vy in zip(JUMP_VX.tolist(), JUMP_VY.tolist())]
+        pool.update(dt)
+        ref = _reference_step(ref, dt)
+        got = sorted(zip(pool.x[:len(pool)].tolist(), pool.y[:len(pool)].tolist(), pool.r[:len(pool)].tolist()))
+        want = sorted((p["x"], p["y"], p["r"]) for p in ref)
+        assert len(got) == len(want) and np.allclose(got, want)
+
+
+def test_capacity_and_shared_owners():
+    pool = ParticlePool(10)
+    a, b = pool.new_owner(), pool.new_owner()
+    assert pool.emit(a, 0, 0, JUMP_VX, JUMP_VY, 3, 0) == 4
+    assert pool.emit(b, 50, 0, np.zeros(8), np.zeros(8), 2, 1) == 6
+    assert len(pool) == 10 and pool.dropped == 2
+    pool.clear(a)
+    assert len(pool) == 6 and set(pool.owner[:6].tolist()) == {b}
+    assert np.all(pool.x[:6] == 50)
+    pool.clear()
+    assert len(pool) == 0
+
+
+def test_draw_matches_draw_circle():
+    screen = pg.display.get_surface()
+    pool = ParticlePool(16)
+    owner = pool.new_owner()
+    xs = np.array([30.7, 80.2, 130.0, -1.5, 959.9])
+    pool.emit(owner, xs + 20, [50.9, 60.0, 70.2, 80.0, 90.0], np.zeros(5), np.zeros(5), 3, 1)
+    pool.r[:5] = [3.0, 2.5, 1.0, 3.0, 2.0]
+    ref = pg.Surface(screen.get_size()).convert()
+    for i in range(5):
+        pg.draw.circle(ref, COLORS[1], (int(pool.x[i] - 20.0), int(pool.y[i])), int(pool.r[i]))
+    screen.fill((0, 0, 0))
+    pool.draw(screen, 20.0)
+    assert pg.image.tobytes(screen, "RGB") == pg.image.tobytes(ref, "RGB")
+
+
+def test_players_share_a_pool(monkeypatch):
+    monkeypatch.setattr(C, "DRAW_PARTICLES", True)
+    pool = ParticlePool(32)
+    p1, p2 = Player(40, 300, particles=pool), Player(400, 300, particles=pool)
+    p1._emit_jump_particles()
+    p2._emit_land_particles(200.0)
+    assert len(pool) == 9
+    p1.reset(40, 300)
+    assert len(pool) == 5 and np.all(pool.owner[:5] == p2.particle_owner)
+    solo = Player(40, 300)
+    solo._emit_jump_particles()
+    assert len(solo.particles) == 4 and len(pool) == 5
@@ -0,0 +1,43 @@
+import csv
+
+from ml_platformer.profiler import PHASES, FrameProfiler
+from ml_platformer.sim import Body, InputState, Simulation, build_layout
+
+
+def test_percentiles_over_rolling_window():
+    prof = FrameProfiler(window=100)
+    for i in range(150):
+        prof.add("physics", (i + 1) / 1000.0)
+        prof.end_frame()
+    p50, p95, mx = prof.stats(max_age=0.0)["physics"]
+    # Only the last 100 frames (51..150 ms) remain in the window
+    assert abs(p50 - 100.5) < 1e-6
+    assert abs(mx - 150.0) < 1e-6
+    assert 140.0 < p95 < 150.0
+    assert prof.stats(max_age=0.0)["render"] == (0.0, 0.0, 0.0)
+
+
+def test_flush_writes_one_row_per_phase(tmp_path):
+    path = tmp_path / "profile_log.csv"
+    prof = FrameProfiler(csv_path=str(path))
+    prof.add("input", 0.001)
+    prof.end_frame()
+    prof.flush()
+    prof.flush()
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["phase"] for r in rows] == list(PHASES) * 2
+    assert float(rows[0]["p50_ms"]) == 1.0
+
+
+def test_simulation_splits_physics_and_reward_time():
+    layout = build_layout(0)
+    s = Simulation(layout, Body(layout.spawn_x, layout.spawn_y))
+    s.profiler = FrameProfiler()
+    for _ in range(10):
+        s.step(InputState(right=True), 1.0 / 60)
+        s.profiler.end_frame()
+    stats = s.profiler.stats(max_age=0.0)
+    assert stats["physics"][2] > 0.0
+    assert stats["reward"][2] > 0.0
+    assert stats["render"][2] == 0.0
@@ -0,0 +1,53 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from ml_platformer.ai_agent import STATE_BINS, STATE_MIN, QAgent, encode_state
+from ml_platformer.qtable_io import convert_pickle, load_qtable, read_header
+
+
+def test_binary_roundtrip_is_memory_mapped(tmp_path):
+    path = str(tmp_path / "q.bin")
+    a = QAgent()
+    s, ns = (3, 1, 1, 0, 1, 0), (4, 1, 1, 0, 1, 0)
+    a.reward(5.0, s, ns, 2, False)
+    a.save(path)
+
+    b = QAgent()
+    b.load(path)
+    assert isinstance(b.q, np.memmap)
+    assert np.array_equal(a.q, b.q)
+    assert b.visits[encode_state(s), 2] == 1
+    # Copy-on-write: learning after load never touches the file on disk
+    b.reward(1.0, s, ns, 2, False)
+    q_disk, _ = load_qtable(path, STATE_MIN, STATE_BINS, a.q.shape[1])
+    assert np.array_equal(q_disk, a.q)
+    # Saving back over the mapped file works and leaves no temp files
+    b.save(path)
+    assert os.listdir(tmp_path) == ["q.bin"]
+    assert read_header(path)["state_bins"] == STATE_BINS
+
+
+def test_legacy_pickle_import_and_convert(tmp_path):
+    pkl = str(tmp_path / "q.pkl")
+    s = (30, -4, 0, 1, 0, 0)
+    with open(pkl, "wb") as f:
+        pickle.dump({s: np.arange(6, dtype=np.float32)}, f)
+    a = QAgent()
+    a.load(pkl)
+    assert a.q[encode_state(s)].tolist() == list(range(6))
+
+    out = str(tmp_path / "q.bin")
+    convert_pickle(pkl, out)
+    b = QAgent()
+    b.load(out)
+    assert np.array_equal(a.q, b.q)
+
+
+def test_mismatched_encoding_is_rejected(tmp_path):
+    path = str(tmp_path / "q.bin")
+    QAgent().save(path)
+    with pytest.raises(ValueError):
+        load_qtable(path, STATE_MIN, (1,) + STATE_BINS[1:], 6)
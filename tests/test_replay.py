@@ -0,0 +1,57 @@
+import numpy as np
+
+from ml_platformer.ai_agent import QAgent, encode_state
+from ml_platformer.replay import ReplayBuffer
+
+
+def test_ring_overwrites_oldest():
+    buf = ReplayBuffer(4)
+    for i in range(6):
+        buf.add(i, i % 3, float(i), i + 1, i == 5)
+    assert len(buf) == 4
+    assert sorted(buf.states.tolist()) == [2, 3, 4, 5]
+    buf.add_batch(np.arange(10, 16), np.zeros(6), np.ones(6), np.arange(11, 17), np.zeros(6, bool))
+    assert len(buf) == 4
+    assert sorted(buf.states.tolist()) == [12, 13, 14, 15]
+
+
+def test_reward_records_encoded_transition():
+    agent = QAgent(seed=0)
+    agent.replay_buffer = ReplayBuffer(8)
+    s, ns = (1, 2, 0, 0, 1, 0), (0, 2, 0, 0, 1, 0)
+    agent.reward(3.0, s, ns, 2, False)
+    assert len(agent.replay_buffer) == 1
+    assert agent.replay_buffer.states[0] == encode_state(s)
+    assert agent.replay_buffer.next_states[0] == encode_state(ns)
+    assert agent.replay_buffer.actions[0] == 2
+
+
+def test_replay_matches_scalar_update_and_skips_bookkeeping():
+    a = QAgent(seed=0)
+    b = QAgent(seed=0)
+    b.replay_buffer = ReplayBuffer(8)
+    s, ns = (1, 2, 0, 0, 1, 0), (0, 2, 0, 0, 1, 0)
+    a.q[encode_state(ns)] = [0.0, 0.0, 5.0, 0.0, 0.0, 0.0]
+    b.q[encode_state(ns)] = [0.0, 0.0, 5.0, 0.0, 0.0, 0.0]
+    b.replay_buffer.add(encode_state(s), 2, 3.0, encode_state(ns), False)
+    a.reward(3.0, s, ns, 2, False)
+    assert b.replay(batch_size=1) == 1
+    assert np.allclose(a.q, b.q)
+    # Replay learns but is not counted as environment experience
+    assert b.steps == 0 and b.visits.sum() == 0
+
+
+def test_replay_needs_a_full_batch():
+    agent = QAgent(seed=0)
+    assert agent.replay() == 0
+    agent.replay_buffer = ReplayBuffer(8)
+    agent.replay_buffer.add(0, 0, 1.0, 1, False)
+    assert agent.replay(batch_size=4) == 0
+
+
+def test_duplicate_samples_average_instead_of_summing():
+    agent = QAgent(seed=0)
+    s = np.full(64, 7)
+    a = np.zeros(64, dtype=np.int64)
+    agent.learn_batch(s, a, np.ones(64), s, np.ones(64, bool))
+    assert np.isclose(agent.q[7, 0], agent.alpha)
@@ -0,0 +1,166 @@
+import os
+import sys
+import subprocess
+
+from ml_platformer import config as C
+from ml_platformer import sim
+from ml_platformer.sim import Body, InputState, Layout, Rect, Simulation, build_layout
+
+
+def test_core_runs_without_pygame_display():
+    layout = build_layout(0)
+    s = Simulation(layout, Body(layout.spawn_x, layout.spawn_y))
+    for _ in range(200):
+        res = s.step(InputState(right=True), 1.0 / 60)
+        if res.done:
+            s.reset()
+    assert s.body.rect.centerx > layout.spawn_x
+
+
+def test_core_import_does_not_load_pygame():
+    # Checked in a fresh interpreter: this test process has pygame loaded already
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = "import sys, ml_platformer.sim; print('pygame' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_landing_on_ground_sets_on_ground():
+    layout = build_layout(1)
+    body = Body(layout.spawn_x, layout.spawn_y - 100)
+    for _ in range(120):
+        body.update(1.0 / 60, layout, InputState())
+    assert body.on_ground
+    assert body.rect.bottom == layout.platforms[0].top
+
+
+def test_spike_contact_ends_episode_with_penalty():
+    layout = build_layout(0)
+    spike = layout.hazards[0]
+    s = Simulation(layout, Body(spike.x, spike.y - C.PLAYER_H + 10))
+    s.furthest_x = C.LEVEL_WIDTH  # isolate terminal penalties from progress shaping
+    res = s.step(InputState(), 1.0 / 60)
+    assert res.died_to_hazard and res.done
+    assert res.reward < C.HAZARD_DEATH_PENALTY + C.REWARD_FALL_DEATH + 1.0
+
+
+def test_grid_index_matches_full_scan():
+    import random
+    rng = random.Random(5)
+    rects = [sim.Rect(rng.randint(0, 20000), rng.randint(0, 500), rng.randint(10, 400), rng.randint(10, 60))
+             for _ in range(300)]
+    index = sim.GridIndex(rects)
+    for _ in range(500):
+        probe = sim.Rect(rng.randint(-100, 20500), rng.randint(0, 500), C.PLAYER_W, C.PLAYER_H)
+        brute = [i for i, r in enumerate(rects) if probe.colliderect(r)]
+        found = [i for i in index.query(probe.left, probe.right) if probe.colliderect(rects[i])]
+        assert found == brute
+        assert index.first_overlap(probe) == (brute[0] if brute else None)
+
+
+def test_ledge_map_matches_platform_scan():
+    import random
+    rng = random.Random(9)
+    for idx in range(3):
+        layout = build_layout(idx)
+        for _ in range(3000):
+            rect = sim.Rect(rng.randint(-50, C.LEVEL_WIDTH + 50), rng.randint(-100, C.HEIGHT + 100), C.PLAYER_W, C.PLAYER_H)
+            feet = rect.move(0, 8)
+            brute = int(any(p.left <= feet.centerx <= p.right and 0 <= p.top - feet.bottom <= 64
+                            for p in layout.platforms))
+            assert layout.ledge_under(rect) == brute
+        assert build_layout(idx).ledge_map is layout.ledge_map
+
+
+def test_macro_step_matches_frame_by_frame_steps():
+    import random
+    rng = random.Random(3)
+    dt = 1.0 / 60
+    inputs = [InputState(right=True), InputState(right=True, jump=True), InputState(left=True), InputState(jump=True),
+              InputState()]
+    for idx in range(3):
+        layout = build_layout(idx)
+        ref = Simulation(layout, Body(layout.spawn_x, layout.spawn_y))
+        mac = Simulation(layout, Body(layout.spawn_x, layout.spawn_y))
+        for _ in range(300):
+            inp = rng.choice(inputs)
+            k = rng.randint(1, 6)
+            total, done = 0.0, False
+            for _ in range(k):
+                res = ref.step(inp, dt)
+                total += res.reward
+                if res.done:
+                    done = True
+                    break
+            mres = mac.macro_step(inp, k, dt)
+            assert abs(mres.reward - total) < 1e-6
+            assert mres.done == done and mres.reached_exit == res.reached_exit and mres.fell == res.fell
+            assert tuple(mac.body.rect) == tuple(ref.body.rect)
+            assert (mac.episode_step, mac.furthest_x, mac.awarded_spikes) == (ref.episode_step, ref.furthest_x, ref.awarded_spikes)
+            if done:
+                ref.reset()
+                mac.reset()
+
+
+def test_swept_collision_matches_small_dt_reference():
+    layout = build_layout(0)
+    base = (1.0 / C.FPS) * C.TIME_SCALE
+    big, sub = 6, 24
+
+    def drop(p, dt, substeps, swept):
+        body = Body(p.centerx - C.PLAYER_W // 2, p.top - 400)
+        body.swept = swept
+        body.vel.y = 2000.0
+        out = []
+        for _ in range(12):
+            for _ in range(substeps):
+                body.update(dt, layout, InputState())
+            out.append((body.rect.x, body.rect.y))
+        return out
+
+    tunneled = 0
+    for p in layout.platforms[1:]:
+        ref = drop(p, base * big / sub, sub, False)
+        swept = drop(p, base * big, 1, True)
+        # Never inside a platform after a step. Along the way the reference can
+        # differ by its integer truncation (at most 1px per substep), and both
+        # end at rest on the same platform.
+        assert not any(Rect(x, y, C.PLAYER_W, C.PLAYER_H).colliderect(q) for x, y in swept for q in layout.platforms)
+        assert all(abs(a[1] - b[1]) <= sub for a, b in zip(ref, swept))
+        assert swept[-1] == ref[-1] == (p.centerx - C.PLAYER_W // 2, p.top - C.PLAYER_H)
+        tunneled += drop(p, base * big, 1, False)[-1] != ref[-1]
+    # Without sweeping, the same step size falls through thin platforms
+    assert tunneled > 0
+
+
+def test_swept_collision_stops_fast_run_at_thin_wall():
+    # Running at full speed with a step longer than wall + body width
+    layout = Layout()
+    ground = Rect(0, C.HEIGHT - C.TILE, C.LEVEL_WIDTH, C.TILE)
+    wall = Rect(600, ground.top - 2 * C.TILE, 8, 2 * C.TILE)
+    layout.platforms[:] = [ground, wall]
+    layout.build_index()
+    dt, sub = 0.16, 32
+    assert C.MAX_SPEED_X * dt > wall.w + C.PLAYER_W
+
+    def run(x, dt, substeps, swept):
+        body = Body(x, ground.top - C.PLAYER_H)
+        body.swept = swept
+        body.vel.x = C.MAX_SPEED_X
+        out = []
+        for _ in range(10):
+            for _ in range(substeps):
+                body.update(dt, layout, InputState(right=True))
+            out.append((body.rect.x, body.rect.y))
+        return out
+
+    tunneled = 0
+    for x in range(300, 360, 4):
+        ref = run(x, dt / sub, sub, False)
+        swept = run(x, dt, 1, True)
+        assert not any(Rect(bx, by, C.PLAYER_W, C.PLAYER_H).colliderect(wall) for bx, by in swept)
+        assert all(bx + C.PLAYER_W <= wall.left and by == ground.top - C.PLAYER_H for bx, by in swept)
+        assert swept[-1] == ref[-1] == (wall.left - C.PLAYER_W, ground.top - C.PLAYER_H)
+        tunneled += run(x, dt, 1, False)[-1][0] > wall.right
+    # Without sweeping, some of the same runs pass straight through the wall
+    assert tunneled > 0
@@ -0,0 +1,85 @@
+import csv
+
+import numpy as np
+import pytest
+
+from ml_platformer.main import EPISODE_COLUMNS
+from ml_platformer.telemetry import EpisodeLogger, load_npz_chunks
+
+
+def _row(i, reason="fell"):
+    return {"episode": i, "time": f"{i * 0.5:.4f}", "reward": "1.0000", "epsilon": "0.1000", "steps": 10 * i,
+            "reason": reason, "steps_per_sec": "1234.5"}
+
+
+def test_rows_are_buffered_until_threshold_and_close(tmp_path):
+    path = tmp_path / "episodes.csv"
+    path.write_text(",".join(EPISODE_COLUMNS) + "\n")
+    done = tmp_path / "completion.txt"
+    log = EpisodeLogger(str(path), EPISODE_COLUMNS, completion_path=str(done), flush_rows=3, flush_secs=1e9)
+    log.log(_row(1))
+    log.log(_row(2))
+    log.log_completion(2, 1.25)
+    assert len(path.read_text().splitlines()) == 1
+    log.log(_row(3))
+    assert len(path.read_text().splitlines()) == 4
+    assert done.read_text() == "2,1.2500\n"
+    log.log(_row(4, "exit"))
+    log.close()
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["episode"] for r in rows] == ["1", "2", "3", "4"]
+    assert rows[-1]["reason"] == "exit" and rows[-1]["steps_per_sec"] == "1234.5"
+    assert log.last_error is None
+
+
+def test_maybe_flush_bounds_buffered_age(tmp_path, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("ml_platformer.telemetry.time.perf_counter", lambda: now[0])
+    path, done = tmp_path / "episodes.csv", tmp_path / "completion.txt"
+    log = EpisodeLogger(str(path), EPISODE_COLUMNS, completion_path=str(done), flush_secs=5.0)
+    assert not log.maybe_flush()
+    log.log_completion(1, 2.5)
+    log.log(_row(1, "exit"))
+    now[0] += 4.0
+    assert not log.maybe_flush() and log.pending == 2
+    # No further rows arrive (a long episode); the step loop's poll still writes them
+    now[0] += 1.0
+    assert log.maybe_flush() and log.pending == 0
+    assert len(path.read_text().splitlines()) == 1 and done.read_text() == "1,2.5000\n"
+
+
+def test_npz_chunks_hold_typed_columns(tmp_path):
+    log = EpisodeLogger(str(tmp_path / "e.csv"), EPISODE_COLUMNS, npz_dir=str(tmp_path / "npz"), flush_rows=2)
+    for i in range(1, 6):
+        log.log(_row(i, "exit" if i % 2 else "fell"))
+    log.close()
+    cols = load_npz_chunks(str(tmp_path / "npz"))
+    assert cols["episode"].tolist() == [1, 2, 3, 4, 5]
+    assert cols["steps"].dtype == np.int64 and cols["time"][3] == 2.0
+    assert cols["reason"].tolist() == ["exit", "fell", "exit", "fell", "exit"]
+
+
+def test_headless_interrupt_flushes_buffered_rows(tmp_path, monkeypatch):
+    from ml_platformer import main
+
+    log_path = tmp_path / "episodes.csv"
+    monkeypatch.setattr(main, "EPISODE_LOG_PATH", str(log_path))
+    monkeypatch.setattr(main, "LOG_PATH", str(tmp_path / "completion.txt"))
+    monkeypatch.setattr(main, "SAVE_PATH", str(tmp_path / "qtable.bin"))
+    real_input = main.ai_input
+
+    def interrupting_input(session, *a):
+        # Ctrl-C arrives mid-way through the fourth episode
+        if session.episode_idx > 3:
+            raise KeyboardInterrupt
+        return real_input(session, *a)
+
+    monkeypatch.setattr(main, "ai_input", interrupting_input)
+    monkeypatch.setattr(main.pg, "quit", lambda: None)  # keep pygame up for later tests
+    with pytest.raises(SystemExit):
+        main.main(["--headless", "--speedup", "4", "--save-on-exit"])
+    with open(log_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["episode"] for r in rows] == ["1", "2", "3"]
+    assert (tmp_path / "qtable.bin").exists()
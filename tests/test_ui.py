@@ -0,0 +1,57 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame as pg  # noqa: E402
+
+from ml_platformer import config as C  # noqa: E402
+from ml_platformer.ui import UI  # noqa: E402
+
+pg.init()
+pg.display.set_mode((C.WIDTH, C.HEIGHT))
+
+HUD = {
+    "training": True, "ai_control": True, "episodes": 12, "reward": 12.34, "time": 5.67, "best_time": 8.9,
+    "reason": "exit", "steps_per_sec": 1234.0, "ai_wasd": {"w": True, "a": False, "s": False, "d": True},
+}
+
+
+def test_text_renders_only_when_a_line_changes():
+    ui = UI()
+    screen = pg.display.get_surface()
+    ui.draw(screen, HUD)
+    misses = ui.text_cache.misses
+    ui.draw(screen, HUD)
+    assert ui.text_cache.misses == misses
+    ui.draw(screen, dict(HUD, reward=13.0))
+    assert ui.text_cache.misses == misses + 2  # shadow and text of the reward line
+
+
+def test_profile_panel_stays_out_of_text_cache():
+    ui = UI()
+    screen = pg.display.get_surface()
+    ui.draw(screen, HUD)
+    size, misses = len(ui.text_cache), ui.text_cache.misses
+    for i in range(300):
+        ui.draw(screen, dict(HUD, profile={"physics": (i / 100, i / 50, i / 10), "render": (1.0, 2.0, 3.0)}))
+    assert len(ui.text_cache) == size and ui.text_cache.misses == misses
+    assert ui._profile_text[1].startswith("physics") and "2.99" in ui._profile_text[1]
+
+
+def test_prebuilt_key_caps_match_drawing_in_place():
+    ui = UI()
+    screen = pg.display.get_surface()
+    ref = pg.Surface(screen.get_size()).convert()
+    box = UI.KEY_BOX
+    for down in (False, True):
+        for target in (screen, ref):
+            target.fill((120, 60, 30))
+        ui._draw_key(screen, "S", 100, 80, down, box)
+        rect = pg.Rect(100, 80, box, box)
+        pg.draw.rect(ref, (30, 34, 42), rect.inflate(6, 6), border_radius=6)
+        pg.draw.rect(ref, (90, 200, 255) if down else (70, 80, 95), rect, border_radius=6)
+        pg.draw.rect(ref, (15, 18, 22), rect, width=2, border_radius=6)
+        label = ui.font.render("S", True, (15, 18, 22))
+        ref.blit(label, (100 + (box - label.get_width()) // 2, 80 + (box - label.get_height()) // 2))
+        assert pg.image.tobytes(screen, "RGB") == pg.image.tobytes(ref, "RGB")